@@ -0,0 +1,127 @@
+"""
+Compare the HTML parser backends of the measurement extractor on saved articles.
+
+Every fixture is run through each backend in wiki_page.PARSER_BACKENDS:
+parse time, then the page checks and both extraction phases of
+SupabaseFjordExtractor. Results are compared with the bs4 reference, and
+any article where a backend disagrees is listed.
+
+Fixtures are Wikipedia article HTML files named <language>__<title>.html;
+by default the small corpus in tools/tests/fixtures/wiki, which
+tests/test_wiki_page.py also checks for parity. --export-cache writes every
+article in the HTTP cache to a fixture directory in that layout, for timing
+on a larger set. Run from the repository root (the extractor reads .env.local):
+
+    python3 tools/bench_html_parsers.py [--repeat 3]
+    python3 tools/bench_html_parsers.py --export-cache /tmp/wiki
+    python3 tools/bench_html_parsers.py --fixtures /tmp/wiki
+"""
+
+import argparse
+import os
+import time
+from urllib.parse import unquote, urlsplit
+
+from fjord_data_extractor import SupabaseFjordExtractor
+from http_cache import get_default_cache
+from wiki_page import PARSER_BACKENDS, WikipediaPage
+
+REFERENCE = "bs4"
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "wiki")
+
+
+def export_cache(directory):
+    """Write cached Wikipedia articles as <language>__<title>.html fixtures"""
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for response in get_default_cache().responses("%wikipedia.org/wiki/%"):
+        parts = urlsplit(response.url)
+        language = parts.netloc.split(".")[0]
+        title = unquote(parts.path.rsplit("/", 1)[-1]).replace("/", "_")
+        with open(os.path.join(directory, f"{language}__{title}.html"), "wb") as f:
+            f.write(response.content)
+        count += 1
+    print(f"Exported {count} articles to {directory}")
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".html"):
+            continue
+        language = name.split("__", 1)[0] if "__" in name else "en"
+        with open(os.path.join(directory, name), "rb") as f:
+            fixtures.append((name, language, f.read()))
+    return fixtures
+
+
+def extract(extractor, page, language):
+    """What the extractor concludes from one page, for parity checks"""
+    return (
+        page.is_disambiguation,
+        page.is_missing,
+        extractor._extract_from_infobox(page, language),
+        extractor._extract_from_text(page, language),
+    )
+
+
+def bench(parser, fixtures, extractor, repeat):
+    best_parse = best_total = float("inf")
+    for _ in range(repeat):
+        parse = 0.0
+        start = time.perf_counter()
+        results = {}
+        for name, language, content in fixtures:
+            page = WikipediaPage(name, content, parser=parser)
+            parse_start = time.perf_counter()
+            page.document
+            parse += time.perf_counter() - parse_start
+            results[name] = extract(extractor, page, language)
+        best_parse = min(best_parse, parse)
+        best_total = min(best_total, time.perf_counter() - start)
+    return best_parse, best_total, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--fixtures",
+        default=FIXTURES_DIR,
+        help="directory of <language>__<title>.html articles (default: the test fixtures)",
+    )
+    parser.add_argument("--export-cache", metavar="DIR", help="write cached articles to DIR and exit")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.export_cache:
+        export_cache(args.export_cache)
+        return
+
+    fixtures = load_fixtures(args.fixtures)
+    size = sum(len(content) for _, _, content in fixtures)
+    print(f"{len(fixtures)} articles, {size / 1e6:.1f} MB")
+
+    extractor = SupabaseFjordExtractor()
+    runs = {name: bench(name, fixtures, extractor, args.repeat) for name in PARSER_BACKENDS if _available(name)}
+    reference = runs[REFERENCE][2]
+
+    print(f"{'backend':<8} {'parse (s)':>10} {'total (s)':>10} {'ms/page':>8} {'mismatches':>11}")
+    for name, (parse, total, results) in runs.items():
+        mismatched = [f for f in results if results[f] != reference[f]]
+        per_page = 1000 * total / len(fixtures) if fixtures else 0.0
+        print(f"{name:<8} {parse:>10.3f} {total:>10.3f} {per_page:>8.1f} {len(mismatched):>11}")
+        for fixture in mismatched:
+            print(f"  {fixture}: {results[fixture]} != {reference[fixture]}")
+
+
+def _available(name):
+    try:
+        PARSER_BACKENDS[name](b"<html></html>")
+    except ImportError as e:
+        print(f"Skipping {name}: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    main()
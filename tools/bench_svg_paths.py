@@ -0,0 +1,68 @@
+"""
+Compare SVG path encoders on the full fjord catalogue.
+
+Normalizes every outline in fjordkatalogen_omrade.shp once, then encodes all
+of them with each path mode and precision, reporting total `d` bytes and
+encode time. Run from the directory containing the shapefile:
+
+    python3 bench_svg_paths.py [--precisions 0 1 2] [--repeat 3]
+"""
+
+import argparse
+import time
+
+from generate_fjord_svgs import SHP_FILE, exterior_ring, normalize_to_square
+from shp_reader import ShpReader
+from svg_path import PATH_MODES, encode_path
+
+
+def legacy_create_svg_path(coords):
+    """The original += implementation, kept as the baseline"""
+    coords = coords.tolist()
+    if not coords:
+        return ""
+    path = f"M {coords[0][0]:.1f},{coords[0][1]:.1f}"
+    for x, y in coords[1:]:
+        path += f" L {x:.1f},{y:.1f}"
+    return path
+
+
+def bench(encode, outlines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        paths = [encode(coords) for coords in outlines]
+        best = min(best, time.perf_counter() - start)
+    return sum(len(p.encode("utf-8")) for p in paths), best, paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--precisions", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with ShpReader(SHP_FILE) as shp:
+        outlines = [normalize_to_square(exterior_ring(record)) for record in shp]
+    vertices = sum(len(coords) for coords in outlines)
+    print(f"{len(outlines)} outlines, {vertices} vertices")
+
+    base_bytes, base_time, base_paths = bench(legacy_create_svg_path, outlines, args.repeat)
+    print(f"{'mode':<10} {'precision':>9} {'bytes':>12} {'vs legacy':>10} {'time (s)':>10}")
+    print(f"{'legacy':<10} {1:>9} {base_bytes:>12} {'100.0%':>10} {base_time:>10.3f}")
+
+    for mode in PATH_MODES:
+        for precision in args.precisions:
+            total, elapsed, paths = bench(
+                lambda c: encode_path(c, mode=mode, precision=precision),
+                outlines,
+                args.repeat,
+            )
+            ratio = f"{100 * total / base_bytes:.1f}%" if base_bytes else "-"
+            print(f"{mode:<10} {precision:>9} {total:>12} {ratio:>10} {elapsed:>10.3f}")
+            if mode == "absolute" and precision == 1 and paths != base_paths:
+                print("  WARNING: absolute/1 output differs from the legacy encoder")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Streaming reader for dBASE III (.dbf) attribute tables.
+
+The header is parsed once into a struct.Struct whose format skips the columns
+that weren't requested, so decoding a row is a single unpack_from plus one
+strip/decode per projected column. Rows are read in blocks and yielded lazily
+as __slots__ records. The text encoding comes from the sidecar .cpg file when
+there is one.
+
+    with DbfReader("fjordkatalogen_omrade.dbf", columns=("navn", "utmx")) as dbf:
+        for record in dbf:
+            print(record["navn"], record.get("utmx"))
+"""
+
+import codecs
+import os
+import struct
+from collections import namedtuple
+
+DEFAULT_ENCODING = "iso-8859-1"
+
+# Code page identifiers ESRI writes to .cpg files
+_CPG_ALIASES = {
+    "88591": "iso-8859-1",
+    "8859_1": "iso-8859-1",
+    "1252": "cp1252",
+    "65001": "utf-8",
+    "utf8": "utf-8",
+}
+
+_HEADER = struct.Struct("<B3BIHH20x")
+
+DbfField = namedtuple("DbfField", ["name", "type", "length", "offset"])
+
+
+def read_cpg_encoding(dbf_filename, default=DEFAULT_ENCODING):
+    """Encoding named by the .cpg file next to a .dbf, or `default`"""
+    cpg_filename = os.path.splitext(dbf_filename)[0] + ".cpg"
+    try:
+        with open(cpg_filename, "r", encoding="ascii") as f:
+            name = f.read().strip()
+    except (FileNotFoundError, UnicodeDecodeError):
+        return default
+    name = _CPG_ALIASES.get(name.lower().replace("-", ""), name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return default
+
+
+class DbfRecord:
+    """One table row; values are the decoded, stripped text of the projected columns"""
+
+    __slots__ = ("index", "deleted", "raw", "_positions", "_values")
+
+    def __init__(self, index, deleted, raw, positions, values):
+        self.index = index
+        self.deleted = deleted
+        self.raw = raw
+        self._positions = positions
+        self._values = values
+
+    def __getitem__(self, name):
+        return self._values[self._positions[name]]
+
+    def get(self, name, default=""):
+        pos = self._positions.get(name)
+        return default if pos is None else self._values[pos]
+
+    def as_dict(self):
+        return {name: self._values[pos] for name, pos in self._positions.items()}
+
+
+class DbfReader:
+    def __init__(self, filename, columns=None, encoding=None, block_records=1024):
+        self.filename = filename
+        self.encoding = encoding or read_cpg_encoding(filename)
+        self.block_records = block_records
+        self._file = open(filename, "rb")
+
+        _, _, _, _, self.num_records, self.header_len, self.record_len = _HEADER.unpack(
+            self._file.read(_HEADER.size)
+        )
+        self.fields = self._read_fields()
+
+        wanted = None if columns is None else set(columns)
+        self.columns = [f.name for f in self.fields if wanted is None or f.name in wanted]
+        self._positions = {name: i for i, name in enumerate(self.columns)}
+
+        # One struct for the whole row: deletion flag, then each field either
+        # captured or skipped
+        fmt = ["<c"]
+        cursor = 1
+        for field in self.fields:
+            if field.offset > cursor:
+                fmt.append(f"{field.offset - cursor}x")
+            fmt.append(f"{field.length}{'s' if field.name in self._positions else 'x'}")
+            cursor = field.offset + field.length
+        if self.record_len > cursor:
+            fmt.append(f"{self.record_len - cursor}x")
+        self._row = struct.Struct("".join(fmt))
+
+    def _read_fields(self):
+        fields = []
+        offset = 1
+        while True:
+            descriptor = self._file.read(32)
+            if not descriptor or descriptor[0] == 0x0D:
+                break
+            name = descriptor[:11].split(b"\x00", 1)[0].decode("ascii")
+            length = descriptor[16]
+            fields.append(DbfField(name, chr(descriptor[11]), length, offset))
+            offset += length
+        return fields
+
+    def __len__(self):
+        return self.num_records
+
+    def __iter__(self):
+        unpack_from = self._row.unpack_from
+        record_len = self.record_len
+        encoding = self.encoding
+        positions = self._positions
+
+        self._file.seek(self.header_len)
+        index = 0
+        while index < self.num_records:
+            count = min(self.block_records, self.num_records - index)
+            block = self._file.read(record_len * count)
+            count = min(count, len(block) // record_len)
+            if not count:
+                break
+            for pos in range(0, count * record_len, record_len):
+                flag, *values = unpack_from(block, pos)
+                yield DbfRecord(
+                    index,
+                    flag == b"*",
+                    block[pos : pos + record_len],
+                    positions,
+                    [v.rstrip(b"\x00 ").decode(encoding) for v in values],
+                )
+                index += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
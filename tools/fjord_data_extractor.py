@@ -7,7 +7,30 @@ Connects to Supabase database and processes fjords table directly.
 Processes multiple languages with priority: Norwegian Bokmål → Nynorsk → English → Danish → Cebuano
 
 Usage:
-    python tools/fjord_extractor.py
+    python tools/fjord_extractor.py [--workers 8] [--max-per-host 2] [--full] [--fuse] [--export]
+
+Results are upserted into tools/fjord_measurements.sqlite (see result_store);
+--export also writes tools/fjord_measurements.json and .csv from it.
+
+Runs are incremental: each source page's revid/touched is recorded in
+tools/fjord_measurements_revisions.json, and later runs only reprocess fjords
+with a page that is new or has a new revision (one batched prop=info sweep
+decides which). --full reprocesses every fjord.
+
+With --workers above 1, the candidate language pages of many fjords are
+fetched concurrently through a thread pool. The first language by priority
+that yields measurements still wins, and lower-priority attempts for that
+fjord are cancelled.
+
+With --fuse, a fjord's languages are read in priority order until length
+and depth both have a value (width, which only infoboxes give, is taken
+from whichever pages were read), and all values found along the way are
+reconciled (see measurement_fusion): each field keeps the
+highest-priority source, with a per-field confidence, and disagreeing
+sources are stored alongside the results (exported to
+tools/fjord_measurement_conflicts.json). So that sources compare in the same
+units, fused infobox values also read the unit written after the number and
+drop thousands separators; without --fuse infoboxes are parsed as before.
 
 Requires .env.local in project root with:
     NEXT_PUBLIC_SUPABASE_URL=your_supabase_url
@@ -15,20 +38,30 @@ Requires .env.local in project root with:
     NEXT_PUBLIC_SUPABASE_PUBLISHABLE_KEY=your_publishable_key
 """
 
+import argparse
 import requests
 import re
-import csv
 import json
-import time
 import logging
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from http_cache import get_default_cache
+from measurement_fusion import FUSED_FIELDS, Candidate, covered, fuse, source_rank
+from measurement_scanner import INFOBOX_FIELDS, TEXT_SCANNERS
+from rate_limit import get_default_limiter
+from result_store import ResultStore
+from supabase_rest import SupabaseRest
+from wiki_page import DEFAULT_PARSER, WikipediaPage
+from wiki_revisions import RevisionState, current_revisions
+
 # Load environment variables from .env.local in parent directory
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env.local')
 load_dotenv(env_path)
@@ -44,13 +77,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+REVISIONS_FILE = 'tools/fjord_measurements_revisions.json'
+RESULTS_DB = 'tools/fjord_measurements.sqlite'
+RESULTS_JSON_FILE = 'tools/fjord_measurements.json'
+RESULTS_CSV_FILE = 'tools/fjord_measurements.csv'
+CONFLICTS_FILE = 'tools/fjord_measurement_conflicts.json'
+
+THOUSANDS_SPACE = re.compile(r'(?<=\d)[ \u00a0\u2009\u202f](?=\d{3}(?!\d))')
+THOUSANDS_COMMA = re.compile(r'(?<=\d),(?=\d{3}(?!\d))')
+UNIT_AFTER_NUMBER = re.compile(r'\s*([^\W\d_]+)')
+
+# --fuse only: factors to km (length, width) and to m (depth); unknown units are taken as is
+LENGTH_UNITS = {
+    'km': 1, 'kilometer': 1, 'kilometre': 1, 'kilometers': 1, 'kilometres': 1,
+    'm': 0.001, 'meter': 0.001, 'metre': 0.001, 'meters': 0.001, 'metres': 0.001,
+    'mi': 1.609344, 'mile': 1.609344, 'miles': 1.609344,
+}
+DEPTH_UNITS = {
+    'm': 1, 'meter': 1, 'metre': 1, 'meters': 1, 'metres': 1,
+    'km': 1000, 'kilometer': 1000, 'kilometre': 1000,
+    'ft': 0.3048, 'feet': 0.3048, 'foot': 0.3048,
+}
+
+class _FjordJob:
+    """One fjord's language attempts in concurrent mode; the first success by priority wins."""
+    
+    def __init__(self, fjord_data: Dict, candidates: List[Tuple[str, str]]):
+        self.fjord_data = fjord_data
+        self.candidates = candidates
+        self.futures = []
+        self.result = None
+        # Index of the best language that has succeeded so far
+        self.cutoff = len(candidates)
+        self.settled = threading.Event()
+        self._lock = threading.RLock()
+        
+    def start(self, executor: ThreadPoolExecutor, extract) -> None:
+        for index, (lang, url) in enumerate(self.candidates):
+            self.futures.append(executor.submit(self._attempt, extract, index, lang, url))
+        for future in self.futures:
+            future.add_done_callback(self._on_done)
+        if not self.futures:
+            self.settled.set()
+            
+    def _attempt(self, extract, index: int, lang: str, url: str) -> Optional[Dict]:
+        should_stop = lambda: index > self.cutoff
+        if should_stop():
+            return None
+        return extract(self.fjord_data['id'], lang, url, should_stop)
+    
+    def _on_done(self, _future) -> None:
+        with self._lock:
+            if self.settled.is_set():
+                return
+            
+            # A success cuts off every lower-priority language
+            for index, future in enumerate(self.futures[:self.cutoff]):
+                if future.done() and not future.cancelled() and future.exception() is None and future.result():
+                    self.cutoff = index
+                    for lower in self.futures[index + 1:]:
+                        lower.cancel()
+                    break
+            
+            # Settled once every higher-priority language has finished without a result
+            if all(future.done() for future in self.futures[:self.cutoff]):
+                if self.cutoff < len(self.futures):
+                    self.result = self.futures[self.cutoff].result()
+                self.settled.set()
+                
+    def wait(self) -> Optional[Dict]:
+        self.settled.wait()
+        return self.result
+
+
 class SupabaseFjordExtractor:
-    def __init__(self, rate_limit_delay=1.0):
-        self.rate_limit_delay = rate_limit_delay
+    def __init__(self, requests_per_second=1.0, burst=5, parser=DEFAULT_PARSER, max_per_host=2):
+        # Network fetches share the per-host token buckets; cache hits never wait
+        self.limiter = get_default_limiter()
+        self.limiter.configure(rate=requests_per_second, burst=burst)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'FjordDataExtractor/1.0 (Educational Research; contact@example.com)'
         })
+        self.cache = get_default_cache()
+        self.parser = parser  # HTML backend, see wiki_page.PARSER_BACKENDS
+        
+        # In-flight page fetches per Wikipedia host (concurrent mode)
+        self.max_per_host = max_per_host
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # Source page revisions, for incremental runs
+        self.revision_state = RevisionState(REVISIONS_FILE)
+        self._current_revisions = {}
+        self._changed_urls = set()
+        self._failed_urls = set()
+        self._processed = []
+        
+        # Values found per page (fusion mode), reused by fjords sharing a page
+        self._page_candidates = {}
+        self._page_candidates_lock = threading.Lock()
+        self.fused = False
         
         # Supabase configuration
         self.supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
@@ -59,11 +186,7 @@ class SupabaseFjordExtractor:
         if not self.supabase_url or not self.supabase_key:
             raise ValueError("Missing Supabase configuration. Check .env.local file.")
         
-        self.supabase_headers = {
-            'apikey': self.supabase_key,
-            'Authorization': f'Bearer {self.supabase_key}',
-            'Content-Type': 'application/json'
-        }
+        self.rest = SupabaseRest(self.supabase_url, self.supabase_key)
         
         # Language processing order
         self.language_priority = ['no', 'nn', 'en', 'da', 'ceb']
@@ -75,19 +198,20 @@ class SupabaseFjordExtractor:
         # Results storage
         self.results = []
         self.conflicts = []
+        self.store = ResultStore(RESULTS_DB, 'measurements')
+        self.conflict_store = ResultStore(RESULTS_DB, 'conflicts')
+        if not len(self.store):
+            self._import_json(RESULTS_JSON_FILE)
         
     def fetch_fjords_from_supabase(self) -> List[Dict]:
-        """Fetch fjords data from Supabase database."""
-        url = f"{self.supabase_url}/rest/v1/fjordle_fjords"
-        params = {
-            'select': 'id,name,wikipedia_url_no,wikipedia_url_nn,wikipedia_url_en,wikipedia_url_da,wikipedia_url_ceb,notes',
+        """Fetch fjords data from Supabase database, paging so no rows are dropped."""
+        columns = 'id,name,wikipedia_url_no,wikipedia_url_nn,wikipedia_url_en,wikipedia_url_da,wikipedia_url_ceb,notes'
+        filters = {
             'or': '(wikipedia_url_no.not.is.null,wikipedia_url_nn.not.is.null,wikipedia_url_en.not.is.null,wikipedia_url_da.not.is.null,wikipedia_url_ceb.not.is.null)'
         }
         
         try:
-            response = requests.get(url, headers=self.supabase_headers, params=params)
-            response.raise_for_status()
-            fjords = response.json()
+            fjords = list(self.rest.iter_rows('fjordle_fjords', columns, filters))
             logger.info(f"Fetched {len(fjords)} fjords with Wikipedia URLs from Supabase")
             return fjords
         except Exception as e:
@@ -102,286 +226,229 @@ class SupabaseFjordExtractor:
         logger.info(f"Processing fjord {fjord_id}: {fjord_name}")
         
         # Try each language in priority order
-        for lang in self.language_priority:
-            url_key = f'wikipedia_url_{lang}'
-            if url_key in fjord_data and fjord_data[url_key]:
-                url = fjord_data[url_key].strip()
-                if url:
-                    logger.info(f"  Trying {lang} Wikipedia: {url}")
-                    
-                    try:
-                        # Phase A: Infobox extraction
-                        measurements = self._extract_from_infobox(url, lang)
-                        if measurements:
-                            logger.info(f"  ✓ Found measurements in {lang} infobox")
-                            return self._create_result(fjord_id, measurements, lang, url, 'infobox')
-                        
-                        # Phase B: Text extraction (only if infobox failed)
-                        measurements = self._extract_from_text(url, lang)
-                        if measurements:
-                            logger.info(f"  ✓ Found measurements in {lang} text")
-                            return self._create_result(fjord_id, measurements, lang, url, 'text')
-                            
-                    except Exception as e:
-                        logger.warning(f"  ✗ Error processing {lang} URL: {e}")
-                        continue
+        for lang, url in self._language_urls(fjord_data):
+            result = self._extract_language(fjord_id, lang, url)
+            if result:
+                return result
         
         logger.warning(f"  ✗ No measurements found for fjord {fjord_id}")
         return None
     
-    def _extract_from_infobox(self, url: str, language: str) -> Optional[Dict]:
-        """Extract measurements from Wikipedia infobox."""
-        soup = self._fetch_page(url)
-        if not soup:
+    def _language_urls(self, fjord_data: Dict) -> List[Tuple[str, str]]:
+        """(language, url) for every Wikipedia URL of a fjord, in priority order."""
+        candidates = []
+        for lang in self.language_priority:
+            url = (fjord_data.get(f'wikipedia_url_{lang}') or '').strip()
+            if url:
+                candidates.append((lang, url))
+        return candidates
+    
+    def _extract_language(self, fjord_id: int, lang: str, url: str, should_stop=None) -> Optional[Dict]:
+        """Fetch one language's page and run both extraction phases; None if nothing was found.
+        
+        `should_stop` is checked once the page is in, so a concurrent attempt
+        that a higher-priority language has beaten skips the extraction.
+        """
+        logger.info(f"  Trying {lang} Wikipedia: {url}")
+        
+        try:
+            # Fetched and parsed once; both phases share the page
+            page = self._fetch_page(url)
+            if not page or (should_stop and should_stop()):
+                return None
+            
+            # Phase A: Infobox extraction
+            measurements = self._extract_from_infobox(page, lang)
+            if measurements:
+                logger.info(f"  ✓ Found measurements in {lang} infobox")
+                return self._create_result(fjord_id, measurements, lang, url, 'infobox')
+            
+            # Phase B: Text extraction (only if infobox failed)
+            measurements = self._extract_from_text(page, lang)
+            if measurements:
+                logger.info(f"  ✓ Found measurements in {lang} text")
+                return self._create_result(fjord_id, measurements, lang, url, 'text')
+                
+        except Exception as e:
+            logger.warning(f"  ✗ Error processing {lang} URL: {e}")
+        return None
+    
+    def extract_fused(self, fjord_data: Dict) -> Optional[Dict]:
+        """Reconcile measurements from as many languages as it takes to cover the stop fields.
+        
+        Lower-priority pages are only fetched while length or depth is still
+        missing; width is fused from whichever pages were read.
+        Conflicting values are added to self.conflicts.
+        """
+        fjord_id = fjord_data['id']
+        logger.info(f"Processing fjord {fjord_id}: {fjord_data['name']}")
+        
+        candidates = []
+        for lang, url in self._language_urls(fjord_data):
+            if covered(candidates):
+                break
+            candidates.extend(self._extract_candidates(lang, url))
+        
+        fields, conflicts = fuse(fjord_id, candidates, self.language_priority)
+        if not fields:
+            logger.warning(f"  ✗ No measurements found for fjord {fjord_id}")
             return None
+        for conflict in conflicts:
+            chosen = conflict['chosen']
+            others = ', '.join(f"{c['value']:g} ({c['language']} {c['method']})" for c in conflict['conflicting'])
+            logger.warning(f"  ! {conflict['field']}: {chosen['value']:g} ({chosen['language']} {chosen['method']}) conflicts with {others}")
+        self.conflicts.extend(conflicts)
+        
+        return self._create_fused_result(fjord_id, fields)
+    
+    def _extract_candidates(self, lang: str, url: str) -> List[Candidate]:
+        """Every value found on one page, from the infobox and from the article text."""
+        with self._page_candidates_lock:
+            if url in self._page_candidates:
+                return self._page_candidates[url]
+        
+        logger.info(f"  Reading {lang} Wikipedia: {url}")
+        try:
+            page = self._fetch_page(url)
+            if not page:
+                return []
             
-        # Find infobox
-        infobox = soup.find('table', class_='infobox')
-        if not infobox:
+            candidates = []
+            for method, measurements in (
+                ('infobox', self._extract_from_infobox(page, lang, normalize_units=True)),
+                ('text', self._extract_from_text(page, lang)),
+            ):
+                for field in FUSED_FIELDS:
+                    if measurements and field in measurements:
+                        raw = measurements[field.split('_')[0] + '_raw']
+                        candidates.append(Candidate(field, measurements[field], raw, lang, url, method))
+        except Exception as e:
+            logger.warning(f"  ✗ Error processing {lang} URL: {e}")
+            return []
+        
+        with self._page_candidates_lock:
+            self._page_candidates[url] = candidates
+        return candidates
+    
+    def _extract_from_infobox(self, page: WikipediaPage, language: str, normalize_units: bool = False) -> Optional[Dict]:
+        """Extract measurements from Wikipedia infobox."""
+        if not page.infobox_rows:
             return None
             
         measurements = {}
+        parse = self._parse_normalized_measurement if normalize_units else self._parse_measurement
         
-        # Language-specific field mappings
-        field_mappings = {
-            'no': {  # Norwegian Bokmål
-                'length': ['lengde'],
-                'depth': ['dybde', 'største dybde', 'maksimal dybde'],
-                'width': ['bredde', 'største bredde', 'maksimal bredde']
-            },
-            'nn': {  # Norwegian Nynorsk
-                'length': ['lengde'],
-                'depth': ['dybde', 'største dybde'],
-                'width': ['breidde', 'største breidde']
-            },
-            'en': {  # English
-                'length': ['max. length', 'length', 'max length'],
-                'depth': ['max. depth', 'depth', 'max depth', 'maximum depth'],
-                'width': ['max. width', 'width', 'max width', 'maximum width']
-            },
-            'da': {  # Danish
-                'length': ['længde'],
-                'depth': ['dybde', 'største dybde'],
-                'width': ['bredde', 'største bredde']
-            },
-            'ceb': {  # Cebuano (often similar to English)
-                'length': ['gitas-on', 'length'],
-                'depth': ['giladmon', 'depth'],
-                'width': ['gilapdon', 'width']
-            }
-        }
-        
-        mapping = field_mappings.get(language, field_mappings['en'])
+        mapping = INFOBOX_FIELDS.get(language, INFOBOX_FIELDS['en'])
         
         # Extract from table rows
-        for row in infobox.find_all('tr'):
-            th = row.find('th')
-            td = row.find('td')
+        for header_text, value_text in page.infobox_rows:
+            # Check for length
+            for length_field in mapping['length']:
+                if length_field in header_text:
+                    length = parse(value_text, 'length', language)
+                    if length:
+                        measurements['length_km'] = length
+                        measurements['length_raw'] = value_text
             
-            if th and td:
-                header_text = th.get_text().strip().lower()
-                value_text = td.get_text().strip()
-                
-                # Check for length
-                for length_field in mapping['length']:
-                    if length_field in header_text:
-                        length = self._parse_measurement(value_text, 'length', language)
-                        if length:
-                            measurements['length_km'] = length
-                            measurements['length_raw'] = value_text
-                
-                # Check for depth
-                for depth_field in mapping['depth']:
-                    if depth_field in header_text:
-                        depth = self._parse_measurement(value_text, 'depth', language)
-                        if depth:
-                            measurements['depth_m'] = depth
-                            measurements['depth_raw'] = value_text
-                            
-                # Check for width
-                for width_field in mapping['width']:
-                    if width_field in header_text:
-                        width = self._parse_measurement(value_text, 'width', language)
-                        if width:
-                            measurements['width_km'] = width
-                            measurements['width_raw'] = value_text
+            # Check for depth
+            for depth_field in mapping['depth']:
+                if depth_field in header_text:
+                    depth = parse(value_text, 'depth', language)
+                    if depth:
+                        measurements['depth_m'] = depth
+                        measurements['depth_raw'] = value_text
+                        
+            # Check for width
+            for width_field in mapping['width']:
+                if width_field in header_text:
+                    width = parse(value_text, 'width', language)
+                    if width:
+                        measurements['width_km'] = width
+                        measurements['width_raw'] = value_text
         
         return measurements if measurements else None
     
-    def _extract_from_text(self, url: str, language: str) -> Optional[Dict]:
+    def _extract_from_text(self, page: WikipediaPage, language: str) -> Optional[Dict]:
         """Extract measurements from Wikipedia article text."""
-        soup = self._fetch_page(url)
-        if not soup:
-            return None
-            
-        # Get main content
-        content_div = soup.find('div', {'id': 'mw-content-text'}) or soup.find('div', {'class': 'mw-parser-output'})
-        if not content_div:
+        text = page.content_text
+        if text is None:
             return None
-            
-        text = content_div.get_text()
-        measurements = {}
         
-        # Language-specific regex patterns
-        patterns = {
-            'no': {  # Norwegian Bokmål
-                'length': [
-                    r'(\d+(?:,\d+)?)\s*kilometer?\s+lang',
-                    r'(\d+(?:,\d+)?)\s*km\s+lang',
-                    r'er\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+lang',
-                    r'lengde\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)',
-                    r'(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+(?:i\s+)?lengde',
-                    r'(?:ca\.?\s*|rundt\s+|cirka\s+)?(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+lang',
-                    r'(\d+(?:,\d+)?)-(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+lang'  # ranges
-                ],
-                'depth': [
-                    r'(\d+(?:,\d+)?)\s*meter?\s+dyp',
-                    r'(\d+(?:,\d+)?)\s*m\s+dyp',
-                    r'dybde\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:meter?|m)',
-                    r'(?:ca\.?\s*|rundt\s+|cirka\s+)?(\d+(?:,\d+)?)\s*(?:meter?|m)\s+dyp',
-                    r'(\d+(?:,\d+)?)-(\d+(?:,\d+)?)\s*(?:meter?|m)\s+dyp'  # ranges
-                ]
-            },
-            'nn': {  # Norwegian Nynorsk - similar patterns
-                'length': [
-                    r'(\d+(?:,\d+)?)\s*kilometer?\s+lang',
-                    r'(\d+(?:,\d+)?)\s*km\s+lang',
-                    r'lengde\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)'
-                ],
-                'depth': [
-                    r'(\d+(?:,\d+)?)\s*meter?\s+djup',  # "djup" in Nynorsk
-                    r'(\d+(?:,\d+)?)\s*m\s+djup',
-                    r'djupne\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:meter?|m)'
-                ]
-            },
-            'en': {  # English
-                'length': [
-                    r'(\d+(?:\.\d+)?)\s*(?:kilometres?|kilometers?|km)\s+long',
-                    r'length\s+of\s+(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)',
-                    r'(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)\s+(?:in\s+)?length',
-                    r'(?:approximately|about|around)\s+(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)\s+long',
-                    r'(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)\s+long'  # ranges
-                ],
-                'depth': [
-                    r'(\d+(?:\.\d+)?)\s*(?:metres?|meters?|m)\s+deep',
-                    r'depth\s+of\s+(\d+(?:\.\d+)?)\s*(?:m|metres?|meters?)',
-                    r'(?:approximately|about|around)\s+(\d+(?:\.\d+)?)\s*(?:m|metres?|meters?)\s+deep',
-                    r'(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)\s*(?:m|metres?|meters?)\s+deep'  # ranges
-                ]
-            },
-            'da': {  # Danish - similar to Norwegian
-                'length': [
-                    r'(\d+(?:,\d+)?)\s*kilometer?\s+lang',
-                    r'(\d+(?:,\d+)?)\s*km\s+lang',
-                    r'længde\s+(?:på|af)\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)'
-                ],
-                'depth': [
-                    r'(\d+(?:,\d+)?)\s*meter?\s+dyb',
-                    r'(\d+(?:,\d+)?)\s*m\s+dyb',
-                    r'dybde\s+(?:på|af)\s+(\d+(?:,\d+)?)\s*(?:meter?|m)'
-                ]
-            }
-        }
-        
-        lang_patterns = patterns.get(language, patterns['en'])
-        
-        # Extract length
-        for pattern in lang_patterns.get('length', []):
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if '-' in pattern and len(match.groups()) > 1:
-                    # Handle ranges - take average
-                    val1 = self._parse_number(match.group(1), language)
-                    val2 = self._parse_number(match.group(2), language)
-                    if val1 and val2:
-                        length = (val1 + val2) / 2
-                else:
-                    length = self._parse_number(match.group(1), language)
-                
-                if length and self._validate_measurement(length, 'length'):
-                    measurements['length_km'] = length
-                    measurements['length_raw'] = match.group(0)
-                    break
-        
-        # Extract depth
-        for pattern in lang_patterns.get('depth', []):
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if '-' in pattern and len(match.groups()) > 1:
-                    # Handle ranges - take average
-                    val1 = self._parse_number(match.group(1), language)
-                    val2 = self._parse_number(match.group(2), language)
-                    if val1 and val2:
-                        depth = (val1 + val2) / 2
-                else:
-                    depth = self._parse_number(match.group(1), language)
-                
-                if depth and self._validate_measurement(depth, 'depth'):
-                    measurements['depth_m'] = depth
-                    measurements['depth_raw'] = match.group(0)
-                    break
+        measurements = {}
+        scanner = TEXT_SCANNERS.get(language, TEXT_SCANNERS['en'])
+        fields = {'length': ('length_km', 'length_raw'), 'depth': ('depth_m', 'depth_raw')}
+        
+        # Hits arrive grouped by pattern in list order. Each pattern contributes
+        # its first valid hit, and a later pattern's hit replaces an earlier one.
+        settled = set()
+        for hit in scanner.scan(text):
+            if hit.pattern_id in settled or hit.kind not in fields:
+                continue
+            if hit.is_range:
+                # Handle ranges - take average
+                val1 = self._parse_number(hit.match.group(1), language)
+                val2 = self._parse_number(hit.match.group(2), language)
+                value = (val1 + val2) / 2 if val1 and val2 else None
+            else:
+                value = self._parse_number(hit.match.group(1), language)
+            
+            if value and self._validate_measurement(value, hit.kind):
+                value_key, raw_key = fields[hit.kind]
+                measurements[value_key] = value
+                measurements[raw_key] = hit.match.group(0)
+                settled.add(hit.pattern_id)
+                logger.debug(f"    {hit.kind} {value} from text pattern {hit.pattern_id}: {hit.match.group(0)!r}")
         
         return measurements if measurements else None
     
-    def _fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch and parse a Wikipedia page with error handling."""
+    def _fetch_page(self, url: str) -> Optional[WikipediaPage]:
+        """Fetch a Wikipedia page once for all extraction phases, with error handling."""
         try:
-            time.sleep(self.rate_limit_delay)  # Rate limiting
-            
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            with self._host_slot(url):
+                # A page with a new revision must not come from a stale cache entry
+                ttl = 0 if url in self._changed_urls else None
+                page = WikipediaPage.fetch(url, self.cache, self.session, parser=self.parser, ttl=ttl)
             
             # Handle redirects and disambiguation
-            final_url = response.url
-            if final_url != url:
-                logger.info(f"    Redirected to: {final_url}")
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if page.redirected:
+                logger.info(f"    Redirected to: {page.final_url}")
             
             # Check for disambiguation page
-            if self._is_disambiguation_page(soup):
+            if self._is_disambiguation_page(page):
                 logger.warning(f"    Disambiguation page detected: {url}")
                 return None
                 
             # Check if page exists
-            if self._is_missing_page(soup):
+            if self._is_missing_page(page):
                 logger.warning(f"    Page not found: {url}")
                 return None
                 
-            return soup
+            return page
             
         except requests.exceptions.RequestException as e:
             logger.error(f"    Request failed for {url}: {e}")
+            self._failed_urls.add(url)
             return None
         except Exception as e:
             logger.error(f"    Unexpected error for {url}: {e}")
+            self._failed_urls.add(url)
             return None
     
-    def _is_disambiguation_page(self, soup: BeautifulSoup) -> bool:
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Semaphore capping concurrent fetches to the URL's host."""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+    
+    def _is_disambiguation_page(self, page: WikipediaPage) -> bool:
         """Check if page is a disambiguation page."""
-        # Check for disambiguation indicators
-        disambig_indicators = [
-            'disambiguation',
-            'may refer to',
-            'flertydighet',  # Norwegian
-            'flertydig',     # Norwegian
-        ]
-        
-        page_text = soup.get_text().lower()
-        return any(indicator in page_text[:1000] for indicator in disambig_indicators)
+        return page.is_disambiguation
     
-    def _is_missing_page(self, soup: BeautifulSoup) -> bool:
+    def _is_missing_page(self, page: WikipediaPage) -> bool:
         """Check if page is missing/does not exist."""
-        # Check for "page does not exist" indicators
-        missing_indicators = [
-            'page does not exist',
-            'no page with this title',
-            'siden finnes ikke',  # Norwegian
-            'artikkelen finnes ikke',  # Norwegian
-        ]
-        
-        page_text = soup.get_text().lower()
-        return any(indicator in page_text[:1000] for indicator in missing_indicators)
+        return page.is_missing
     
     def _parse_measurement(self, text: str, measurement_type: str, language: str) -> Optional[float]:
         """Parse a measurement value from text."""
@@ -419,6 +486,45 @@ class SupabaseFjordExtractor:
         
         return value if self._validate_measurement(value, measurement_type) else None
     
+    def _parse_normalized_measurement(self, text: str, measurement_type: str, language: str) -> Optional[float]:
+        """Parse a measurement value from text, in km (length, width) or m (depth).
+        
+        Used by fusion mode, which compares values across sources: the unit
+        written after the number is converted, thousands separators are
+        dropped, and widths (in km) are checked against the length range.
+        """
+        # Drop thousands separators: "1 308 m", and "1,308 m" where comma isn't the decimal mark
+        text = THOUSANDS_SPACE.sub('', text)
+        if language not in ['no', 'nn', 'da']:
+            text = THOUSANDS_COMMA.sub('', text)
+        
+        # Clean the text (same length, so positions still line up with `text`)
+        cleaned = re.sub(r'[^\d.,\s]', ' ', text)
+        
+        # Extract number
+        if language in ['no', 'nn', 'da']:  # Norwegian/Danish use comma as decimal separator
+            number_match = re.search(r'(\d+(?:,\d+)?)', cleaned)
+        else:  # English uses period
+            number_match = re.search(r'(\d+(?:\.\d+)?)', cleaned)
+            
+        if not number_match:
+            return None
+            
+        number_str = number_match.group(1)
+        value = self._parse_number(number_str, language)
+        
+        if not value:
+            return None
+            
+        # Convert by the unit written right after the number, e.g. "800 m (2,600 ft)"
+        unit_match = UNIT_AFTER_NUMBER.match(text, number_match.end())
+        if unit_match:
+            units = DEPTH_UNITS if measurement_type == 'depth' else LENGTH_UNITS
+            value *= units.get(unit_match.group(1).lower(), 1)
+        
+        kind = 'length' if measurement_type == 'width' else measurement_type
+        return value if self._validate_measurement(value, kind) else None
+    
     def _parse_number(self, number_str: str, language: str) -> Optional[float]:
         """Parse a number string considering language-specific decimal separators."""
         try:
@@ -460,124 +566,253 @@ class SupabaseFjordExtractor:
         
         return result
     
-    def process_fjords(self) -> None:
-        """Process all fjords from Supabase database."""
+    def _create_fused_result(self, fjord_id: int, fields: Dict) -> Dict:
+        """A standard result for the fused values, with per-field sources and confidence.
+        
+        The top-level source and method are those of the best-ranked field.
+        """
+        measurements = {}
+        for field, fused in fields.items():
+            measurements[field] = fused.value
+            measurements[field.split('_')[0] + '_raw'] = fused.source.raw
+        
+        primary = min((fused.source for fused in fields.values()), key=lambda c: source_rank(c, self.language_priority))
+        
+        result = self._create_result(fjord_id, measurements, primary.language, primary.url, primary.method)
+        result['extraction_metadata']['fields'] = {
+            field: {
+                'source_language': fused.source.language,
+                'source_url': fused.source.url,
+                'extraction_method': fused.source.method,
+                'confidence': fused.confidence,
+                'sources': 1 + len(fused.agreeing) + len(fused.conflicting),
+                'conflict': bool(fused.conflicting),
+            }
+            for field, fused in fields.items()
+        }
+        return result
+    
+    def process_fjords(self, workers: int = 1, full: bool = False, fuse: bool = False) -> None:
+        """Process fjords from Supabase database.
+        
+        Only fjords with a new or changed source page are processed unless
+        `full` is set. With more than one worker, language pages are fetched
+        concurrently (see _process_concurrently); results are the same as the
+        serial run. `fuse` reconciles every language instead of taking the
+        first one with measurements (see extract_fused).
+        """
         logger.info("Starting fjord extraction from Supabase")
         
         # Fetch fjords from database
         fjords = self.fetch_fjords_from_supabase()
+        fjords = self._select_changed(fjords, full)
+        self._processed = fjords
         total_fjords = len(fjords)
         successful_extractions = 0
         
         logger.info(f"Processing {total_fjords} fjords")
         
-        for i, fjord_data in enumerate(fjords, 1):
-            logger.info(f"Progress: {i}/{total_fjords}")
-            
-            result = self.extract_from_fjord_data(fjord_data)
+        self.fused = fuse
+        if fuse:
+            results = self._process_fused(fjords, workers)
+        elif workers > 1:
+            results = self._process_concurrently(fjords, workers)
+        else:
+            results = self._process_serially(fjords)
+        
+        for result in results:
             if result:
                 self.results.append(result)
                 successful_extractions += 1
                 
         logger.info(f"Extraction complete: {successful_extractions}/{total_fjords} successful")
         
+    def _select_changed(self, fjords: List[Dict], full: bool) -> List[Dict]:
+        """Fjords with at least one page that is new or has a new revision."""
+        urls = [url for fjord_data in fjords for _, url in self._language_urls(fjord_data)]
+        try:
+            self._current_revisions = current_revisions(urls)
+        except Exception as e:
+            logger.warning(f"Could not fetch page revisions, processing every fjord: {e}")
+            self._current_revisions = {}
+        
+        self._changed_urls = {
+            url for url in urls if self.revision_state.changed(url, self._current_revisions.get(url))
+        }
+        if full:
+            return fjords
+        
+        changed = [
+            fjord_data for fjord_data in fjords
+            if any(url in self._changed_urls for _, url in self._language_urls(fjord_data))
+        ]
+        logger.info(f"{len(changed)} of {len(fjords)} fjords have new or changed Wikipedia pages")
+        return changed
+    
+    def _record_revisions(self) -> None:
+        """Remember the page revisions of every fjord processed without fetch errors."""
+        for fjord_data in self._processed:
+            urls = [url for _, url in self._language_urls(fjord_data)]
+            if any(url in self._failed_urls for url in urls):
+                continue
+            for url in urls:
+                self.revision_state.record(url, self._current_revisions.get(url))
+        self.revision_state.save()
+    
+    def _process_serially(self, fjords: List[Dict]):
+        for i, fjord_data in enumerate(fjords, 1):
+            logger.info(f"Progress: {i}/{len(fjords)}")
+            yield self.extract_from_fjord_data(fjord_data)
+            
+    def _process_concurrently(self, fjords: List[Dict], workers: int):
+        """Fetch the language pages of many fjords at once through a bounded thread pool.
+        
+        All attempts share the pooled session, the per-host fetch slots and the
+        rate limiter's per-host token buckets, so different Wikipedia hosts
+        progress in parallel while each stays within its limits.
+        """
+        adapter = HTTPAdapter(pool_connections=len(self.language_priority), pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        jobs = [_FjordJob(fjord_data, self._language_urls(fjord_data)) for fjord_data in fjords]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Submitted highest priority first, so the pool works down each fjord's languages
+            for job in jobs:
+                job.start(executor, self._extract_language)
+            for i, job in enumerate(jobs, 1):
+                result = job.wait()
+                fjord_data = job.fjord_data
+                if result:
+                    lang = result['extraction_metadata']['source_language']
+                    logger.info(f"Progress: {i}/{len(jobs)} - fjord {fjord_data['id']} ({fjord_data['name']}): {lang}")
+                else:
+                    logger.warning(f"Progress: {i}/{len(jobs)} - ✗ No measurements found for fjord {fjord_data['id']}")
+                yield result
+        
+    def _process_fused(self, fjords: List[Dict], workers: int):
+        """Fusion mode: fjords run side by side, each one's languages in priority order.
+        
+        Within a fjord, whether the next language is needed depends on what the
+        previous ones found, so pages are never fetched speculatively; the pool
+        keeps many fjords' fetches in flight instead.
+        """
+        if workers <= 1:
+            for i, fjord_data in enumerate(fjords, 1):
+                logger.info(f"Progress: {i}/{len(fjords)}")
+                yield self.extract_fused(fjord_data)
+            return
+        
+        adapter = HTTPAdapter(pool_connections=len(self.language_priority), pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for i, result in enumerate(executor.map(self.extract_fused, fjords), 1):
+                logger.info(f"Progress: {i}/{len(fjords)}")
+                yield result
+        
     def save_results(self) -> None:
-        """Save results to CSV and JSON files in tools directory."""
-        # Save to CSV
-        csv_filename = 'tools/fjord_measurements.csv'
-        self._save_to_csv(csv_filename)
+        """Upsert this run's results into the result store, in one transaction."""
+        self.store.put_many(self._store_item(result) for result in self.results)
+        
+        if self.fused:
+            self._save_conflicts()
+        
+        # Revisions last, so a failed save means the next run redoes these fjords
+        self._record_revisions()
+        
+        logger.info(f"{len(self.results)} results saved to {RESULTS_DB}, revisions to {REVISIONS_FILE}")
+        
+    def export_results(self) -> None:
+        """Write the JSON and CSV exports (and conflicts, if any) from the result store."""
+        count = self.store.export_json(RESULTS_JSON_FILE, keyed=True)
+        self.store.export_csv(RESULTS_CSV_FILE)
+        exported = f"{RESULTS_JSON_FILE} and {RESULTS_CSV_FILE}"
+        if len(self.conflict_store):
+            self.conflict_store.export_json(CONFLICTS_FILE, keyed=True)
+            exported += f", conflicts to {CONFLICTS_FILE}"
+        logger.info(f"Exported {count} results to {exported}")
+    
+    def _store_item(self, result: Dict) -> Tuple:
+        """(fjord_id, record, CSV row, language, method) for ResultStore.put_many."""
+        metadata = result['extraction_metadata']
+        return (
+            result['fjord_id'],
+            result,
+            self._csv_row(result),
+            metadata['source_language'],
+            metadata['extraction_method'],
+        )
+    
+    def _csv_row(self, result: Dict) -> Dict:
+        """Flatten a result for the CSV export."""
+        csv_row = {
+            'fjord_id': result['fjord_id'],
+            'timestamp': result['extraction_metadata']['timestamp']
+        }
         
-        # Save to JSON
-        json_filename = 'tools/fjord_measurements.json'
-        self._save_to_json(json_filename)
+        # Add measurements
+        for key, value in result.items():
+            if key != 'extraction_metadata':
+                if key.endswith('_km') or key.endswith('_m'):
+                    csv_row[key] = value
         
-        logger.info(f"Results saved to {csv_filename} and {json_filename}")
+        # Add metadata
+        metadata = result['extraction_metadata']
+        csv_row.update({
+            'source_language': metadata['source_language'],
+            'source_url': metadata['source_url'],
+            'extraction_method': metadata['extraction_method'],
+            'confidence': metadata['confidence']
+        })
         
-    def _save_to_csv(self, filename: str) -> None:
-        """Save results to CSV format with update logic."""
-        existing_data = {}
+        # Add raw text if available
+        for key, value in metadata.items():
+            if key.endswith('_raw'):
+                csv_row[key] = value
         
-        # Load existing data if file exists
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    fjord_id = int(row['fjord_id'])
-                    existing_data[fjord_id] = row
-        except FileNotFoundError:
-            pass
+        # Per-field confidence of fused results
+        for field, info in metadata.get('fields', {}).items():
+            csv_row[f'{field}_confidence'] = info['confidence']
         
-        # Update with new results
-        for result in self.results:
-            fjord_id = result['fjord_id']
-            
-            # Flatten the result for CSV
-            csv_row = {
-                'fjord_id': fjord_id,
-                'timestamp': result['extraction_metadata']['timestamp']
-            }
-            
-            # Add measurements
-            for key, value in result.items():
-                if key != 'extraction_metadata':
-                    if key.endswith('_km') or key.endswith('_m'):
-                        csv_row[key] = value
-            
-            # Add metadata
-            metadata = result['extraction_metadata']
-            csv_row.update({
-                'source_language': metadata['source_language'],
-                'source_url': metadata['source_url'],
-                'extraction_method': metadata['extraction_method'],
-                'confidence': metadata['confidence']
-            })
-            
-            # Add raw text if available
-            for key, value in metadata.items():
-                if key.endswith('_raw'):
-                    csv_row[key] = value
-            
-            existing_data[fjord_id] = csv_row
-        
-        # Write updated data
-        if existing_data:
-            fieldnames = set()
-            for row in existing_data.values():
-                fieldnames.update(row.keys())
-            fieldnames = sorted(fieldnames)
-            
-            with open(filename, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for fjord_id in sorted(existing_data.keys()):
-                    writer.writerow(existing_data[fjord_id])
+        return csv_row
     
-    def _save_to_json(self, filename: str) -> None:
-        """Save results to JSON format with update logic."""
-        existing_data = {}
-        
-        # Load existing data if file exists
+    def _import_json(self, filename: str) -> None:
+        """Seed an empty result store from a JSON file written by earlier versions."""
         try:
             with open(filename, 'r', encoding='utf-8') as f:
                 existing_data = json.load(f)
         except FileNotFoundError:
-            pass
-        
-        # Update with new results
-        for result in self.results:
-            fjord_id = str(result['fjord_id'])  # JSON keys are strings
-            existing_data[fjord_id] = result
+            return
         
-        # Write updated data
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
+        self.store.put_many(self._store_item(result) for result in existing_data.values())
+        logger.info(f"Imported {len(existing_data)} results from {filename} into {RESULTS_DB}")
+    
+    def _save_conflicts(self) -> None:
+        """Store conflict records by fjord, replacing those of every reprocessed fjord."""
+        by_fjord = {}
+        for conflict in self.conflicts:
+            by_fjord.setdefault(conflict['fjord_id'], []).append(conflict)
+        
+        self.conflict_store.delete_many(fjord_data['id'] for fjord_data in self._processed)
+        self.conflict_store.put_many((fjord_id, conflicts, None, None, None) for fjord_id, conflicts in by_fjord.items())
 
 def main():
+    parser = argparse.ArgumentParser(description='Extract fjord measurements from Wikipedia')
+    parser.add_argument('--workers', type=int, default=1, help='concurrent page fetches (1 = one fjord at a time)')
+    parser.add_argument('--max-per-host', type=int, default=2, help='concurrent fetches per Wikipedia host')
+    parser.add_argument('--full', action='store_true', help='reprocess every fjord, not only those with changed pages')
+    parser.add_argument('--fuse', action='store_true', help='reconcile values across languages instead of taking the first hit')
+    parser.add_argument('--export', action='store_true', help=f'write {RESULTS_JSON_FILE} and {RESULTS_CSV_FILE} from the result store')
+    args = parser.parse_args()
+    
     try:
-        extractor = SupabaseFjordExtractor(rate_limit_delay=1.0)
+        extractor = SupabaseFjordExtractor(requests_per_second=1.0, max_per_host=args.max_per_host)
         
-        extractor.process_fjords()
+        extractor.process_fjords(workers=args.workers, full=args.full, fuse=args.fuse)
         extractor.save_results()
+        if args.export:
+            extractor.export_results()
         
         logger.info(f"Extraction completed successfully!")
         logger.info(f"Total results: {len(extractor.results)}")
@@ -605,6 +840,10 @@ def main():
         logger.info(f"  Languages: {languages}")
         logger.info(f"  Methods: {methods}")
         logger.info(f"  Measurements: {measurements}")
+        if args.fuse:
+            logger.info(f"  Conflicts: {len(extractor.conflicts)}")
+        logger.info(extractor.cache.summary())
+        logger.info(extractor.limiter.summary())
         
     except Exception as e:
         logger.error(f"Extraction failed: {e}")
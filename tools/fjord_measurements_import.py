@@ -1,9 +1,12 @@
+import argparse
 import json
 import os
-import requests
 from typing import Dict, List, Tuple
 from dotenv import load_dotenv
 
+from result_store import ResultStore
+from supabase_rest import DEFAULT_BATCH_SIZE, FJORD_REQUIRED_COLUMNS, SupabaseRest
+
 def validate_measurement(fjord_id: int, measurement_type: str, value: float) -> bool:
     bounds = {
         'length_km': (0.5, 200),
@@ -46,24 +49,22 @@ def process_measurements(data: Dict) -> Tuple[List[Dict], List[Dict]]:
     
     return valid, invalid
 
-def insert_measurements(valid_measurements: List[Dict], supabase_url: str, service_key: str):
-    headers = {
-        'apikey': service_key,
-        'Authorization': f'Bearer {service_key}',
-        'Content-Type': 'application/json',
-        'Prefer': 'return=minimal'
-    }
+def build_update(entry: Dict) -> Dict:
+    update_data = {}
+    
+    for field in ['length_km', 'width_km', 'depth_m']:
+        if field in entry:
+            update_data[field] = entry[field]
     
+    if 'source_url' in entry:
+        update_data['measurement_source_url'] = entry['source_url']
+    
+    return update_data
+
+def insert_measurements(valid_measurements: List[Dict], supabase_url: str, service_key: str):
     for entry in valid_measurements:
         fjord_id = entry['fjord_id']
-        update_data = {}
-        
-        for field in ['length_km', 'width_km', 'depth_m']:
-            if field in entry:
-                update_data[field] = entry[field]
-        
-        if 'source_url' in entry:
-            update_data['measurement_source_url'] = entry['source_url']
+        update_data = build_update(entry)
         
         if update_data:
             updates = []
@@ -73,32 +74,64 @@ def insert_measurements(valid_measurements: List[Dict], supabase_url: str, servi
                 else:
                     updates.append(f"{k} = '{v}'")
             print(f"UPDATE fjords SET {', '.join(updates)} WHERE id = {fjord_id};")
-            # url = f"{supabase_url}/rest/v1/fjords?id=eq.{fjord_id}"
-            # requests.patch(url, json=update_data, headers=headers)
+
+def apply_measurements(valid_measurements: List[Dict], supabase_url: str, service_key: str,
+                       batch_size: int = DEFAULT_BATCH_SIZE):
+    """Write measurements with chunked upserts instead of printing SQL."""
+    rest = SupabaseRest(supabase_url, service_key)
+    updates = []
+    for entry in valid_measurements:
+        update_data = build_update(entry)
+        if update_data:
+            updates.append({'id': entry['fjord_id'], **update_data})
+    
+    # Upsert rows must carry the NOT NULL columns; they're read per chunk
+    report = rest.upsert('fjordle_fjords', updates, batch_size=batch_size,
+                         required_columns=FJORD_REQUIRED_COLUMNS)
+    for outcome in report.failed:
+        print(f"Failed to update fjord {outcome.key}: {outcome.error}")
+    print(report.summary())
+    return report
 
 def main():
+    parser = argparse.ArgumentParser(description='Import extracted fjord measurements')
+    parser.add_argument('--apply', action='store_true',
+                        help='write to fjordle_fjords with bulk upserts instead of printing SQL')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'rows per upsert request with --apply (default: {DEFAULT_BATCH_SIZE})')
+    args = parser.parse_args()
+    
     env_paths = ['.env.local', '../.env.local', '../../.env.local']
     for env_path in env_paths:
         if os.path.exists(env_path):
             load_dotenv(env_path)
             break
     
-    json_paths = ['fjord_measurements.json', 'tools/fjord_measurements.json', '../fjord_measurements.json']
+    # The extractor's result store, or a JSON export of it
     data = None
-    for json_path in json_paths:
-        if os.path.exists(json_path):
-            with open(json_path, 'r') as f:
-                data = json.load(f)
+    for db_path in ['fjord_measurements.sqlite', 'tools/fjord_measurements.sqlite', '../fjord_measurements.sqlite']:
+        if os.path.exists(db_path):
+            data = ResultStore(db_path, 'measurements').records()
             break
+    else:
+        json_paths = ['fjord_measurements.json', 'tools/fjord_measurements.json', '../fjord_measurements.json']
+        for json_path in json_paths:
+            if os.path.exists(json_path):
+                with open(json_path, 'r') as f:
+                    data = json.load(f)
+                break
     
     if data is None:
-        raise FileNotFoundError("fjord_measurements.json not found")
+        raise FileNotFoundError("fjord_measurements.sqlite or fjord_measurements.json not found")
     
     valid, invalid = process_measurements(data)
     
     supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
     service_key = os.getenv('SUPABASE_SECRET_KEY')
-    insert_measurements(valid, supabase_url, service_key)
+    if args.apply:
+        apply_measurements(valid, supabase_url, service_key, args.batch_size)
+    else:
+        insert_measurements(valid, supabase_url, service_key)
     
     return valid, invalid
 
@@ -1,27 +1,196 @@
+import argparse
 import os
-import requests
-import re
 import math
-import time
 import json
 import csv
-from supabase import create_client, Client
+import sys
 from dotenv import load_dotenv
 
+from geodesy import haversine_km
+from http_cache import get_default_cache
+from mediawiki import MAXLAG, MediaWikiBatch
+from rate_limit import get_default_limiter
+from result_store import ResultStore
+from run_journal import RunJournal
+from spatial_index import FjordIndex
+from supabase_rest import FJORD_REQUIRED_COLUMNS, SupabaseRest
+from wiki_coordinates import (
+    GEO_SPAN_PATTERN,
+    CoordinateStats,
+    extract_html_coordinates,
+    geodata_coordinates,
+)
+
 load_dotenv(".env.local")
 
-url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key = os.environ.get("SUPABASE_SECRET_KEY")
+# Language priority: Bokmål -> Nynorsk -> English -> Danish -> Cebuano
+SEARCH_LANGUAGES = ["nb", "nn", "en", "da", "ceb"]
+
+LANGUAGE_NAMES = {
+    "nb": "Norwegian Bokmål",
+    "nn": "Norwegian Nynorsk",
+    "en": "English",
+    "da": "Danish",
+    "ceb": "Cebuano",
+}
+
+WIKIPEDIA_API_URLS = {
+    "nb": "https://no.wikipedia.org/w/api.php",
+    "nn": "https://nn.wikipedia.org/w/api.php",
+    "da": "https://da.wikipedia.org/w/api.php",
+    "ceb": "https://ceb.wikipedia.org/w/api.php",
+    "en": "https://en.wikipedia.org/w/api.php",
+}
+
+WIKIPEDIA_PAGE_HOSTS = {
+    "nb": "https://no.wikipedia.org",
+    "nn": "https://nn.wikipedia.org",
+    "da": "https://da.wikipedia.org",
+    "ceb": "https://ceb.wikipedia.org",
+    "en": "https://en.wikipedia.org",
+}
+
+FJORD_CATEGORY_PATTERNS = {
+    "nb": ["fjorder i", "sund i", "våger i", "botner i", "pollen i"],
+    "nn": ["fjorder i", "sund i", "våger i", "botner i", "pollen i"],
+    "da": ["fjorde i", "sunde i", "bugter i"],
+    "ceb": ["mga fjord", "mga dagat", "tubig"],
+    "en": ["fjords", "inlets", "bays", "sounds"],
+}
+
+MAX_MATCH_DISTANCE_KM = 10.0
+
+# Results live next to this script (tools/), wherever it is run from
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DB = os.path.join(TOOLS_DIR, "fjord_wikipedia_matches.sqlite")
+RESULTS_JSON_FILE = os.path.join(TOOLS_DIR, "fjord_wikipedia_matches.json")
+RESULTS_CSV_FILE = os.path.join(TOOLS_DIR, "fjord_wikipedia_matches.csv")
+JOURNAL_FILE = os.path.join(TOOLS_DIR, "fjord_wikipedia_matches.journal.jsonl")
+
+# Columns of the CSV export
+RESULTS_CSV_HEADERS = [
+    "fjord_id",
+    "fjord_name",
+    "fjord_lat",
+    "fjord_lng",
+    "svg_filename",
+    "fjord_coords",
+    "fjord_maps_url",
+    "wiki_url_nb",
+    "wiki_url_nn",
+    "wiki_url_en",
+    "wiki_url_da",
+    "wiki_url_ceb",
+    "wiki_lat",
+    "wiki_lng",
+    "wiki_coords",
+    "wiki_maps_url",
+    "distance_km",
+    "coordinate_source",
+    "match_source",
+    "match",
+]
+
+# Tables whose fjord_id marks a fjord as used in a puzzle
+PUZZLE_TABLES = {"fjordle_puzzle_queue": "fjord_id", "fjordle_daily_puzzles": "fjord_id"}
+
+
+def get_rest_client():
+    url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SECRET_KEY")
+
+    print(f"URL: {url}")
+    print(f"Key present: {bool(key)}")
+    print(f"Env file exists: {os.path.exists('.env.local')}")
+
+    if not url:
+        print("NEXT_PUBLIC_SUPABASE_URL not found in environment")
+        exit(1)
+
+    return SupabaseRest(url, key)
+
+
+def api_url_for(language):
+    return WIKIPEDIA_API_URLS.get(language, WIKIPEDIA_API_URLS["nb"])
+
+
+_wiki_batches = {}
+coordinate_stats = CoordinateStats()
+
+
+def wiki_batch(language):
+    """Shared batched page lookup (categories, langlinks, coordinates) for a language"""
+    api_url = api_url_for(language)
+    if api_url not in _wiki_batches:
+        _wiki_batches[api_url] = MediaWikiBatch(api_url, cache=get_default_cache())
+    return _wiki_batches[api_url]
+
+
+def wiki_page_url(language, title):
+    return f"{WIKIPEDIA_PAGE_HOSTS[language]}/wiki/{title.replace(' ', '_')}"
+
+
+def search_terms_for(fjord_name):
+    """Name variants to search for, with and without the definite suffix"""
+    search_terms = [fjord_name]
+    if not fjord_name.endswith("en"):
+        search_terms.append(fjord_name + "en")
+    if fjord_name.endswith("en"):
+        search_terms.append(fjord_name[:-2])
+    return search_terms
+
 
-print(f"URL: {url}")
-print(f"Key present: {bool(key)}")
-print(f"Env file exists: {os.path.exists('.env.local')}")
+def has_fjord_category(categories, language):
+    """Check category dicts from the MediaWiki API against the fjord patterns"""
+    patterns = FJORD_CATEGORY_PATTERNS.get(language, FJORD_CATEGORY_PATTERNS["nb"])
+    for cat in categories:
+        cat_title = cat.get("title", "").lower()
+        if any(pattern in cat_title for pattern in patterns):
+            return True
+    return False
 
-if not url:
-    print("NEXT_PUBLIC_SUPABASE_URL not found in environment")
-    exit(1)
 
-supabase: Client = create_client(url, key)
+def parse_langlinks(langlinks):
+    """Map langlinks from the MediaWiki API to page URLs for the languages we track"""
+    links = {}
+    for link in langlinks:
+        lang = link.get("lang")
+        title = link.get("*")
+        if lang and title and lang in WIKIPEDIA_PAGE_HOSTS:
+            links[lang] = wiki_page_url(lang, title)
+    return links
+
+
+def empty_search_result():
+    return {
+        "wiki_url_nb": None,
+        "wiki_url_nn": None,
+        "wiki_url_en": None,
+        "wiki_url_da": None,
+        "wiki_url_ceb": None,
+        "wiki_lat": None,
+        "wiki_lng": None,
+        "distance_km": None,
+        "coordinate_source": None,
+        "match_source": None,
+        "match": False,
+    }
+
+
+def apply_match(result, lang, url, lat, lon, dist, interlang_links):
+    """Fill a search result from a coordinate match and its interlanguage links"""
+    result[f"wiki_url_{lang}"] = url
+    for link_lang, link_url in interlang_links.items():
+        if f"wiki_url_{link_lang}" in result:
+            result[f"wiki_url_{link_lang}"] = link_url
+
+    result["wiki_lat"] = lat
+    result["wiki_lng"] = lon
+    result["distance_km"] = dist
+    result["coordinate_source"] = lang
+    result["match_source"] = lang
+    result["match"] = True
+    return result
 
 
 def decimal_to_dms(decimal_degrees):
@@ -33,11 +202,6 @@ def decimal_to_dms(decimal_degrees):
     return degrees, minutes, seconds
 
 
-def dms_to_decimal(degrees, minutes, seconds):
-    """Convert degrees, minutes, seconds to decimal degrees"""
-    return degrees + minutes / 60 + seconds / 3600
-
-
 def distance_km(lat1, lon1, lat2, lon2):
     """Calculate distance between two coordinates in kilometers"""
     R = 6371  # Earth radius in km
@@ -57,218 +221,59 @@ def distance_km(lat1, lon1, lat2, lon2):
 
 def extract_wikipedia_coordinates(page_content, language="nb"):
     """Extract coordinates from Wikipedia page content for different languages"""
-    patterns = []
-
-    if language == "nb":
-        patterns.extend(
-            [
-                r'<span class="latitude">(\d+)°(\d+)′([\d,]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,]+)″Ø</span>',
-                r'<span class="geo-dms"[^>]*>.*?<span class="latitude">(\d+)°(\d+)′([\d,]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,]+)″Ø</span>',
-                r'<span class="geo-dms"[^>]*>.*?<span class="latitude">(\d+)°(\d+)′(\d+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′(\d+)″(?:Ø|E)</span>',
-                r'<span class="geo-dec"[^>]*>([\d,]+)°N\s*([\d,]+)°Ø',
-            ]
-        )
-    elif language == "nn":
-        patterns.extend(
-            [
-                r'<span class="latitude">(\d+)°(\d+)′([\d,]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,]+)″Ø</span>',
-                r'<span class="geo-dms"[^>]*>.*?<span class="latitude">(\d+)°(\d+)′([\d,]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,]+)″Ø</span>',
-                r'<span class="geo-dms"[^>]*>.*?<span class="latitude">(\d+)°(\d+)′(\d+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′(\d+)″(?:Ø|E)</span>',
-                r'<span class="geo-dec"[^>]*>([\d,]+)°N\s*([\d,]+)°Ø',
-            ]
-        )
-    elif language == "da":
-        patterns.extend(
-            [
-                r'<span class="geo-dms"[^>]*>.*?<span class="latitude">(\d+)°(\d+)′([\d,\.]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,\.]+)″(?:Ø|E)</span>',
-                r'<span class="geo-dec"[^>]*>([\d,\.]+)°N\s*([\d,\.]+)°[ØE]',
-            ]
-        )
-    elif language == "ceb":
-        patterns.extend(
-            [
-                r'<span class="geo-dms"[^>]*>.*?<span class="latitude">(\d+)°(\d+)′([\d\.]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d\.]+)″E</span>',
-                r'<span class="geo-dec"[^>]*>([\d\.]+)°N\s*([\d\.]+)°E',
-            ]
-        )
-    elif language == "en":
-        patterns.extend(
-            [
-                r'<span class="geo-dms"[^>]*>.*?<span class="latitude">(\d+)°(\d+)′([\d\.]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d\.]+)″E</span>',
-                r'<span class="geo-dec"[^>]*>([\d\.]+)°N\s*([\d\.]+)°E',
-            ]
-        )
-
-    patterns.extend(
-        [
-            r'<span class="geo-dms"[^>]*>.*?(\d+)°(\d+)′([\d\.,]+)″N\s*(\d+)°(\d+)′([\d\.,]+)″[EØ]',
-            r"([\d,\.]+)\s*°\s*N[^0-9]*([\d,\.]+)\s*°\s*[EØ]",
-        ]
-    )
-
-    for pattern in patterns:
-        match = re.search(pattern, page_content, re.DOTALL | re.IGNORECASE)
-        if match:
-            groups = match.groups()
-            try:
-                if len(groups) == 6:
-                    lat_deg, lat_min, lat_sec_str, lon_deg, lon_min, lon_sec_str = (
-                        groups
-                    )
-                    lat_sec = float(lat_sec_str.replace(",", "."))
-                    lon_sec = float(lon_sec_str.replace(",", "."))
-                    lat_decimal = dms_to_decimal(int(lat_deg), int(lat_min), lat_sec)
-                    lon_decimal = dms_to_decimal(int(lon_deg), int(lon_min), lon_sec)
-                    return lat_decimal, lon_decimal
-                elif len(groups) == 2:
-                    lat_str, lon_str = groups
-                    lat_decimal = float(lat_str.replace(",", "."))
-                    lon_decimal = float(lon_str.replace(",", "."))
-                    return lat_decimal, lon_decimal
-            except (ValueError, TypeError):
-                continue
-
-    return None, None
+    return extract_html_coordinates(page_content, language)
 
 
 def get_interlanguage_links(page_title, source_lang="nb"):
     """Get interlanguage links from a Wikipedia page"""
     try:
-        # Map language codes to API URLs
-        api_urls = {
-            "nb": "https://no.wikipedia.org/w/api.php",
-            "nn": "https://nn.wikipedia.org/w/api.php",
-            "da": "https://da.wikipedia.org/w/api.php",
-            "ceb": "https://ceb.wikipedia.org/w/api.php",
-            "en": "https://en.wikipedia.org/w/api.php",
-        }
-
-        api_url = api_urls.get(source_lang, "https://no.wikipedia.org/w/api.php")
-
-        params = {
-            "action": "query",
-            "prop": "langlinks",
-            "titles": page_title,
-            "lllimit": 100,
-            "format": "json",
-        }
-
-        response = requests.get(api_url, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            pages = data.get("query", {}).get("pages", {})
-
-            links = {}
-            for page in pages.values():
-                if "missing" in page:
-                    continue
-
-                langlinks = page.get("langlinks", [])
-                for link in langlinks:
-                    lang = link.get("lang")
-                    title = link.get("*")
-                    if lang and title:
-                        # Create URLs for each language
-                        if lang in ["nb"]:
-                            links["nb"] = (
-                                f"https://no.wikipedia.org/wiki/{title.replace(' ', '_')}"
-                            )
-                        elif lang == "nn":
-                            links["nn"] = (
-                                f"https://nn.wikipedia.org/wiki/{title.replace(' ', '_')}"
-                            )
-                        elif lang == "da":
-                            links["da"] = (
-                                f"https://da.wikipedia.org/wiki/{title.replace(' ', '_')}"
-                            )
-                        elif lang == "ceb":
-                            links["ceb"] = (
-                                f"https://ceb.wikipedia.org/wiki/{title.replace(' ', '_')}"
-                            )
-                        elif lang == "en":
-                            links["en"] = (
-                                f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
-                            )
-
-            return links
-        return {}
+        return parse_langlinks(wiki_batch(source_lang).langlinks(page_title))
     except Exception as e:
         print(f"    Error getting interlanguage links: {e}")
         return {}
 
 
-def check_coordinates_in_page(url, language, fjord_lat, fjord_lng):
-    """Check coordinates in a specific Wikipedia page"""
+def check_coordinates_in_page(url, language, fjord_lat, fjord_lng, title=None):
+    """Check coordinates of a Wikipedia page, from GeoData when the API has them"""
+    if title:
+        try:
+            lat, lon = geodata_coordinates(wiki_batch(language).page(title))
+        except Exception as e:
+            print(f"    Error getting GeoData for {title}: {e}")
+            lat, lon = None, None
+        if lat is not None:
+            coordinate_stats.record("geodata")
+            dist = distance_km(fjord_lat, fjord_lng, lat, lon)
+            print(f"    GeoData: {lat}, {lon} (distance: {dist:.2f}km)")
+            return lat, lon, dist
+
     try:
-        response = requests.get(url, timeout=10)
+        response = get_default_cache().get(url, timeout=10)
         if response.status_code == 200:
             print(f"    Checking coordinates in: {url}")
             lat, lon = extract_wikipedia_coordinates(response.text, language)
             if lat and lon:
+                coordinate_stats.record("html")
                 dist = distance_km(fjord_lat, fjord_lng, lat, lon)
                 print(f"    Extracted: {lat}, {lon} (distance: {dist:.2f}km)")
                 return lat, lon, dist
             else:
                 print(f"    No coordinates extracted from page")
                 # Debug: show a snippet of geo content
-                coord_pattern = r'<span class="geo[^>]*>.*?</span>'
-                coord_matches = re.findall(
-                    coord_pattern, response.text, re.DOTALL | re.IGNORECASE
-                )
-                if coord_matches:
-                    print(f"    Found {len(coord_matches)} geo spans, first one:")
-                    print(f"    {coord_matches[0][:200]}...")
+                coord_match = GEO_SPAN_PATTERN.search(response.text)
+                if coord_match:
+                    print(f"    Found geo span: {coord_match.group(0)[:200]}...")
     except Exception as e:
         print(f"    Error checking coordinates in {url}: {e}")
 
+    coordinate_stats.record("none")
     return None, None, None
 
 
 def check_fjord_categories(page_title, language="nb"):
     """Check if Wikipedia page has fjord-related categories"""
     try:
-        api_urls = {
-            "nb": "https://no.wikipedia.org/w/api.php",
-            "nn": "https://nn.wikipedia.org/w/api.php",
-            "da": "https://da.wikipedia.org/w/api.php",
-            "ceb": "https://ceb.wikipedia.org/w/api.php",
-            "en": "https://en.wikipedia.org/w/api.php",
-        }
-
-        fjord_patterns = {
-            "nb": ["fjorder i", "sund i", "våger i", "botner i", "pollen i"],
-            "nn": ["fjorder i", "sund i", "våger i", "botner i", "pollen i"],
-            "da": ["fjorde i", "sunde i", "bugter i"],
-            "ceb": ["mga fjord", "mga dagat", "tubig"],
-            "en": ["fjords", "inlets", "bays", "sounds"],
-        }
-
-        api_url = api_urls.get(language, "https://no.wikipedia.org/w/api.php")
-        patterns = fjord_patterns.get(language, fjord_patterns["nb"])
-
-        params = {
-            "action": "query",
-            "prop": "categories",
-            "titles": page_title,
-            "format": "json",
-            "cllimit": 100,
-        }
-
-        response = requests.get(api_url, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            pages = data.get("query", {}).get("pages", {})
-
-            for page in pages.values():
-                if "missing" in page:
-                    continue
-
-                categories = page.get("categories", [])
-                for cat in categories:
-                    cat_title = cat.get("title", "").lower()
-                    if any(pattern in cat_title for pattern in patterns):
-                        return True
-        return False
+        return has_fjord_category(wiki_batch(language).categories(page_title), language)
     except Exception as e:
         print(f"    Error checking categories: {e}")
         return False
@@ -276,24 +281,9 @@ def check_fjord_categories(page_title, language="nb"):
 
 def search_wikipedia_language(fjord_name, language, fjord_lat, fjord_lng):
     """Search a specific Wikipedia language for fjord"""
-    api_urls = {
-        "nb": "https://no.wikipedia.org/w/api.php",
-        "nn": "https://nn.wikipedia.org/w/api.php",
-        "da": "https://da.wikipedia.org/w/api.php",
-        "ceb": "https://ceb.wikipedia.org/w/api.php",
-        "en": "https://en.wikipedia.org/w/api.php",
-    }
+    api_url = api_url_for(language)
 
-    api_url = api_urls.get(language, "https://no.wikipedia.org/w/api.php")
-
-    # Create search variants
-    search_terms = [fjord_name]
-    if not fjord_name.endswith("en"):
-        search_terms.append(fjord_name + "en")
-    if fjord_name.endswith("en"):
-        search_terms.append(fjord_name[:-2])
-
-    for search_term in search_terms:
+    for search_term in search_terms_for(fjord_name):
         try:
             # Search for potential matches
             search_params = {
@@ -302,15 +292,18 @@ def search_wikipedia_language(fjord_name, language, fjord_lat, fjord_lng):
                 "limit": 5,
                 "namespace": 0,
                 "format": "json",
+                "maxlag": MAXLAG,
             }
 
-            response = requests.get(api_url, params=search_params, timeout=10)
+            response = get_default_cache().get(api_url, params=search_params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
                 if len(data) >= 4 and data[1]:
                     titles = data[1]
                     urls = data[3]
+                    # One batched query covers every candidate's categories and langlinks
+                    wiki_batch(language).add_titles(titles)
 
                     for title, url in zip(titles, urls):
                         # Check categories for relevance
@@ -319,7 +312,7 @@ def search_wikipedia_language(fjord_name, language, fjord_lat, fjord_lng):
 
                             # Check coordinates
                             lat, lon, dist = check_coordinates_in_page(
-                                url, language, fjord_lat, fjord_lng
+                                url, language, fjord_lat, fjord_lng, title
                             )
 
                             if lat and lon:
@@ -327,11 +320,9 @@ def search_wikipedia_language(fjord_name, language, fjord_lat, fjord_lng):
                                     f"    Found coordinates: {lat}, {lon} (distance: {dist:.2f}km)"
                                 )
 
-                                if dist <= 10.0:
+                                if dist <= MAX_MATCH_DISTANCE_KM:
                                     return url, title, lat, lon, dist
 
-                        time.sleep(0.2)  # Rate limiting between page checks
-
         except Exception as e:
             print(f"    Error searching {language} for {search_term}: {e}")
             continue
@@ -341,66 +332,30 @@ def search_wikipedia_language(fjord_name, language, fjord_lat, fjord_lng):
 
 def search_wikipedia_with_fallback(fjord_name, fjord_lat, fjord_lng):
     """Search Wikipedia with complete language fallback strategy"""
-    # Language priority: Bokmål -> Nynorsk -> English -> Danish -> Cebuano
-    languages = ["nb", "nn", "en", "da", "ceb"]
-
-    result = {
-        "wiki_url_nb": None,
-        "wiki_url_nn": None,
-        "wiki_url_en": None,
-        "wiki_url_da": None,
-        "wiki_url_ceb": None,
-        "wiki_lat": None,
-        "wiki_lng": None,
-        "distance_km": None,
-        "coordinate_source": None,
-        "match_source": None,
-        "match": False,
-    }
+    result = empty_search_result()
 
-    for lang in languages:
-        lang_name = {
-            "nb": "Norwegian Bokmål",
-            "nn": "Norwegian Nynorsk",
-            "en": "English",
-            "da": "Danish",
-            "ceb": "Cebuano",
-        }[lang]
+    for lang in SEARCH_LANGUAGES:
+        lang_name = LANGUAGE_NAMES[lang]
         print(f"  Searching {lang_name} Wikipedia...")
 
         url, title, lat, lon, dist = search_wikipedia_language(
             fjord_name, lang, fjord_lat, fjord_lng
         )
 
-        if url and lat and lon and dist <= 10.0:
+        if url and lat and lon and dist <= MAX_MATCH_DISTANCE_KM:
             print(f"  ✓ COORDINATE MATCH in {lang_name}! Distance: {dist:.2f}km")
 
             # Get all interlanguage links from the found page
             interlang_links = get_interlanguage_links(title, lang)
             print(f"    Found interlanguage links: {list(interlang_links.keys())}")
-
-            # Populate all available language URLs
-            result[f"wiki_url_{lang}"] = url
             for link_lang, link_url in interlang_links.items():
-                if f"wiki_url_{link_lang}" in result:
-                    result[f"wiki_url_{link_lang}"] = link_url
-                    print(f"    {link_lang.upper()}: {link_url}")
-
-            # Set coordinate info
-            result["wiki_lat"] = lat
-            result["wiki_lng"] = lon
-            result["distance_km"] = dist
-            result["coordinate_source"] = lang
-            result["match_source"] = lang
-            result["match"] = True
+                print(f"    {link_lang.upper()}: {link_url}")
 
-            return result
+            return apply_match(result, lang, url, lat, lon, dist, interlang_links)
 
         elif url:
             print(f"    Found page in {lang_name} but coordinates too far or missing")
 
-        time.sleep(0.5)  # Rate limiting between languages
-
     return result
 
 
@@ -420,13 +375,22 @@ def should_skip_fjord(fjord_name):
     return False
 
 
-def load_existing_results():
-    """Load existing results from JSON and CSV files"""
+def load_existing_results(store):
+    """Load existing results from the result store, seeding it from older JSON/CSV files"""
+    if len(store):
+        return store.records()
+    results = load_result_files()
+    write_results(store, results, results.keys())
+    return results
+
+
+def load_result_files():
+    """Load results from the JSON and CSV files written by earlier versions"""
     results = {}
 
     # Try loading from JSON first
     try:
-        with open("fjord_wikipedia_matches.json", "r", encoding="utf-8") as f:
+        with open(RESULTS_JSON_FILE, "r", encoding="utf-8") as f:
             results = {result["fjord_id"]: result for result in json.load(f)}
     except (FileNotFoundError, json.JSONDecodeError):
         pass
@@ -434,7 +398,7 @@ def load_existing_results():
     # If no JSON, try loading from CSV
     if not results:
         try:
-            with open("fjord_wikipedia_matches.csv", "r", encoding="utf-8") as f:
+            with open(RESULTS_CSV_FILE, "r", encoding="utf-8") as f:
                 reader = csv.DictReader(f)
                 for row in reader:
                     fjord_id = int(row["fjord_id"]) if row["fjord_id"] else None
@@ -521,194 +485,328 @@ def merge_results(existing_results, new_result):
     return merged
 
 
-def write_results(results):
-    """Write results to JSON and CSV files"""
-    results_list = list(results.values())
+def validate_match_distances(results, max_km=10.0):
+    """Recompute every stored match distance in one vectorized pass and report outliers"""
+    matched = [
+        r
+        for r in results.values()
+        if r.get("match")
+        and r.get("wiki_lat") is not None
+        and r.get("wiki_lng") is not None
+    ]
+    if not matched:
+        return []
+
+    distances = haversine_km(
+        [r["fjord_lat"] for r in matched],
+        [r["fjord_lng"] for r in matched],
+        [r["wiki_lat"] for r in matched],
+        [r["wiki_lng"] for r in matched],
+    )
+    outliers = []
+    for result, dist in zip(matched, distances.tolist()):
+        if dist > max_km:
+            outliers.append(result)
+            print(
+                f"  ⚠ Match for {result['fjord_name']} ({result['fjord_id']}) is {dist:.2f}km away"
+            )
+    print(f"Validated {len(matched)} match distances, {len(outliers)} over {max_km}km")
+    return outliers
+
+
+def results_csv_row(result):
+    """One result as a row of the CSV export"""
+    # Create coordinate strings
+    fjord_coords = f"{result['fjord_lat']},{result['fjord_lng']}"
+    fjord_maps_url = f"https://maps.google.com/maps?q={fjord_coords}&z=8"
+
+    wiki_coords = ""
+    wiki_maps_url = ""
+    if result.get("wiki_lat") and result.get("wiki_lng"):
+        wiki_coords = f"{result['wiki_lat']},{result['wiki_lng']}"
+        wiki_maps_url = f"https://maps.google.com/maps?q={wiki_coords}&z=8"
+
+    return {
+        "fjord_id": result["fjord_id"],
+        "fjord_name": result["fjord_name"],
+        "fjord_lat": result["fjord_lat"],
+        "fjord_lng": result["fjord_lng"],
+        "svg_filename": result["svg_filename"],
+        "fjord_coords": fjord_coords,
+        "fjord_maps_url": fjord_maps_url,
+        "wiki_url_nb": result.get("wiki_url_nb", "") or "",
+        "wiki_url_nn": result.get("wiki_url_nn", "") or "",
+        "wiki_url_en": result.get("wiki_url_en", "") or "",
+        "wiki_url_da": result.get("wiki_url_da", "") or "",
+        "wiki_url_ceb": result.get("wiki_url_ceb", "") or "",
+        "wiki_lat": result.get("wiki_lat", "") or "",
+        "wiki_lng": result.get("wiki_lng", "") or "",
+        "wiki_coords": wiki_coords,
+        "wiki_maps_url": wiki_maps_url,
+        "distance_km": result.get("distance_km", "") or "",
+        "coordinate_source": result.get("coordinate_source", "") or "",
+        "match_source": result.get("match_source", "") or "",
+        "match": result.get("match", False),
+    }
 
-    # Write JSON file
-    with open("fjord_wikipedia_matches.json", "w", encoding="utf-8") as f:
-        json.dump(results_list, f, indent=2, ensure_ascii=False)
 
-    # Write CSV file
-    with open("fjord_wikipedia_matches.csv", "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
+def write_results(store, results, fjord_ids):
+    """Upsert the given fjords' results into the result store in one transaction"""
+    store.put_many(
+        (
+            fjord_id,
+            results[fjord_id],
+            results_csv_row(results[fjord_id]),
+            results[fjord_id].get("match_source"),
+            None,
+        )
+        for fjord_id in fjord_ids
+    )
 
-        # CSV headers
-        headers = [
-            "fjord_id",
-            "fjord_name",
-            "fjord_lat",
-            "fjord_lng",
-            "svg_filename",
-            "fjord_coords",
-            "fjord_maps_url",
-            "wiki_url_nb",
-            "wiki_url_nn",
-            "wiki_url_en",
-            "wiki_url_da",
-            "wiki_url_ceb",
-            "wiki_lat",
-            "wiki_lng",
-            "wiki_coords",
-            "wiki_maps_url",
-            "distance_km",
-            "coordinate_source",
-            "match_source",
-            "match",
-        ]
-        writer.writerow(headers)
-
-        # Write data rows
-        for result in results_list:
-            # Create coordinate strings
-            fjord_coords = f"{result['fjord_lat']},{result['fjord_lng']}"
-            fjord_maps_url = f"https://maps.google.com/maps?q={fjord_coords}&z=8"
-
-            wiki_coords = ""
-            wiki_maps_url = ""
-            if result.get("wiki_lat") and result.get("wiki_lng"):
-                wiki_coords = f"{result['wiki_lat']},{result['wiki_lng']}"
-                wiki_maps_url = f"https://maps.google.com/maps?q={wiki_coords}&z=8"
-
-            row = [
-                result["fjord_id"],
-                result["fjord_name"],
-                result["fjord_lat"],
-                result["fjord_lng"],
-                result["svg_filename"],
-                fjord_coords,
-                fjord_maps_url,
-                result.get("wiki_url_nb", "") or "",
-                result.get("wiki_url_nn", "") or "",
-                result.get("wiki_url_en", "") or "",
-                result.get("wiki_url_da", "") or "",
-                result.get("wiki_url_ceb", "") or "",
-                result.get("wiki_lat", "") or "",
-                result.get("wiki_lng", "") or "",
-                wiki_coords,
-                wiki_maps_url,
-                result.get("distance_km", "") or "",
-                result.get("coordinate_source", "") or "",
-                result.get("match_source", "") or "",
-                result.get("match", False),
-            ]
-            writer.writerow(row)
 
+def export_results(store):
+    """Write the JSON and CSV exports from the result store"""
+    store.export_json(RESULTS_JSON_FILE)
+    store.export_csv(RESULTS_CSV_FILE, RESULTS_CSV_HEADERS)
+
+
+def replay_journal(records, existing_results):
+    """Merge journaled results into existing_results.
+
+    Returns the ids of journaled fjords and the database updates that were
+    queued but not yet applied.
+    """
+    done_ids = set()
+    pending_updates = {}
+    for record in records:
+        if record.get("type") == "fjord":
+            result = record["result"]
+            existing_results[result["fjord_id"]] = merge_results(existing_results, result)
+            done_ids.add(result["fjord_id"])
+            if record.get("db_update"):
+                pending_updates[result["fjord_id"]] = record["db_update"]
+        elif record.get("type") == "db_update":
+            pending_updates.pop(record["fjord_id"], None)
+    return done_ids, list(pending_updates.values())
+
+
+def record_search_result(
+    fjord, search_result, existing_results, db_updates, catalogue_index, journal=None
+):
+    """Merge one fjord's search result into the results, queue its DB update and journal both"""
+    new_result = {
+        "fjord_id": fjord["id"],
+        "fjord_name": fjord["name"],
+        "fjord_lat": float(fjord["center_lat"]),
+        "fjord_lng": float(fjord["center_lng"]),
+        "svg_filename": fjord["svg_filename"],
+        **search_result,
+    }
 
-def main():
-    # Load existing results
-    existing_results = load_existing_results()
-    print(f"Loaded {len(existing_results)} existing results")
+    # Merge with existing results
+    existing_results[fjord["id"]] = merge_results(existing_results, new_result)
+    db_update = None
+
+    if search_result["match"]:
+        print(f"  ✓ MATCH! Found via {search_result['match_source'].upper()}")
+        print(f"    Coordinates from: {search_result['coordinate_source'].upper()}")
+        print(f"    Distance: {search_result['distance_km']:.2f} km")
 
-    # Get all fjords from database
-    all_fjords_response = (
-        supabase.table("fjordle_fjords")
-        .select("id,name,center_lat,center_lng,svg_filename")
-        .execute()
+        # Flag pages whose coordinates sit closer to another catalogue fjord
+        nearest = catalogue_index.nearest(
+            search_result["wiki_lat"], search_result["wiki_lng"], k=1
+        )
+        if nearest and nearest[0][0] != fjord["id"]:
+            nearest_id, nearest_km = nearest[0]
+            print(
+                f"    ⚠ Wikipedia coordinates are closer to fjord {nearest_id} ({nearest_km:.2f}km)"
+            )
+
+        # Queue database update only if we have a Bokmål URL
+        if search_result["wiki_url_nb"]:
+            db_update = {"id": fjord["id"], "url": search_result["wiki_url_nb"]}
+            db_updates.append(db_update)
+            print(f"    ✓ Queued database update with Bokmål URL")
+        else:
+            print(f"    ℹ  No Bokmål URL found, logging match only")
+    else:
+        print(f"  ✗ No matching Wikipedia page found")
+
+    if journal is not None:
+        journal.append(
+            {"type": "fjord", "fjord_id": fjord["id"], "result": new_result, "db_update": db_update}
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Match fjords without Norwegian Wikipedia URLs to Wikipedia pages"
     )
-    total_fjords = len(all_fjords_response.data)
-
-    # Get all fjords without Norwegian Wikipedia URLs, excluding quarantined fjords
-    response = (
-        supabase.table("fjordle_fjords")
-        .select("id,name,center_lat,center_lng,svg_filename")
-        .is_("wikipedia_url_no", "null")
-        .eq("quarantined", False)
-        .execute()
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="search many fjords concurrently with the asyncio engine",
     )
-    all_fjords = response.data
-
-    # Get fjord IDs that are in puzzle_queue or daily_puzzles
-    puzzle_queue_response = supabase.table("fjordle_puzzle_queue").select("fjord_id").execute()
-    daily_puzzles_response = (
-        supabase.table("fjordle_daily_puzzles").select("fjord_id").execute()
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="fjords searched at once in --async mode (default: 16)",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted run, skipping fjords already in its journal",
+    )
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help=f"write {RESULTS_JSON_FILE} and {RESULTS_CSV_FILE} from the result store",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="serve Wikipedia requests only from the HTTP cache",
+    )
+    args = parser.parse_args()
+    if args.offline:
+        get_default_cache().offline = True
 
-    used_fjord_ids = set()
-    used_fjord_ids.update([p["fjord_id"] for p in puzzle_queue_response.data])
-    used_fjord_ids.update([p["fjord_id"] for p in daily_puzzles_response.data])
+    rest = get_rest_client()
 
-    # Filter out used fjords and problematic names
-    fjords = [
-        f
-        for f in all_fjords
-        if f["id"] not in used_fjord_ids and not should_skip_fjord(f["name"])
-    ]
+    # Load existing results
+    store = ResultStore(RESULTS_DB, "matches")
+    existing_results = load_existing_results(store)
+    print(f"Loaded {len(existing_results)} existing results")
+
+    # Page through the catalogue, projecting only the columns used below
+    catalogue = {
+        row["id"]: row
+        for row in rest.iter_rows("fjordle_fjords", "id,center_lat,center_lng")
+    }
+    total_fjords = len(catalogue)
+    catalogue_index = FjordIndex.from_rows(catalogue.values())
+
+    # Fjords without Norwegian Wikipedia URLs that aren't quarantined or used in
+    # a puzzle, filtered server-side in a single anti-join
+    candidates = 0
+    fjords = []
+    for fjord in rest.iter_rows(
+        "fjordle_fjords",
+        "id,name,center_lat,center_lng,svg_filename",
+        {"wikipedia_url_no": "is.null", "quarantined": "is.false"},
+        not_referenced_by=PUZZLE_TABLES,
+    ):
+        candidates += 1
+        if not should_skip_fjord(fjord["name"]):
+            fjords.append(fjord)
 
     print(
         f"Processing {len(fjords)} fjords (excluded quarantined, used, and problematic names)"
     )
     print(f"Total fjords in database: {total_fjords}")
-    print(f"Fjords without Norwegian URLs: {len(all_fjords)}")
-    print(f"Used in puzzles: {len(used_fjord_ids)}")
-    print(
-        f"Skipped problematic names: {len(all_fjords) - len(fjords) - len(used_fjord_ids)}"
-    )
+    print(f"Unused fjords without Norwegian URLs: {candidates}")
+    print(f"Skipped problematic names: {candidates - len(fjords)}")
 
     db_updates = []
 
-    for i, fjord in enumerate(reversed(fjords)):
-        print(f"\nProcessing {i+1}/{len(fjords)}: {fjord['name']}")
-
-        search_result = search_wikipedia_with_fallback(
-            fjord["name"], float(fjord["center_lat"]), float(fjord["center_lng"])
-        )
+    # Every result is journaled as soon as it's found, so an interrupted run
+    # can pick up where it stopped
+    journal = RunJournal(JOURNAL_FILE)
+    done_ids = set()
+    if journal.exists():
+        done_ids, pending_updates = replay_journal(journal.replay(), existing_results)
+        if args.resume:
+            db_updates.extend(pending_updates)
+            fjords = [f for f in fjords if f["id"] not in done_ids]
+            print(
+                f"Resuming: {len(done_ids)} fjords already journaled, {len(fjords)} remaining"
+            )
+        else:
+            write_results(store, existing_results, done_ids)
+            print(
+                f"Compacted {len(done_ids)} results from an interrupted run (use --resume to skip them)"
+            )
+    journal.open(truncate=not args.resume)
 
-        new_result = {
-            "fjord_id": fjord["id"],
-            "fjord_name": fjord["name"],
-            "fjord_lat": float(fjord["center_lat"]),
-            "fjord_lng": float(fjord["center_lng"]),
-            "svg_filename": fjord["svg_filename"],
-            **search_result,
-        }
-
-        # Merge with existing results
-        existing_results[fjord["id"]] = merge_results(existing_results, new_result)
-
-        if search_result["match"]:
-            print(f"  ✓ MATCH! Found via {search_result['match_source'].upper()}")
-            print(f"    Coordinates from: {search_result['coordinate_source'].upper()}")
-            print(f"    Distance: {search_result['distance_km']:.2f} km")
-
-            # Queue database update only if we have a Bokmål URL
-            if search_result["wiki_url_nb"]:
-                db_updates.append(
-                    {"id": fjord["id"], "url": search_result["wiki_url_nb"]}
+    try:
+        if args.use_async:
+            from wiki_async import search_fjords
+
+            print(f"Searching with asyncio engine, {args.concurrency} fjords at a time")
+            completed = 0
+
+            def on_result(fjord, search_result):
+                nonlocal completed
+                completed += 1
+                print(f"\nProcessed {completed}/{len(fjords)}: {fjord['name']}")
+                record_search_result(
+                    fjord,
+                    search_result,
+                    existing_results,
+                    db_updates,
+                    catalogue_index,
+                    journal,
                 )
-                print(f"    ✓ Queued database update with Bokmål URL")
-            else:
-                print(f"    ℹ  No Bokmål URL found, logging match only")
+
+            lookup_stats = search_fjords(
+                list(reversed(fjords)),
+                on_result,
+                concurrency=args.concurrency,
+                cache=get_default_cache(),
+            )
         else:
-            print(f"  ✗ No matching Wikipedia page found")
+            lookup_stats = coordinate_stats
+            for i, fjord in enumerate(reversed(fjords)):
+                print(f"\nProcessing {i+1}/{len(fjords)}: {fjord['name']}")
 
-        # Rate limiting
-        time.sleep(1.0)
+                search_result = search_wikipedia_with_fallback(
+                    fjord["name"], float(fjord["center_lat"]), float(fjord["center_lng"])
+                )
+                record_search_result(
+                    fjord,
+                    search_result,
+                    existing_results,
+                    db_updates,
+                    catalogue_index,
+                    journal,
+                )
+    except KeyboardInterrupt:
+        journal.close()
+        print(f"\nInterrupted; progress is saved in {JOURNAL_FILE}, rerun with --resume")
+        sys.exit(130)
 
-    # Batch update database
+    # Bulk upsert the queued URLs; the NOT NULL columns upsert rows must carry
+    # are re-read per chunk, not taken from the catalogue loaded at startup
     print(f"\nUpdating database for {len(db_updates)} fjords...")
-    for update in db_updates:
-        try:
-            update_data = {"wikipedia_url_no": update["url"]}
-            supabase.table("fjordle_fjords").update(update_data).eq(
-                "id", update["id"]
-            ).execute()
-            print(f"  ✓ Updated fjord {update['id']}")
-        except Exception as e:
-            print(f"  ✗ Failed to update fjord {update['id']}: {e}")
+    if db_updates:
+        rows = [{"id": u["id"], "wikipedia_url_no": u["url"]} for u in db_updates]
+        report = rest.upsert("fjordle_fjords", rows, required_columns=FJORD_REQUIRED_COLUMNS)
+        for outcome in report.outcomes:
+            if outcome.ok:
+                journal.append({"type": "db_update", "fjord_id": outcome.key})
+                print(f"  ✓ Updated fjord {outcome.key}")
+            else:
+                print(f"  ✗ Failed to update fjord {outcome.key}: {outcome.error}")
+        print(f"  {report.summary()}")
 
-    # Write all results to files
-    write_results(existing_results)
+    # Compact the journal into the result store
+    validate_match_distances(existing_results)
+    write_results(store, existing_results, done_ids | {f["id"] for f in fjords})
+    journal.remove()
+    if args.export:
+        export_results(store)
 
     matches = [r for r in existing_results.values() if r.get("match")]
     bokmaal_updates = [
         r for r in existing_results.values() if r.get("match") and r.get("wiki_url_nb")
     ]
 
-    print(
-        f"\nResults written to fjord_wikipedia_matches.json and fjord_wikipedia_matches.csv"
-    )
-    print(f"Total results in files: {len(existing_results)}")
+    print(f"\nResults written to {RESULTS_DB}")
+    if args.export:
+        print(f"Exported to {RESULTS_JSON_FILE} and {RESULTS_CSV_FILE}")
+    print(f"Total results in store: {len(existing_results)}")
     print(f"Total matches: {len(matches)}")
     print(f"Bokmål URLs in database: {len(bokmaal_updates)}")
 
@@ -725,6 +823,9 @@ def main():
 
     print(f"Match sources: {match_sources}")
     print(f"Coordinate sources: {coord_sources}")
+    print(lookup_stats.summary())
+    print(get_default_cache().summary())
+    print(get_default_limiter().summary())
 
 
 if __name__ == "__main__":
@@ -1,167 +1,286 @@
-import struct
+import argparse
+import hashlib
+import io
+import json
 import os
 import csv
-import math
-
-def utm_to_latlon(easting, northing):
-    if not easting or not northing:
-        return None, None
-    a = 6378137.0
-    f = 1/298.257223563
-    e2 = 2*f - f*f
-    e1 = (1 - math.sqrt(1 - e2)) / (1 + math.sqrt(1 - e2))
-    k0 = 0.9996
-    lon0 = math.radians(15.0)
-    false_easting = 500000.0
-    false_northing = 0.0
-    x = easting - false_easting
-    y = northing - false_northing
-    M = y / k0
-    mu = M / (a * (1 - e2/4 - 3*e2*e2/64 - 5*e2*e2*e2/256))
-    phi1 = mu + (3*e1/2 - 27*e1*e1*e1/32) * math.sin(2*mu) + \
-        (21*e1*e1/16 - 55*e1*e1*e1*e1/32) * math.sin(4*mu) + \
-        (151*e1*e1*e1/96) * math.sin(6*mu)
-    N1 = a / math.sqrt(1 - e2 * math.sin(phi1)**2)
-    T1 = math.tan(phi1)**2
-    C1 = e2 * math.cos(phi1)**2 / (1 - e2)
-    R1 = a * (1 - e2) / (1 - e2 * math.sin(phi1)**2)**(3/2)
-    D = x / (N1 * k0)
-    lat = phi1 - (N1 * math.tan(phi1) / R1) * (
-        D*D/2 - (5 + 3*T1 + 10*C1 - 4*C1*C1 - 9*e2) * D**4 / 24 +
-        (61 + 90*T1 + 298*C1 + 45*T1*T1 - 252*e2 - 3*C1*C1) * D**6 / 720)
-    lon = lon0 + (D - (1 + 2*T1 + C1) * D**3 / 6 +
-        (5 - 2*C1 + 28*T1 - 3*C1*C1 + 8*e2 + 24*T1*T1) * D**5 / 120) / math.cos(phi1)
-    return math.degrees(lat), math.degrees(lon)
-
-def read_dbf_data(filename):
-    with open(filename, 'rb') as f:
-        f.seek(4)
-        num_records = struct.unpack('<I', f.read(4))[0]
-        header_len = struct.unpack('<H', f.read(2))[0]
-        record_len = struct.unpack('<H', f.read(2))[0]
-        f.seek(32)
-        fields = []
-        while True:
-            field_data = f.read(32)
-            if field_data[0] == 0x0D:
-                break
-            name = field_data[:11].rstrip(b'\x00').decode('ascii')
-            field_type = chr(field_data[11])
-            length = field_data[16]
-            offset = sum(field[2] for field in fields) + 1
-            fields.append((name, field_type, length, offset))
-        navn_field = utmx_field = utmy_field = fjordid_field = None
-        for field in fields:
-            if field[0] == 'navn': navn_field = field
-            elif field[0] == 'utmx': utmx_field = field
-            elif field[0] == 'utmy': utmy_field = field
-            elif field[0] == 'fjordid': fjordid_field = field
-        records = []
-        f.seek(header_len)
-        for _ in range(num_records):
-            record = f.read(record_len)
-            navn = record[navn_field[3]:navn_field[3]+navn_field[2]].rstrip(b'\x00 ').decode('iso-8859-1') if navn_field else ''
-            utmx_str = record[utmx_field[3]:utmx_field[3]+utmx_field[2]].rstrip(b'\x00 ').decode('ascii') if utmx_field else ''
-            utmy_str = record[utmy_field[3]:utmy_field[3]+utmy_field[2]].rstrip(b'\x00 ').decode('ascii') if utmy_field else ''
-            fjordid = record[fjordid_field[3]:fjordid_field[3]+fjordid_field[2]].rstrip(b'\x00 ').decode('ascii') if fjordid_field else ''
-            try:
-                utmx = float(utmx_str.replace(',', '.').replace('*', '')) if utmx_str.strip() else None
-            except Exception:
-                utmx = None
-            try:
-                utmy = float(utmy_str.replace(',', '.').replace('*', '')) if utmy_str.strip() else None
-            except Exception:
-                utmy = None
-            records.append({
-                'navn': navn, 'utmx': utmx, 'utmy': utmy, 'fjordid': fjordid
-            })
-    return records
-
-def read_shp_polygons(filename):
-    with open(filename, 'rb') as f:
-        f.seek(100)
-        geometries = []
-        while True:
-            try:
-                record_num = struct.unpack('>I', f.read(4))[0]
-                content_len = struct.unpack('>I', f.read(4))[0]
-                shape_type = struct.unpack('<I', f.read(4))[0]
-                if shape_type == 5:
-                    f.read(32)
-                    num_parts = struct.unpack('<I', f.read(4))[0]
-                    num_points = struct.unpack('<I', f.read(4))[0]
-                    part_indices = [struct.unpack('<I', f.read(4))[0] for _ in range(num_parts)]
-                    all_points = [list(struct.unpack('<dd', f.read(16))) for _ in range(num_points)]
-                    if num_parts > 1:
-                        exterior_points = all_points[part_indices[0]:part_indices[1]]
-                    else:
-                        exterior_points = all_points
-                    geometries.append(exterior_points)
-                else:
-                    f.read(content_len*2 - 4)
-                    geometries.append([])
-            except struct.error:
-                break
-        return geometries
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from dbf_reader import DbfReader
+from geodesy import utm_to_latlon_batch
+from shp_reader import ShpReader, SHAPE_POLYGON
+from simplify import DEFAULT_MIN_VERTICES, simplify_ring
+from svg_path import PATH_MODES, encode_path, encode_rings
+
+DBF_COLUMNS = ('navn', 'utmx', 'utmy', 'fjordid')
+PROJECT_BATCH = 512
+
+def parse_utm(value):
+    value = value.replace(',', '.').replace('*', '')
+    try:
+        return float(value) if value.strip() else None
+    except ValueError:
+        return None
+
+def project_centers(eastings, northings):
+    """Project a batch of UTM centers in one vectorized pass; missing values map to None"""
+    eastings = np.array([e or np.nan for e in eastings], dtype=np.float64)
+    northings = np.array([n or np.nan for n in northings], dtype=np.float64)
+    lats, lons = utm_to_latlon_batch(eastings, northings)
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    return [(float(lat), float(lon)) if ok else (None, None)
+            for lat, lon, ok in zip(lats.tolist(), lons.tolist(), valid.tolist())]
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def exterior_ring(record):
+    """Exterior ring of a shape record as an (n, 2) view into the mapped file"""
+    if record.shape_type == SHAPE_POLYGON and record.num_parts:
+        return record.part(0)
+    return record.points
 
 def normalize_to_square(coords, size=400, padding=40):
-    if not coords: return []
-    xs = [p[0] for p in coords]
-    ys = [p[1] for p in coords]
-    minx, maxx = min(xs), max(xs)
-    miny, maxy = min(ys), max(ys)
+    if len(coords) == 0: return np.empty((0, 2))
+    coords = np.asarray(coords, dtype=np.float64)
+    minx, miny = coords.min(axis=0)
+    maxx, maxy = coords.max(axis=0)
     width = maxx - minx
     height = maxy - miny
-    if width == 0 or height == 0: return []
+    if width == 0 or height == 0: return np.empty((0, 2))
     available_size = size - (2 * padding)
     scale = available_size / max(width, height)
     new_width = width * scale
     new_height = height * scale
     offset_x = (size - new_width) / 2
     offset_y = (size - new_height) / 2
-    return [[(x - minx)*scale + offset_x, size - ((y - miny)*scale + offset_y)] for x, y in coords]
+    out = np.empty_like(coords)
+    out[:, 0] = (coords[:, 0] - minx)*scale + offset_x
+    out[:, 1] = size - ((coords[:, 1] - miny)*scale + offset_y)
+    return out
 
-def create_svg_path(coords):
-    if not coords: return ""
+def create_svg_path(coords, precision=1, mode='absolute'):
     # DO NOT REMOVE last coordinate, even if equal to first
-    path = f"M {coords[0][0]:.1f},{coords[0][1]:.1f}"
-    for x, y in coords[1:]:
-        path += f" L {x:.1f},{y:.1f}"
-    return path
-
-records = read_dbf_data('fjordkatalogen_omrade.dbf')
-geometries = read_shp_polygons('fjordkatalogen_omrade.shp')
-os.makedirs('fjord_svgs', exist_ok=True)
-csv_file = open('fjord_data.csv', 'w', newline='', encoding='utf-8')
-csv_writer = csv.writer(csv_file)
-csv_writer.writerow(['svg_filename', 'name', 'center_lat', 'center_lng', 'fjordid', 'difficulty_tier'])
-
-for idx, (record, coords) in enumerate(zip(records, geometries)):
-    navn = record.get('navn', '')
-    fjord_id = record.get('fjordid', '')
-    utmx, utmy = record.get('utmx'), record.get('utmy')
+    return encode_path(coords, mode=mode, precision=precision)
+
+def create_svg_multipath(rings, precision=1, mode='absolute'):
+    return encode_rings(rings, mode=mode, precision=precision)
+
+SHP_FILE = 'fjordkatalogen_omrade.shp'
+DBF_FILE = 'fjordkatalogen_omrade.dbf'
+SVG_DIR = 'fjord_svgs'
+CSV_FILE = 'fjord_data.csv'
+MANIFEST_FILE = 'fjord_svgs.manifest.json'
+STAGES = ('parse', 'project', 'hash', 'normalize', 'simplify', 'serialize', 'write')
+
+# Bump when the rendering code changes in a way the parameters don't capture
+RENDER_VERSION = 1
+
+def svg_filename(idx, navn):
     safe_name = "".join(c for c in navn if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    filename = f"{idx:04d}_{safe_name}.svg" if safe_name else f"{idx:04d}_unknown.svg"
-    try:
-        if utmx is not None and utmy is not None:
-            lat, lon = utm_to_latlon(utmx, utmy)
-        else:
-            lat, lon = None, None
-    except Exception:
-        lat, lon = None, None
-    normalized_coords = normalize_to_square(coords, size=400, padding=40)
-    path = create_svg_path(normalized_coords)
-    svg_content = f'''<?xml version="1.0" encoding="UTF-8"?>
-<svg width="400" height="400" viewBox="0 0 400 400" xmlns="http://www.w3.org/2000/svg">
-  <rect width="400" height="400" fill="white"/>
+    return f"{idx:04d}_{safe_name}.svg" if safe_name else f"{idx:04d}_unknown.svg"
+
+def render_svg(path, size=400):
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<svg width="{size}" height="{size}" viewBox="0 0 {size} {size}" xmlns="http://www.w3.org/2000/svg">
+  <rect width="{size}" height="{size}" fill="white"/>
   <path d="{path}" fill="none" stroke="black" stroke-width="2"/>
 </svg>'''
-    with open(f'fjord_svgs/{filename}', 'w', encoding='utf-8') as f:
-        f.write(svg_content)
-    csv_writer.writerow([filename, navn, lat, lon, fjord_id, ''])
-    print(f"Generated: {filename} - {navn} (lat: {lat}, lng: {lon})")
 
-csv_file.close()
-print(f"Processing complete. SVGs saved to 'fjord_svgs' directory.")
-print(f"Metadata saved to 'fjord_data.csv'")
+def input_hash(shp_raw, dbf_raw, params_key):
+    """Content hash of one record's raw shapefile bytes, DBF row and render parameters"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(params_key)
+    h.update(len(shp_raw).to_bytes(4, 'little'))
+    h.update(shp_raw)
+    h.update(dbf_raw)
+    return h.hexdigest()
+
+def load_manifest(filename):
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def write_if_changed(filename, content):
+    """Write text only if it differs from what is on disk; returns True if written"""
+    data = content.encode('utf-8')
+    try:
+        with open(filename, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, filename)
+    return True
+
+_worker_shp = None
+
+def _init_worker(shp_filename):
+    global _worker_shp
+    _worker_shp = ShpReader(shp_filename)
+
+def _render_chunk(chunk, params):
+    """Render the SVGs for a list of (idx, filename) pairs.
+
+    Returns (timings, per-file results) where each result is
+    (filename, written, bytes_saved); bytes_saved is None when simplification is off.
+    """
+    timings = dict.fromkeys(STAGES, 0.0)
+    results = []
+    for idx, filename in chunk:
+        t0 = time.perf_counter()
+        record = _worker_shp[idx]
+        if params['parts'] == 'all':
+            coords, bounds = record.points, record.part_bounds()
+        else:
+            coords = exterior_ring(record)
+            bounds = [(0, len(coords))]
+        t1 = time.perf_counter()
+        normalized_coords = normalize_to_square(coords, size=params['size'], padding=params['padding'])
+        rings = [normalized_coords[start:stop] for start, stop in bounds] if len(normalized_coords) else []
+        t2 = time.perf_counter()
+        simplified_rings = [simplify_ring(ring, params['simplify'], params['min_vertices']) for ring in rings]
+        t3 = time.perf_counter()
+        path = create_svg_multipath(simplified_rings, params['precision'], params['path_mode'])
+        bytes_saved = None
+        if params['simplify'] > 0:
+            bytes_saved = len(create_svg_multipath(rings, params['precision'], params['path_mode'])) - len(path)
+        svg_content = render_svg(path, size=params['size'])
+        t4 = time.perf_counter()
+        written = write_if_changed(os.path.join(SVG_DIR, filename), svg_content)
+        t5 = time.perf_counter()
+        results.append((filename, written, bytes_saved))
+        timings['parse'] += t1 - t0
+        timings['normalize'] += t2 - t1
+        timings['simplify'] += t3 - t2
+        timings['serialize'] += t4 - t3
+        timings['write'] += t5 - t4
+    return timings, results
+
+def _chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate fjord outline SVGs from the Kartverket fjord catalogue')
+    parser.add_argument('--workers', type=int, default=1, help='render with N worker processes (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='records per worker task (default: 64)')
+    parser.add_argument('--size', type=int, default=400, help='SVG width and height in pixels (default: 400)')
+    parser.add_argument('--padding', type=int, default=40, help='padding around the outline in pixels (default: 40)')
+    parser.add_argument('--precision', type=int, default=1, help='decimal places in path coordinates (default: 1)')
+    parser.add_argument('--path-mode', choices=PATH_MODES, default='absolute',
+                        help='SVG path encoding: absolute (original), implicit or relative (default: absolute)')
+    parser.add_argument('--parts', choices=('exterior', 'all'), default='exterior',
+                        help='draw only the first ring, or every ring including islands and holes (default: exterior)')
+    parser.add_argument('--simplify', type=float, default=0.0,
+                        help='Douglas-Peucker tolerance in output pixels; 0 disables (default: 0)')
+    parser.add_argument('--min-vertices', type=int, default=DEFAULT_MIN_VERTICES,
+                        help=f'never simplify an outline below this many vertices (default: {DEFAULT_MIN_VERTICES})')
+    parser.add_argument('--force', action='store_true', help='re-render every SVG, ignoring the manifest')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    timings = dict.fromkeys(STAGES, 0.0)
+    params = {'size': args.size, 'padding': args.padding, 'precision': args.precision,
+              'path_mode': args.path_mode, 'parts': args.parts,
+              'simplify': args.simplify, 'min_vertices': args.min_vertices}
+    params_key = json.dumps({**params, 'version': RENDER_VERSION}, sort_keys=True).encode('utf-8')
+
+    # One streaming pass over DBF rows and shapes: project centers in batches,
+    # build the CSV, and decide what to render from input hashes
+    old_manifest = {} if args.force else load_manifest(MANIFEST_FILE)
+    manifest = {}
+    jobs = []
+    job_names = {}
+    csv_buffer = io.StringIO(newline='')
+    csv_writer = csv.writer(csv_buffer)
+    csv_writer.writerow(['svg_filename', 'name', 'center_lat', 'center_lng', 'fjordid', 'difficulty_tier'])
+
+    t0 = time.perf_counter()
+    with DbfReader(DBF_FILE, columns=DBF_COLUMNS) as dbf, ShpReader(SHP_FILE) as shp:
+        for batch in _batched(zip(dbf, shp), PROJECT_BATCH):
+            t1 = time.perf_counter()
+            centers = project_centers([parse_utm(r.get('utmx')) for r, _ in batch],
+                                      [parse_utm(r.get('utmy')) for r, _ in batch])
+            t2 = time.perf_counter()
+            for (record, shape), (lat, lon) in zip(batch, centers):
+                idx = record.index
+                navn = record.get('navn')
+                filename = svg_filename(idx, navn)
+                digest = input_hash(shape.raw, record.raw, params_key)
+                manifest[filename] = digest
+                csv_writer.writerow([filename, navn, lat, lon, record.get('fjordid'), ''])
+                if old_manifest.get(filename) != digest or not os.path.exists(os.path.join(SVG_DIR, filename)):
+                    jobs.append((idx, filename))
+                    job_names[idx] = navn
+            t3 = time.perf_counter()
+            timings['project'] += t2 - t1
+            timings['hash'] += t3 - t2
+    timings['parse'] += time.perf_counter() - t0 - timings['project'] - timings['hash']
+    chunks = list(_chunked(jobs, max(1, args.chunk_size)))
+
+    os.makedirs(SVG_DIR, exist_ok=True)
+    render = partial(_render_chunk, params=params)
+    if args.workers > 1 and chunks:
+        executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(SHP_FILE,))
+        results = executor.map(render, chunks)
+    else:
+        executor = None
+        if chunks:
+            _init_worker(SHP_FILE)
+        results = map(render, chunks)
+
+    written = 0
+    total_saved = 0
+    for chunk, (chunk_timings, chunk_results) in zip(chunks, results):
+        for stage, seconds in chunk_timings.items():
+            timings[stage] += seconds
+        for (idx, _), (filename, file_written, bytes_saved) in zip(chunk, chunk_results):
+            written += file_written
+            saved = ''
+            if bytes_saved is not None:
+                total_saved += bytes_saved
+                saved = f" (simplified, {bytes_saved} bytes saved)"
+            print(f"Generated: {filename} - {job_names[idx]}{saved}")
+    if executor:
+        executor.shutdown()
+
+    removed = 0
+    for filename in os.listdir(SVG_DIR):
+        if filename.endswith('.svg') and filename not in manifest:
+            os.remove(os.path.join(SVG_DIR, filename))
+            print(f"Removed orphan: {filename}")
+            removed += 1
+
+    write_if_changed(CSV_FILE, csv_buffer.getvalue())
+    write_if_changed(MANIFEST_FILE, json.dumps(manifest, indent=2, ensure_ascii=False))
+    elapsed = time.perf_counter() - started
+
+    print(f"Processing complete. SVGs saved to '{SVG_DIR}' directory.")
+    print(f"Metadata saved to '{CSV_FILE}'")
+    print(f"Rendered {len(jobs)} of {len(manifest)} SVGs ({written} files changed, {removed} orphans removed) "
+          f"in {elapsed:.2f}s with {max(1, args.workers)} worker(s)")
+    if args.simplify > 0:
+        print(f"Simplification saved {total_saved} path bytes across {len(jobs)} SVGs")
+    print("Stage timings (summed across workers):")
+    for stage in STAGES:
+        print(f"  {stage:<10} {timings[stage]:8.3f}s")
 
+if __name__ == '__main__':
+    main()
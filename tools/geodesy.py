@@ -0,0 +1,190 @@
+"""
+Vectorized geodesy helpers shared by the fjord tools.
+
+utm_to_latlon_batch is the array form of the scalar utm_to_latlon that
+generate_fjord_svgs.py used to call (kept as the reference in
+tests/test_geodesy.py): the same transverse-Mercator inverse series, evaluated
+for whole arrays of eastings/northings in one pass, with the central meridian
+taken from the UTM zone instead of being fixed at 15°E.
+
+haversine_km and distance_matrix_km are the array forms of distance_km in
+fjord_wikipedia_matcher.py. Matrices are computed in row blocks sized to a
+memory budget, so temporaries stay bounded however many fjords are compared.
+"""
+
+import numpy as np
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+UTM_K0 = 0.9996
+UTM_FALSE_EASTING = 500000.0
+
+EARTH_RADIUS_KM = 6371  # Same radius as distance_km in fjord_wikipedia_matcher.py
+DEFAULT_BLOCK_BYTES = 32 * 1024 * 1024
+
+# Kartverket's fjord catalogue is published in EUREF89 / UTM zone 33N
+DEFAULT_UTM_ZONE = 33
+
+
+def utm_zone_central_meridian(zone):
+    """Central meridian in degrees for a UTM zone (scalar or array)"""
+    return np.asarray(zone, dtype=np.float64) * 6.0 - 183.0
+
+
+def utm_to_latlon_batch(easting, northing, zone=DEFAULT_UTM_ZONE):
+    """Convert arrays of northern-hemisphere UTM coordinates to WGS84 degrees.
+
+    `zone` may be a scalar or an array broadcastable against the inputs.
+    Missing inputs (NaN) produce NaN outputs.
+    """
+    x = np.asarray(easting, dtype=np.float64) - UTM_FALSE_EASTING
+    y = np.asarray(northing, dtype=np.float64)
+    lon0 = np.radians(utm_zone_central_meridian(zone))
+
+    a = WGS84_A
+    e2 = 2 * WGS84_F - WGS84_F * WGS84_F
+    e1 = (1 - np.sqrt(1 - e2)) / (1 + np.sqrt(1 - e2))
+
+    M = y / UTM_K0
+    mu = M / (a * (1 - e2 / 4 - 3 * e2 * e2 / 64 - 5 * e2 * e2 * e2 / 256))
+    phi1 = (
+        mu
+        + (3 * e1 / 2 - 27 * e1 * e1 * e1 / 32) * np.sin(2 * mu)
+        + (21 * e1 * e1 / 16 - 55 * e1 * e1 * e1 * e1 / 32) * np.sin(4 * mu)
+        + (151 * e1 * e1 * e1 / 96) * np.sin(6 * mu)
+    )
+    sin_phi1 = np.sin(phi1)
+    cos_phi1 = np.cos(phi1)
+    tan_phi1 = np.tan(phi1)
+    sin2 = sin_phi1 * sin_phi1
+
+    N1 = a / np.sqrt(1 - e2 * sin2)
+    T1 = tan_phi1 * tan_phi1
+    C1 = e2 * cos_phi1 * cos_phi1 / (1 - e2)
+    R1 = a * (1 - e2) / (1 - e2 * sin2) ** 1.5
+    D = x / (N1 * UTM_K0)
+    D2 = D * D
+    D3 = D2 * D
+    D4 = D2 * D2
+    D5 = D4 * D
+    D6 = D4 * D2
+
+    lat = phi1 - (N1 * tan_phi1 / R1) * (
+        D2 / 2
+        - (5 + 3 * T1 + 10 * C1 - 4 * C1 * C1 - 9 * e2) * D4 / 24
+        + (61 + 90 * T1 + 298 * C1 + 45 * T1 * T1 - 252 * e2 - 3 * C1 * C1) * D6 / 720
+    )
+    lon = lon0 + (
+        D
+        - (1 + 2 * T1 + C1) * D3 / 6
+        + (5 - 2 * C1 + 28 * T1 - 3 * C1 * C1 + 8 * e2 + 24 * T1 * T1) * D5 / 120
+    ) / cos_phi1
+    return np.degrees(lat), np.degrees(lon)
+
+
+def project_points(points, zone=DEFAULT_UTM_ZONE):
+    """Project an (n, 2) array of UTM easting/northing to an (n, 2) lat/lon array"""
+    points = np.asarray(points, dtype=np.float64)
+    lat, lon = utm_to_latlon_batch(points[:, 0], points[:, 1], zone)
+    return np.column_stack((lat, lon))
+
+
+def ring_geographic_summary(points, zone=DEFAULT_UTM_ZONE):
+    """Area centroid and bounding box of a UTM polygon ring, in lat/lon degrees.
+
+    The centroid is computed in the projected plane (where the shoelace
+    formula is valid) and then projected, falling back to the vertex mean for
+    degenerate rings. The bbox is taken over every projected vertex.
+    Returns ((lat, lon), (min_lat, min_lon, max_lat, max_lon)).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    x, y = points[:, 0], points[:, 1]
+    x0, y0 = x.mean(), y.mean()
+    xs, ys = x - x0, y - y0
+    cross = xs[:-1] * ys[1:] - xs[1:] * ys[:-1]
+    area = cross.sum() / 2
+    if area:
+        cx = x0 + ((xs[:-1] + xs[1:]) * cross).sum() / (6 * area)
+        cy = y0 + ((ys[:-1] + ys[1:]) * cross).sum() / (6 * area)
+    else:
+        cx, cy = x0, y0
+
+    lat, lon = utm_to_latlon_batch(x, y, zone)
+    clat, clon = utm_to_latlon_batch(cx, cy, zone)
+    bbox = (lat.min(), lon.min(), lat.max(), lon.max())
+    return (float(clat), float(clon)), tuple(float(v) for v in bbox)
+
+
+def haversine_km(lat1, lon1, lat2, lon2, dtype=np.float64):
+    """Great-circle distance in km between broadcastable arrays of points"""
+    lat1 = np.radians(np.asarray(lat1, dtype=dtype))
+    lon1 = np.radians(np.asarray(lon1, dtype=dtype))
+    lat2 = np.radians(np.asarray(lat2, dtype=dtype))
+    lon2 = np.radians(np.asarray(lon2, dtype=dtype))
+    sin_dlat = np.sin((lat2 - lat1) / 2)
+    sin_dlon = np.sin((lon2 - lon1) / 2)
+    a = sin_dlat * sin_dlat + np.cos(lat1) * np.cos(lat2) * sin_dlon * sin_dlon
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def iter_distance_blocks(lats1, lons1, lats2, lons2, dtype=np.float64, max_bytes=DEFAULT_BLOCK_BYTES):
+    """Yield (row_slice, block) pieces of the len(lats1) x len(lats2) distance matrix.
+
+    Each block holds as many rows as fit in `max_bytes`, counting the handful
+    of same-sized temporaries the haversine needs.
+    """
+    dtype = np.dtype(dtype)
+    lat1 = np.radians(np.asarray(lats1, dtype=dtype)).reshape(-1, 1)
+    lon1 = np.radians(np.asarray(lons1, dtype=dtype)).reshape(-1, 1)
+    lat2 = np.radians(np.asarray(lats2, dtype=dtype)).reshape(1, -1)
+    lon2 = np.radians(np.asarray(lons2, dtype=dtype)).reshape(1, -1)
+    cos1, cos2 = np.cos(lat1), np.cos(lat2)
+
+    row_bytes = max(1, lat2.shape[1]) * dtype.itemsize * 4
+    rows = max(1, int(max_bytes // row_bytes))
+    for start in range(0, lat1.shape[0], rows):
+        stop = min(start + rows, lat1.shape[0])
+        block = np.sin((lat2 - lat1[start:stop]) / 2)
+        block *= block
+        sin_dlon = np.sin((lon2 - lon1[start:stop]) / 2)
+        sin_dlon *= sin_dlon
+        sin_dlon *= cos1[start:stop]
+        sin_dlon *= cos2
+        block += sin_dlon
+        del sin_dlon
+        np.clip(block, 0, 1, out=block)
+        np.sqrt(block, out=block)
+        np.arcsin(block, out=block)
+        block *= 2 * EARTH_RADIUS_KM
+        yield slice(start, stop), block
+
+
+def distance_matrix_km(lats1, lons1, lats2=None, lons2=None, dtype=np.float64, max_bytes=DEFAULT_BLOCK_BYTES):
+    """Full many-to-many distance matrix in km (one-to-many when lats1 has one entry).
+
+    With only the first pair of arrays, distances are between those points.
+    """
+    if lats2 is None:
+        lats2, lons2 = lats1, lons1
+    n, m = np.size(lats1), np.size(lats2)
+    out = np.empty((n, m), dtype=dtype)
+    for rows, block in iter_distance_blocks(lats1, lons1, lats2, lons2, dtype, max_bytes):
+        out[rows] = block
+    return out
+
+
+def nearest_other(lats, lons, dtype=np.float64, max_bytes=DEFAULT_BLOCK_BYTES):
+    """For each point, the index of and distance to the nearest other point.
+
+    Works block by block, so the full matrix is never held in memory.
+    """
+    n = np.size(lats)
+    nearest_idx = np.full(n, -1, dtype=np.int64)
+    nearest_km = np.full(n, np.inf, dtype=dtype)
+    for rows, block in iter_distance_blocks(lats, lons, lats, lons, dtype, max_bytes):
+        diag = np.arange(rows.start, rows.stop)
+        block[diag - rows.start, diag] = np.inf
+        if n > 1:
+            nearest_idx[rows] = np.argmin(block, axis=1)
+            nearest_km[rows] = block[np.arange(len(diag)), nearest_idx[rows]]
+    return nearest_idx, nearest_km
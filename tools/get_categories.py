@@ -1,10 +1,11 @@
 import os
 import json
-import requests
-import time
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from http_cache import get_default_cache
+from mediawiki import MediaWikiBatch
+
 # Load environment variables from .env.local
 load_dotenv(".env.local")
 
@@ -19,37 +20,35 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
-def get_wikipedia_categories(wikipedia_url, lang="no"):
-    """Extract categories from Wikipedia article"""
-    if not wikipedia_url:
-        return []
+def page_title_from_url(wikipedia_url):
+    return wikipedia_url.split("/")[-1]
 
-    try:
-        page_title = wikipedia_url.split("/")[-1]
-
-        # Use appropriate API endpoint based on language
-        api_url = f"https://{lang}.wikipedia.org/w/api.php"
-        params = {
-            "action": "query",
-            "format": "json",
-            "titles": page_title,
-            "prop": "categories",
-            "cllimit": "max",
-        }
 
-        response = requests.get(api_url, params=params)
-        data = response.json()
+def category_names(page):
+    """Category titles of an API page without the namespace prefix"""
+    return [
+        cat["title"].replace("Category:", "").replace("Kategori:", "")
+        for cat in (page or {}).get("categories", [])
+    ]
+
+
+def wiki_batch(lang):
+    return MediaWikiBatch(
+        f"https://{lang}.wikipedia.org/w/api.php",
+        props=("categories",),
+        cache=get_default_cache(),
+    )
 
-        pages = data.get("query", {}).get("pages", {})
-        for page_id, page_info in pages.items():
-            if "categories" in page_info:
-                return [
-                    cat["title"].replace("Category:", "").replace("Kategori:", "")
-                    for cat in page_info["categories"]
-                ]
 
+def get_wikipedia_categories(wikipedia_url, lang="no", batch=None):
+    """Extract categories from Wikipedia article"""
+    if not wikipedia_url:
         return []
 
+    try:
+        batch = batch or wiki_batch(lang)
+        return category_names(batch.page(page_title_from_url(wikipedia_url)))
+
     except Exception as e:
         print(f"Error processing {wikipedia_url}: {e}")
         return []
@@ -78,6 +77,20 @@ def main():
 
     print(f"Processing {len(fjords)} fjords...")
 
+    # Queue every unprocessed article so categories come back 50 titles per request
+    batches = {"no": wiki_batch("no"), "en": wiki_batch("en")}
+    for fjord in fjords:
+        if fjord["id"] in existing_data:
+            continue
+        for lang, url in (("no", fjord["wikipedia_url_no"]), ("en", fjord["wikipedia_url_en"])):
+            if url:
+                batches[lang].add_titles([page_title_from_url(url)])
+    for lang, batch in batches.items():
+        try:
+            batch.flush()
+        except Exception as e:
+            print(f"Error fetching {lang} categories in batch: {e}")
+
     for fjord in fjords:
         id = fjord["id"]
         name = fjord["name"]
@@ -92,12 +105,12 @@ def main():
         print(f"Processing: {name}")
 
         # Get Norwegian categories (primary)
-        no_categories = get_wikipedia_categories(wikipedia_url_no, "no")
+        no_categories = get_wikipedia_categories(wikipedia_url_no, "no", batches["no"])
 
         # Get English categories if available
         en_categories = []
         if wikipedia_url_en:
-            en_categories = get_wikipedia_categories(wikipedia_url_en, "en")
+            en_categories = get_wikipedia_categories(wikipedia_url_en, "en", batches["en"])
 
         existing_data[id] = {
             "id": id,
@@ -108,14 +121,13 @@ def main():
             "categories_en": en_categories,
         }
 
-        time.sleep(1)
-
     # Convert back to list and save
     results = list(existing_data.values())
     with open(json_file, "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
 
     print(f"\\nSaved {len(results)} fjords to {json_file}")
+    print(get_default_cache().summary())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,337 @@
+"""
+Persistent HTTP response cache shared by the tools/ scrapers.
+
+Responses are stored in a SQLite file keyed on the normalized URL plus query
+parameters. A fresh entry (younger than its TTL) is served without touching
+the network; a stale one is revalidated with If-None-Match/If-Modified-Since,
+so an unchanged page costs a 304 instead of a download. Only successful
+responses are stored: MediaWiki API errors such as maxlag arrive as HTTP 200
+and are recognised by their MediaWiki-API-Error header or "error" body
+instead. The file is kept under a size budget by evicting the least recently
+used entries. A hit only records its access time in memory; those are
+written in one batch on the next store, every TOUCH_BATCH hits, or on
+flush()/close() (the default cache flushes at exit), so serving from the
+cache costs no disk write. Requests that do reach the network go through the
+cache's rate_limit.HostRateLimiter. The async aget runs its SQLite work in a
+worker thread, keeping disk I/O off the event loop.
+
+    cache = get_default_cache()
+    response = cache.get(url, params=params, session=session, timeout=10)
+    response.json(), response.text, response.from_cache
+    print(cache.summary())
+
+Environment:
+    HTTP_CACHE_PATH     cache file (default: tools/http_cache.sqlite)
+    HTTP_CACHE_TTL      seconds an entry is served without revalidation
+    HTTP_CACHE_OFFLINE  "1" to serve only from the cache and never hit the network
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from rate_limit import get_default_limiter
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache.sqlite")
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+TOUCH_BATCH = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    encoding TEXT,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class OfflineCacheMiss(requests.exceptions.RequestException):
+    """Raised in offline mode when a request isn't in the cache"""
+
+
+def is_cacheable(response):
+    """A 200 that isn't a MediaWiki API error; those also arrive as 200s"""
+    if response.status_code != 200 or "MediaWiki-API-Error" in response.headers:
+        return False
+    if "json" not in response.headers.get("Content-Type", ""):
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return not (isinstance(body, dict) and "error" in body)
+
+
+def cache_key(url, params=None):
+    """Normalized URL: lower-case scheme/host, no fragment, query params merged and sorted"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items() if v is not None)
+    query.sort()
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), "")
+    )
+
+
+class CachedResponse:
+    """The parts of requests.Response the scrapers use, backed by a cache row"""
+
+    def __init__(self, url, status_code, headers, content, encoding=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+
+class HttpCache:
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, offline=False, limiter=None):
+        self.path = path
+        self.limiter = limiter
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Access times of cache hits not yet written, by key
+        self._touched = {}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    # Storage
+
+    def _lookup(self, key):
+        with self._lock:
+            return self._db.execute(
+                "SELECT url, status, headers, encoding, body, etag, last_modified, fetched_at"
+                " FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+    def _touch(self, key):
+        """Note a hit's access time; written with the next batch"""
+        with self._lock:
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touches()
+                self._db.commit()
+
+    def _refresh(self, key):
+        """Restart a revalidated entry's TTL; it already cost a request, so write it now"""
+        now = time.time()
+        with self._lock:
+            self._touched.pop(key, None)
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ?, fetched_at = ? WHERE key = ?", (now, now, key)
+            )
+            self._db.commit()
+
+    def _write_touches(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _store(self, key, response):
+        headers = dict(response.headers)
+        lower = {k.lower(): v for k, v in headers.items()}
+        body = response.content
+        now = time.time()
+        with self._lock:
+            # Pending access times go first, so eviction sees them and this
+            # store's own times aren't overwritten by an older hit
+            self._write_touches()
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    str(response.url),
+                    response.status_code,
+                    json.dumps(headers),
+                    response.encoding,
+                    body,
+                    lower.get("etag"),
+                    lower.get("last-modified"),
+                    now,
+                    now,
+                    len(body),
+                ),
+            )
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the file is under max_bytes"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    @staticmethod
+    def _response(row, from_cache=True):
+        url, status, headers, encoding, body, _, _, _ = row
+        return CachedResponse(url, status, json.loads(headers), body, encoding, from_cache)
+
+    # Requests
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _plan(self, key, ttl):
+        """(cached row, cached response or None, conditional headers) for a request"""
+        row = self._lookup(key)
+        ttl = self.ttl if ttl is None else ttl
+        if row is not None and (self.offline or time.time() - row[7] < ttl):
+            self._count("hits")
+            self._touch(key)
+            return row, self._response(row), {}
+        if self.offline:
+            self._count("misses")
+            raise OfflineCacheMiss(f"not in cache (offline mode): {key}")
+
+        conditional = {}
+        if row is not None:
+            if row[5]:
+                conditional["If-None-Match"] = row[5]
+            if row[6]:
+                conditional["If-Modified-Since"] = row[6]
+        return row, None, conditional
+
+    def _finish(self, key, row, response):
+        if response.status_code == 304 and row is not None:
+            self._count("revalidated")
+            self._refresh(key)
+            return self._response(row)
+        self._count("misses")
+        if is_cacheable(response):
+            self._store(key, response)
+        return response
+
+    def get(self, url, params=None, session=None, ttl=None, **kwargs):
+        """GET through the cache with a requests session; returns a response-like object.
+
+        Only requests that reach the network take a token from the limiter.
+        """
+        key = cache_key(url, params)
+        row, cached, conditional = self._plan(key, ttl)
+        if cached is not None:
+            return cached
+        headers = {**kwargs.pop("headers", {}), **conditional}
+        session = session or requests
+        if self.limiter is None:
+            response = session.get(url, params=params, headers=headers, **kwargs)
+        else:
+            response = self.limiter.get(session, url, params=params, headers=headers, **kwargs)
+        response.from_cache = False
+        return self._finish(key, row, response)
+
+    async def aget(self, fetch, url, params=None, ttl=None, headers=None):
+        """Async GET through the cache.
+
+        `fetch` is a coroutine function called as fetch(url, params=..., headers=...)
+        returning an httpx response; it only runs when the network is needed
+        and is responsible for its own rate limiting.
+        """
+        key = cache_key(url, params)
+        row, cached, conditional = await asyncio.to_thread(self._plan, key, ttl)
+        if cached is not None:
+            return cached
+        response = await fetch(url, params=params, headers={**(headers or {}), **conditional})
+        response.from_cache = False
+        return await asyncio.to_thread(self._finish, key, row, response)
+
+    def responses(self, url_pattern="%"):
+        """Every stored response whose URL matches a SQL LIKE pattern"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, status, headers, encoding, body, etag, last_modified, fetched_at"
+                " FROM responses WHERE url LIKE ? ORDER BY url",
+                (url_pattern,),
+            ).fetchall()
+        return [self._response(row) for row in rows]
+
+    def summary(self):
+        total = self.hits + self.revalidated + self.misses
+        if not total:
+            return "HTTP cache: no requests"
+        saved = (self.hits + self.revalidated) / total
+        return (
+            f"HTTP cache: {total} requests, {self.hits} hits, {self.revalidated} revalidated, "
+            f"{self.misses} downloaded ({saved:.0%} served from cache), {self.evictions} evicted"
+        )
+
+    def flush(self):
+        """Write the access times of hits still held in memory"""
+        with self._lock:
+            self._write_touches()
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._write_touches()
+            self._db.commit()
+            self._db.close()
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Process-wide cache configured from the HTTP_CACHE_* environment variables"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache(
+            path=os.getenv("HTTP_CACHE_PATH", DEFAULT_CACHE_FILE),
+            ttl=float(os.getenv("HTTP_CACHE_TTL", DEFAULT_TTL)),
+            offline=os.getenv("HTTP_CACHE_OFFLINE", "") not in ("", "0"),
+            limiter=get_default_limiter(),
+        )
+        atexit.register(_default_cache.flush)
+    return _default_cache
@@ -0,0 +1,114 @@
+"""
+Reconcile one fjord's measurements across language editions and extraction methods.
+
+Every value the extractor finds becomes a Candidate: the field (in km for
+length/width, m for depth, already unit-normalized by the extractor), where it
+came from and how. fuse() picks, per field, the candidate from the
+highest-priority language (infobox before article text on the same page),
+then compares it with every other candidate under FIELD_TOLERANCES. Sources
+on other pages that agree raise the field's confidence; any source that
+disagrees lowers it and is reported as a conflict.
+
+The extractor reads languages in priority order until covered() says the
+fields in STOP_FIELDS all have a candidate.
+
+    candidates = [Candidate('length_km', 12.5, '12,5 km', 'no', url, 'infobox'), ...]
+    fields, conflicts = fuse(fjord_id, candidates, ['no', 'nn', 'en', 'da', 'ceb'])
+    fields['length_km'].value, fields['length_km'].confidence
+"""
+
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FUSED_FIELDS = ('length_km', 'depth_m', 'width_km')
+
+# Fields worth fetching another page for. Width is only ever read from
+# infoboxes, which most fjord articles lack, so waiting for it would download
+# every language's page of those fjords; it is kept when a page read for the
+# other fields happens to have it.
+STOP_FIELDS = ('length_km', 'depth_m')
+
+# Two values agree when their difference is within either the relative
+# tolerance or the absolute one (in the field's unit)
+FIELD_TOLERANCES = {
+    'length_km': (0.10, 0.5),
+    'depth_m': (0.10, 10.0),
+    'width_km': (0.15, 0.2),
+}
+
+# Infobox values are curated; text patterns can catch an unrelated number
+METHOD_ORDER = ('infobox', 'text')
+METHOD_CONFIDENCE = {'infobox': 0.8, 'text': 0.6}
+AGREEMENT_BONUS = 0.1
+CONFLICT_PENALTY = 0.2
+
+Candidate = namedtuple('Candidate', ['field', 'value', 'raw', 'language', 'url', 'method'])
+
+FusedField = namedtuple('FusedField', ['value', 'source', 'agreeing', 'conflicting', 'confidence'])
+
+
+def values_agree(field: str, a: float, b: float) -> bool:
+    relative, absolute = FIELD_TOLERANCES[field]
+    difference = abs(a - b)
+    return difference <= absolute or difference <= relative * max(abs(a), abs(b))
+
+
+def covered(candidates: Iterable[Candidate], fields: Tuple[str, ...] = STOP_FIELDS) -> bool:
+    """True once every field has at least one candidate."""
+    return set(fields) <= {candidate.field for candidate in candidates}
+
+
+def fuse_field(candidates: List[Candidate], language_priority: List[str]) -> Optional[FusedField]:
+    """The best-ranked value for one field, with the sources that back or contradict it."""
+    if not candidates:
+        return None
+    ordered = sorted(candidates, key=lambda c: source_rank(c, language_priority))
+    source = ordered[0]
+    agreeing = [c for c in ordered[1:] if values_agree(c.field, c.value, source.value)]
+    conflicting = [c for c in ordered[1:] if not values_agree(c.field, c.value, source.value)]
+
+    # Infobox and text of the same page are not independent confirmations
+    confirmations = len({c.url for c in agreeing if c.url != source.url})
+    confidence = (
+        METHOD_CONFIDENCE.get(source.method, 0.5)
+        + AGREEMENT_BONUS * confirmations
+        - CONFLICT_PENALTY * len(conflicting)
+    )
+    return FusedField(source.value, source, agreeing, conflicting, round(min(1.0, max(0.05, confidence)), 2))
+
+
+def fuse(fjord_id: int, candidates: List[Candidate], language_priority: List[str]) -> Tuple[Dict[str, FusedField], List[Dict]]:
+    """Fused fields by name, and one conflict record per field whose sources disagree."""
+    fields = {}
+    conflicts = []
+    for field in FUSED_FIELDS:
+        fused = fuse_field([c for c in candidates if c.field == field], language_priority)
+        if fused is None:
+            continue
+        fields[field] = fused
+        if fused.conflicting:
+            conflicts.append({
+                'fjord_id': fjord_id,
+                'field': field,
+                'chosen': _describe(fused.source),
+                'confidence': fused.confidence,
+                'agreeing': [_describe(c) for c in fused.agreeing],
+                'conflicting': [_describe(c) for c in fused.conflicting],
+            })
+    return fields, conflicts
+
+
+def source_rank(candidate: Candidate, language_priority: List[str]) -> Tuple[int, int]:
+    """Sort key: language priority, then infobox before text."""
+    language = language_priority.index(candidate.language) if candidate.language in language_priority else len(language_priority)
+    return language, METHOD_ORDER.index(candidate.method)
+
+
+def _describe(candidate: Candidate) -> Dict:
+    return {
+        'value': candidate.value,
+        'raw': candidate.raw,
+        'language': candidate.language,
+        'method': candidate.method,
+        'url': candidate.url,
+    }
@@ -0,0 +1,192 @@
+"""
+Language tables and a single-pass regex scanner for fjord measurements.
+
+TEXT_PATTERNS lists, per language and measurement, the article-text regexes
+in the order the extractor tries them; INFOBOX_FIELDS lists the infobox
+headers for each measurement. Both are built once at import.
+
+Running every pattern with re.finditer over a long article means one full
+scan of the text per pattern. Every text pattern has the form
+`prefix(\\d...)rest`, where the prefix (e.g. "er\\s+", "length\\s+of\\s+",
+an optional "ca.") never contains a digit. So a match can only start
+between the end of the previous digit run and the digit run it measures.
+MeasurementScanner finds the digit runs in one C-level pass, tests all of
+a language's rests at once with a lookahead alternation of named groups,
+and only resolves the prefix for the rests that matched. scan() returns
+every hit each pattern would have produced with re.finditer: same
+matches, same order, non-overlapping per pattern.
+
+    hits = TEXT_SCANNERS['no'].scan(text)
+    for hit in hits:
+        hit.kind, hit.pattern_id, hit.match.group(0)
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, List
+
+INFOBOX_FIELDS = {
+    'no': {  # Norwegian Bokmål
+        'length': ['lengde'],
+        'depth': ['dybde', 'største dybde', 'maksimal dybde'],
+        'width': ['bredde', 'største bredde', 'maksimal bredde']
+    },
+    'nn': {  # Norwegian Nynorsk
+        'length': ['lengde'],
+        'depth': ['dybde', 'største dybde'],
+        'width': ['breidde', 'største breidde']
+    },
+    'en': {  # English
+        'length': ['max. length', 'length', 'max length'],
+        'depth': ['max. depth', 'depth', 'max depth', 'maximum depth'],
+        'width': ['max. width', 'width', 'max width', 'maximum width']
+    },
+    'da': {  # Danish
+        'length': ['længde'],
+        'depth': ['dybde', 'største dybde'],
+        'width': ['bredde', 'største bredde']
+    },
+    'ceb': {  # Cebuano (often similar to English)
+        'length': ['gitas-on', 'length'],
+        'depth': ['giladmon', 'depth'],
+        'width': ['gilapdon', 'width']
+    }
+}
+
+TEXT_PATTERNS = {
+    'no': {  # Norwegian Bokmål
+        'length': [
+            r'(\d+(?:,\d+)?)\s*kilometer?\s+lang',
+            r'(\d+(?:,\d+)?)\s*km\s+lang',
+            r'er\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+lang',
+            r'lengde\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)',
+            r'(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+(?:i\s+)?lengde',
+            r'(?:ca\.?\s*|rundt\s+|cirka\s+)?(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+lang',
+            r'(\d+(?:,\d+)?)-(\d+(?:,\d+)?)\s*(?:kilometer?|km)\s+lang'  # ranges
+        ],
+        'depth': [
+            r'(\d+(?:,\d+)?)\s*meter?\s+dyp',
+            r'(\d+(?:,\d+)?)\s*m\s+dyp',
+            r'dybde\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:meter?|m)',
+            r'(?:ca\.?\s*|rundt\s+|cirka\s+)?(\d+(?:,\d+)?)\s*(?:meter?|m)\s+dyp',
+            r'(\d+(?:,\d+)?)-(\d+(?:,\d+)?)\s*(?:meter?|m)\s+dyp'  # ranges
+        ]
+    },
+    'nn': {  # Norwegian Nynorsk - similar patterns
+        'length': [
+            r'(\d+(?:,\d+)?)\s*kilometer?\s+lang',
+            r'(\d+(?:,\d+)?)\s*km\s+lang',
+            r'lengde\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)'
+        ],
+        'depth': [
+            r'(\d+(?:,\d+)?)\s*meter?\s+djup',  # "djup" in Nynorsk
+            r'(\d+(?:,\d+)?)\s*m\s+djup',
+            r'djupne\s+(?:på|av)\s+(\d+(?:,\d+)?)\s*(?:meter?|m)'
+        ]
+    },
+    'en': {  # English
+        'length': [
+            r'(\d+(?:\.\d+)?)\s*(?:kilometres?|kilometers?|km)\s+long',
+            r'length\s+of\s+(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)',
+            r'(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)\s+(?:in\s+)?length',
+            r'(?:approximately|about|around)\s+(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)\s+long',
+            r'(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)\s*(?:km|kilometres?|kilometers?)\s+long'  # ranges
+        ],
+        'depth': [
+            r'(\d+(?:\.\d+)?)\s*(?:metres?|meters?|m)\s+deep',
+            r'depth\s+of\s+(\d+(?:\.\d+)?)\s*(?:m|metres?|meters?)',
+            r'(?:approximately|about|around)\s+(\d+(?:\.\d+)?)\s*(?:m|metres?|meters?)\s+deep',
+            r'(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)\s*(?:m|metres?|meters?)\s+deep'  # ranges
+        ]
+    },
+    'da': {  # Danish - similar to Norwegian
+        'length': [
+            r'(\d+(?:,\d+)?)\s*kilometer?\s+lang',
+            r'(\d+(?:,\d+)?)\s*km\s+lang',
+            r'længde\s+(?:på|af)\s+(\d+(?:,\d+)?)\s*(?:kilometer?|km)'
+        ],
+        'depth': [
+            r'(\d+(?:,\d+)?)\s*meter?\s+dyb',
+            r'(\d+(?:,\d+)?)\s*m\s+dyb',
+            r'dybde\s+(?:på|af)\s+(\d+(?:,\d+)?)\s*(?:meter?|m)'
+        ]
+    }
+}
+
+_DIGIT_RUN = re.compile(r'\d+')
+
+Hit = namedtuple('Hit', ['kind', 'index', 'pattern_id', 'is_range', 'match'])
+
+
+class _Pattern:
+    def __init__(self, kind: str, index: int, source: str):
+        split = source.find(r'(\d')
+        if split < 0 or r'\d' in source[:split]:
+            raise ValueError(f"Measurement pattern must be prefix(\\d...)...: {source}")
+        self.kind = kind
+        self.index = index
+        self.pattern_id = f'{kind}.{index}'
+        self.source = source
+        self.full = re.compile(source, re.IGNORECASE)
+        self.rest = source[split:]
+        prefix = source[:split]
+        # The prefix must end exactly where the digit run starts
+        self.prefix = re.compile(f'(?:{prefix})\\Z', re.IGNORECASE) if prefix else None
+        # Ranges are averaged by the extractor
+        self.is_range = '-' in source and self.full.groups > 1
+
+
+class MeasurementScanner:
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self.patterns = [
+            _Pattern(kind, index, source)
+            for kind, sources in patterns.items()
+            for index, source in enumerate(sources)
+        ]
+        # One optional lookahead per pattern rest: a single match() at a digit
+        # run reports every pattern that can continue from there
+        self._rests = re.compile(
+            ''.join(f'(?=(?P<p{i}>{p.rest}))?' for i, p in enumerate(self.patterns)),
+            re.IGNORECASE,
+        )
+        self._groups = [f'p{i}' for i in range(len(self.patterns))]
+
+    def scan(self, text: str) -> List[Hit]:
+        """Every pattern's re.finditer matches, ordered by pattern then position."""
+        found = [[] for _ in self.patterns]
+        last_end = [0] * len(self.patterns)
+        previous_run_end = 0
+        for run in _DIGIT_RUN.finditer(text):
+            digit = run.start()
+            rests = self._rests.match(text, digit)
+            if rests.lastindex is None:
+                previous_run_end = run.end()
+                continue
+            for i, group in enumerate(self._groups):
+                if rests.start(group) < 0 or digit < last_end[i]:
+                    continue
+                pattern = self.patterns[i]
+                start = self._start(pattern, text, max(previous_run_end, last_end[i]), digit)
+                if start is None:
+                    continue
+                match = pattern.full.match(text, start)
+                if match is None:
+                    continue
+                found[i].append(Hit(pattern.kind, pattern.index, pattern.pattern_id, pattern.is_range, match))
+                last_end[i] = match.end()
+            previous_run_end = run.end()
+        return [hit for hits in found for hit in hits]
+
+    @staticmethod
+    def _start(pattern: _Pattern, text: str, low: int, digit: int):
+        """Leftmost position in [low, digit] where the pattern's prefix ends at the digit run."""
+        if pattern.prefix is None:
+            return digit
+        prefix = pattern.prefix.search(text, low, digit)
+        if prefix is not None:
+            return prefix.start()
+        # An optional prefix may be absent
+        return digit if pattern.prefix.fullmatch('') else None
+
+
+TEXT_SCANNERS = {language: MeasurementScanner(patterns) for language, patterns in TEXT_PATTERNS.items()}
@@ -0,0 +1,205 @@
+"""
+Batched MediaWiki API page queries.
+
+The query API accepts up to 50 pipe-separated titles per request and pages
+through long prop lists with `continue`. MediaWikiBatch collects pending
+title lookups, sends them as multi-title prop=categories|langlinks|coordinates
+queries, follows continuation, and hands each caller back the page for the
+title it asked for (after the API's title normalization).
+
+    batch = MediaWikiBatch("https://no.wikipedia.org/w/api.php")
+    batch.add_titles(["Sognefjorden", "Hardangerfjorden"])   # queued
+    batch.categories("Sognefjorden")                         # one request for both
+
+Pass an http_cache.HttpCache as `cache` to serve repeated queries from disk,
+and redirects=True to have titles that are redirects resolve to their target
+page.
+Every query carries maxlag, so a lagged wiki answers with a maxlag error
+that the rate limiter backs off from instead of adding load.
+The request helpers are plain functions so the asyncio engine in
+wiki_async.py can drive the same queries over its own client.
+"""
+
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+from rate_limit import get_default_limiter
+
+MAX_TITLES = 50
+MAXLAG = 5
+DEFAULT_PROPS = ("categories", "langlinks", "coordinates")
+
+# Props whose values arrive as lists that continuation may split across
+# responses, with what identifies one entry of each
+_LIST_PROPS = {
+    "categories": lambda item: item.get("title"),
+    "langlinks": lambda item: item.get("lang"),
+    "coordinates": lambda item: (item.get("lat"), item.get("lon"), "primary" in item),
+}
+
+
+def title_from_url(url):
+    """Page title of a /wiki/ article URL, percent-decoded"""
+    path = urlsplit(url).path
+    if "/wiki/" in path:
+        return unquote(path.split("/wiki/", 1)[1])
+    return unquote(path.rsplit("/", 1)[-1])
+
+
+def api_url_for_page(url):
+    """The api.php endpoint of the wiki an article URL belongs to"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/w/api.php"
+
+
+def chunked_titles(titles, size=MAX_TITLES):
+    """Split titles into request-sized lists, dropping duplicates"""
+    unique = list(dict.fromkeys(titles))
+    return [unique[i : i + size] for i in range(0, len(unique), size)]
+
+
+def query_params(titles, props=DEFAULT_PROPS, redirects=False):
+    """Parameters for one multi-title prop query"""
+    params = {
+        "action": "query",
+        "format": "json",
+        "titles": "|".join(titles),
+        "prop": "|".join(props),
+        "maxlag": MAXLAG,
+    }
+    if redirects:
+        params["redirects"] = 1
+    if "categories" in props:
+        params["cllimit"] = "max"
+    if "langlinks" in props:
+        params["lllimit"] = "max"
+    if "coordinates" in props:
+        params["colimit"] = "max"
+        params["coprimary"] = "all"
+    return params
+
+
+def merge_response(pages, aliases, data):
+    """Fold one API response into `pages` (keyed by page title) and `aliases`.
+
+    `aliases` maps a requested title to what the API turned it into: its
+    normalized form, and with redirects=1 the redirect's target.
+
+    List props are appended, since a continued response carries the next
+    slice of the same page's categories/langlinks/coordinates. Entries the
+    page already has are skipped, so a page fetched again (two titles
+    normalizing to it, overlapping prefetches) isn't duplicated.
+    """
+    query = data.get("query", {})
+    for item in query.get("normalized", []) + query.get("redirects", []):
+        aliases[item["from"]] = item["to"]
+    for page in query.get("pages", {}).values():
+        title = page.get("title")
+        if title is None:
+            continue
+        merged = pages.setdefault(title, {})
+        for key, value in page.items():
+            if key in _LIST_PROPS:
+                entries = merged.setdefault(key, [])
+                identity = _LIST_PROPS[key]
+                seen = {identity(item) for item in entries}
+                for item in value:
+                    if identity(item) not in seen:
+                        seen.add(identity(item))
+                        entries.append(item)
+            else:
+                merged[key] = value
+
+
+def continue_params(data):
+    """The parameters to send for the next page of a query, or None when done"""
+    return data.get("continue")
+
+
+def resolve_page(pages, aliases, title):
+    """The page a requested title ended up as, or None if it's missing or invalid"""
+    seen = set()
+    # A title can be normalized and then redirected
+    while title in aliases and title not in seen:
+        seen.add(title)
+        title = aliases[title]
+    page = pages.get(title)
+    if page is None or "missing" in page or "invalid" in page:
+        return None
+    return page
+
+
+class MediaWikiBatch:
+    """Collects title lookups against one wiki and resolves them 50 at a time"""
+
+    def __init__(self, api_url, props=DEFAULT_PROPS, session=None, batch_size=MAX_TITLES, timeout=10, cache=None, redirects=False):
+        self.api_url = api_url
+        self.cache = cache
+        self.props = tuple(props)
+        self.redirects = redirects
+        self.session = session or requests.Session()
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.requests_sent = 0
+        self._pending = []
+        self._resolved = set()
+        self._pages = {}
+        self._aliases = {}
+
+    def _get(self, params):
+        if self.cache is None:
+            response = get_default_limiter().get(self.session, self.api_url, params=params, timeout=self.timeout)
+        else:
+            response = self.cache.get(self.api_url, params=params, session=self.session, timeout=self.timeout)
+        if not getattr(response, "from_cache", False):
+            self.requests_sent += 1
+        return response
+
+    def add_titles(self, titles):
+        """Queue titles for the next flush; already-resolved titles are skipped"""
+        for title in titles:
+            if title and title not in self._resolved:
+                self._pending.append(title)
+
+    def flush(self):
+        """Send every pending title, following continuation for each batch"""
+        pending, self._pending = self._pending, []
+        for titles in chunked_titles(pending, self.batch_size):
+            params = query_params(titles, self.props, self.redirects)
+            while True:
+                response = self._get(params)
+                response.raise_for_status()
+                data = response.json()
+                merge_response(self._pages, self._aliases, data)
+                cont = continue_params(data)
+                if not cont:
+                    break
+                params = {**query_params(titles, self.props, self.redirects), **cont}
+            self._resolved.update(titles)
+
+    def page(self, title):
+        """Page dict for a title, fetching it (with anything else pending) if needed"""
+        if title not in self._resolved:
+            self.add_titles([title])
+            self.flush()
+        return resolve_page(self._pages, self._aliases, title)
+
+    def fetch(self, titles):
+        """Resolve many titles at once; returns {title: page or None}"""
+        titles = list(titles)
+        self.add_titles(titles)
+        self.flush()
+        return {title: resolve_page(self._pages, self._aliases, title) for title in titles}
+
+    def categories(self, title):
+        page = self.page(title)
+        return page.get("categories", []) if page else []
+
+    def langlinks(self, title):
+        page = self.page(title)
+        return page.get("langlinks", []) if page else []
+
+    def coordinates(self, title):
+        page = self.page(title)
+        return page.get("coordinates", []) if page else []
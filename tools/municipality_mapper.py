@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 import os
 import sys
-import requests
 import json
 import re
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from http_cache import get_default_cache
+
 # Load environment variables
 load_dotenv(".env.local")
 
@@ -35,7 +36,7 @@ def get_municipality_county(municipality_name):
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = get_default_cache().get(url, params=params, timeout=10)
         data = response.json()
 
         pages = data["query"]["pages"]
@@ -84,7 +85,7 @@ def get_municipality_county(municipality_name):
             "section": 0,
         }
 
-        response = requests.get(url, params=params, timeout=10)
+        response = get_default_cache().get(url, params=params, timeout=10)
         data = response.json()
 
         if "parse" in data and "text" in data["parse"]:
@@ -200,6 +201,8 @@ def main():
                         f"  - {result['municipality_name']} (extracted: {result['extracted_county']})"
                     )
 
+        print(f"\n{get_default_cache().summary()}")
+
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
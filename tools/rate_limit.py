@@ -0,0 +1,202 @@
+"""
+Per-host token-bucket rate limiting for the tools/ scrapers.
+
+Every network request takes a token from its host's bucket, which refills
+at `rate` tokens per second up to `burst`. Requests only wait when the bucket
+is empty, so throughput runs at the configured polite maximum instead of
+being set by fixed sleeps, and cache hits (which never reach the limiter)
+cost nothing.
+
+When a server pushes back (HTTP 429/503, or a MediaWiki maxlag error), the
+bucket honours Retry-After, halves its rate and recovers additively on
+later successes. A request still throttled after max_retries raises
+ThrottledError rather than returning the throttled response: a maxlag error
+arrives as HTTP 200, which callers would otherwise take for a result.
+
+Buckets are safe to share between threads and asyncio tasks: a token is
+reserved under a lock and the wait happens outside it, with time.sleep or
+asyncio.sleep respectively.
+
+    limiter = get_default_limiter()
+    response = limiter.get(session, url, params=params, timeout=10)
+    response = await limiter.get_async(client, url, params=params)
+
+Environment:
+    RATE_LIMIT_RPS    requests per second per host (default: 5)
+    RATE_LIMIT_BURST  requests allowed back to back (default: 10)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+DEFAULT_MAX_RETRIES = 3
+MAX_BACKOFF = 300
+
+
+class ThrottledError(Exception):
+    """The server was still throttling a request after every retry"""
+
+    def __init__(self, url, response):
+        super().__init__(f"Still throttled after retries (HTTP {response.status_code}): {url}")
+        self.url = url
+        self.response = response
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttled(response):
+    """True when the server asked us to slow down"""
+    if response.status_code in (429, 503):
+        return True
+    return response.headers.get("MediaWiki-API-Error") == "maxlag"
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def backoff(self, retry_after=None):
+        """Slow down after a throttled response; returns the pause in seconds"""
+        with self._lock:
+            self._failures += 1
+            self.rate = max(self.base_rate / 16, self.rate / 2)
+            delay = retry_after if retry_after is not None else min(MAX_BACKOFF, 2.0**self._failures)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self._tokens = min(self._tokens, 0.0)
+            return delay
+
+    def succeeded(self):
+        with self._lock:
+            self._failures = 0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+
+class HostRateLimiter:
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_retries=DEFAULT_MAX_RETRIES):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.waited = 0.0
+        self.backoffs = 0
+        self._host_limits = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host=None, rate=None, burst=None):
+        """Change the limits for one host, or the default for every host without its own"""
+        with self._lock:
+            if host is None:
+                self.rate = rate or self.rate
+                self.burst = burst or self.burst
+                self._buckets = {h: b for h, b in self._buckets.items() if h in self._host_limits}
+            else:
+                self._host_limits[host] = (rate or self.rate, burst or self.burst)
+                self._buckets.pop(host, None)
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self._host_limits.get(host, (self.rate, self.burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def _reserve(self, url):
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            with self._lock:
+                self.waited += delay
+        return delay
+
+    def wait(self, url):
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        delay = self._reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, url, response):
+        """Feed a response back into its host's bucket; True if it should be retried"""
+        bucket = self.bucket(url)
+        if is_throttled(response):
+            bucket.backoff(parse_retry_after(response.headers.get("Retry-After")))
+            with self._lock:
+                self.backoffs += 1
+            return True
+        bucket.succeeded()
+        return False
+
+    def get(self, session, url, **kwargs):
+        """session.get() under the limiter, retrying throttled responses; raises ThrottledError"""
+        for _ in range(self.max_retries + 1):
+            self.wait(url)
+            response = session.get(url, **kwargs)
+            if not self.observe(url, response):
+                return response
+        raise ThrottledError(url, response)
+
+    async def get_async(self, client, url, **kwargs):
+        """await client.get() under the limiter, retrying throttled responses; raises ThrottledError"""
+        for _ in range(self.max_retries + 1):
+            await self.wait_async(url)
+            response = await client.get(url, **kwargs)
+            if not self.observe(url, response):
+                return response
+        raise ThrottledError(url, response)
+
+    def summary(self):
+        return f"Rate limiter: waited {self.waited:.1f}s in total, {self.backoffs} server backoffs"
+
+
+_default_limiter = None
+
+
+def get_default_limiter():
+    """Process-wide limiter configured from the RATE_LIMIT_* environment variables"""
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = HostRateLimiter(
+            rate=float(os.getenv("RATE_LIMIT_RPS", DEFAULT_RATE)),
+            burst=int(os.getenv("RATE_LIMIT_BURST", DEFAULT_BURST)),
+        )
+    return _default_limiter
@@ -0,0 +1,186 @@
+"""
+SQLite result store for the tools/ scrapers, keyed on fjord_id.
+
+Each result is one row: the record as JSON, the flattened CSV row, and the
+language/method columns it can be queried by (indexed, as is fjord_id). put()
+is a single-row upsert, so saving a result costs the same however many are
+stored, and put_many() writes a batch in one transaction. The database runs
+in WAL mode and every write is a committed transaction, so a run that dies
+mid-write leaves the store as of the last commit.
+
+JSON and CSV files are exports, written on demand to a temporary file and
+renamed into place. CSV column names are recorded as rows are stored, so the
+header never needs a pass over every row.
+
+    store = ResultStore("tools/fjord_measurements.sqlite", "measurements")
+    store.put(fjord_id, result, row=csv_row, language="no", method="infobox")
+    store.get(fjord_id), store.query(language="no"), store.records()
+    store.export_json("tools/fjord_measurements.json", keyed=True)
+    store.export_csv("tools/fjord_measurements.csv")
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    collection TEXT NOT NULL,
+    fjord_id INTEGER NOT NULL,
+    language TEXT,
+    method TEXT,
+    data TEXT NOT NULL,
+    row TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (collection, fjord_id)
+);
+CREATE INDEX IF NOT EXISTS results_language ON results (collection, language);
+CREATE INDEX IF NOT EXISTS results_method ON results (collection, method);
+CREATE TABLE IF NOT EXISTS result_columns (
+    collection TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (collection, name)
+);
+"""
+
+_UPSERT = """
+INSERT INTO results (collection, fjord_id, language, method, data, row, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (collection, fjord_id) DO UPDATE SET
+    language = excluded.language,
+    method = excluded.method,
+    data = excluded.data,
+    row = excluded.row,
+    updated_at = excluded.updated_at
+"""
+
+
+class ResultStore:
+    def __init__(self, path, collection):
+        self.path = path
+        self.collection = collection
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM results WHERE collection = ?", (self.collection,)
+            ).fetchone()[0]
+
+    # Writes
+
+    def put(self, fjord_id, record, row=None, language=None, method=None):
+        """Insert or replace one fjord's result"""
+        self.put_many([(fjord_id, record, row, language, method)])
+
+    def put_many(self, items):
+        """Upsert (fjord_id, record, row, language, method) tuples in one transaction"""
+        now = time.time()
+        with self._lock, self._db:
+            for fjord_id, record, row, language, method in items:
+                self._db.execute(
+                    _UPSERT,
+                    (
+                        self.collection,
+                        int(fjord_id),
+                        language,
+                        method,
+                        json.dumps(record, ensure_ascii=False),
+                        json.dumps(row, ensure_ascii=False) if row is not None else None,
+                        now,
+                    ),
+                )
+                if row:
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO result_columns VALUES (?, ?)",
+                        [(self.collection, name) for name in row],
+                    )
+
+    def delete_many(self, fjord_ids):
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM results WHERE collection = ? AND fjord_id = ?",
+                [(self.collection, int(fjord_id)) for fjord_id in fjord_ids],
+            )
+
+    # Reads
+
+    def get(self, fjord_id):
+        with self._lock:
+            found = self._db.execute(
+                "SELECT data FROM results WHERE collection = ? AND fjord_id = ?",
+                (self.collection, int(fjord_id)),
+            ).fetchone()
+        return json.loads(found[0]) if found else None
+
+    def query(self, language=None, method=None):
+        """Records matching every given column, in fjord_id order"""
+        sql = "SELECT data FROM results WHERE collection = ?"
+        params = [self.collection]
+        if language is not None:
+            sql += " AND language = ?"
+            params.append(language)
+        if method is not None:
+            sql += " AND method = ?"
+            params.append(method)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY fjord_id", params).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def records(self):
+        """{fjord_id: record} for the whole collection"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT fjord_id, data FROM results WHERE collection = ? ORDER BY fjord_id",
+                (self.collection,),
+            ).fetchall()
+        return {fjord_id: json.loads(data) for fjord_id, data in rows}
+
+    def columns(self):
+        """Every CSV column name stored so far, sorted"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name FROM result_columns WHERE collection = ? ORDER BY name",
+                (self.collection,),
+            ).fetchall()
+        return [name for name, in rows]
+
+    def _rows(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT row FROM results WHERE collection = ? AND row IS NOT NULL ORDER BY fjord_id",
+                (self.collection,),
+            ).fetchall()
+        return [json.loads(row) for row, in rows]
+
+    # Exports
+
+    def export_json(self, path, keyed=False):
+        """Write every record as a JSON list, or an object keyed by fjord_id with `keyed`"""
+        records = self.records()
+        data = {str(fjord_id): record for fjord_id, record in records.items()} if keyed else list(records.values())
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+        return len(records)
+
+    def export_csv(self, path, fieldnames=None):
+        """Write the stored CSV rows; columns default to every name recorded"""
+        rows = self._rows()
+        with open(path + ".tmp", "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames or self.columns())
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(path + ".tmp", path)
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
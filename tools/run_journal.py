@@ -0,0 +1,78 @@
+"""
+Append-only JSONL journal for long-running tool loops.
+
+Each record is written as one JSON line and fsync'd before append() returns,
+so everything journaled survives a crash or Ctrl-C. A torn final line (the
+process died mid-write) is ignored on replay.
+
+    journal = RunJournal("fjord_wikipedia_matches.journal.jsonl")
+    for record in journal.replay():   # records from an interrupted run
+        ...
+    journal.open()
+    journal.append({"type": "fjord", "fjord_id": 1, ...})
+    journal.remove()                  # after the results are compacted
+"""
+
+import json
+import os
+
+
+class RunJournal:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def replay(self):
+        """Every complete record in the journal, in write order"""
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # Torn write from an interrupted run
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def open(self, truncate=False):
+        """Open for appending; `truncate` starts a fresh journal"""
+        if not truncate:
+            self._drop_torn_tail()
+        self._file = open(self.path, "w" if truncate else "a", encoding="utf-8")
+        return self
+
+    def _drop_torn_tail(self):
+        """Cut a partial final line so new records start on a line of their own"""
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end != len(data):
+                    f.truncate(end)
+        except FileNotFoundError:
+            pass
+
+    def append(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Close and delete the journal once its records are safely compacted"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
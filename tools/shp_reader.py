@@ -0,0 +1,141 @@
+"""
+Memory-mapped reader for ESRI shapefiles (.shp + .shx).
+
+The .shp file is mapped read-only and every polygon is exposed as NumPy views
+into the mapping, so no per-vertex Python objects are created and pages are
+only faulted in as records are visited. The .shx index gives O(1) random
+access by record number; without it the record offsets are found with a
+single header scan.
+
+    with ShpReader("fjordkatalogen_omrade.shp") as shp:
+        for record in shp:
+            ring = record.part(0)  # (n, 2) float64 view, no copy
+
+Views are only valid while the reader is open.
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+SHAPE_NULL = 0
+SHAPE_POLYGON = 5
+
+FILE_HEADER_LEN = 100
+RECORD_HEADER_LEN = 8
+
+_RECORD_HEADER = struct.Struct(">ii")
+_POLYGON_HEADER = struct.Struct("<i4dii")
+
+
+class ShapeRecord:
+    """One shapefile record; `points` and `parts` are views into the file mapping"""
+
+    __slots__ = ("index", "shape_type", "bbox", "parts", "points", "raw")
+
+    def __init__(self, index, shape_type, bbox, parts, points, raw):
+        self.index = index
+        self.shape_type = shape_type
+        self.bbox = bbox
+        self.parts = parts
+        self.points = points
+        self.raw = raw
+
+    @property
+    def num_parts(self):
+        return len(self.parts)
+
+    def part(self, i):
+        """Return part `i` as an (n, 2) view of the point buffer"""
+        start = int(self.parts[i])
+        stop = int(self.parts[i + 1]) if i + 1 < len(self.parts) else len(self.points)
+        return self.points[start:stop]
+
+    def iter_parts(self):
+        for i in range(len(self.parts)):
+            yield self.part(i)
+
+    def part_bounds(self):
+        """(start, stop) vertex offsets of every part"""
+        starts = self.parts.tolist()
+        return list(zip(starts, starts[1:] + [len(self.points)]))
+
+
+class ShpReader:
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        self.shape_type = struct.unpack_from("<i", self._mm, 32)[0]
+        self.bbox = struct.unpack_from("<4d", self._mm, 36)
+        self._offsets = self._load_offsets(os.path.splitext(filename)[0] + ".shx")
+
+    def _load_offsets(self, shx_filename):
+        """Byte offsets of each record header, from the .shx index if present"""
+        if os.path.exists(shx_filename):
+            with open(shx_filename, "rb") as f:
+                index = np.frombuffer(f.read(), dtype=">i4", offset=FILE_HEADER_LEN)
+            # Offsets are stored in 16-bit words
+            return index[0::2].astype(np.int64) * 2
+
+        offsets = []
+        pos = FILE_HEADER_LEN
+        end = len(self._mm)
+        while pos + RECORD_HEADER_LEN <= end:
+            _, content_words = _RECORD_HEADER.unpack_from(self._mm, pos)
+            offsets.append(pos)
+            pos += RECORD_HEADER_LEN + content_words * 2
+        return np.asarray(offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"record {index} out of range")
+        return self._read_record(index, int(self._offsets[index]))
+
+    def __iter__(self):
+        for index, offset in enumerate(self._offsets.tolist()):
+            yield self._read_record(index, offset)
+
+    def _read_record(self, index, offset):
+        _, content_words = _RECORD_HEADER.unpack_from(self._mm, offset)
+        start = offset + RECORD_HEADER_LEN
+        raw = self._buf[start : start + content_words * 2]
+        shape_type = struct.unpack_from("<i", raw, 0)[0]
+
+        if shape_type != SHAPE_POLYGON:
+            empty = np.empty((0, 2), dtype=np.float64)
+            return ShapeRecord(index, shape_type, None, np.zeros(0, np.int32), empty, raw)
+
+        _, xmin, ymin, xmax, ymax, num_parts, num_points = _POLYGON_HEADER.unpack_from(
+            raw, 0
+        )
+        parts_offset = start + _POLYGON_HEADER.size
+        points_offset = parts_offset + 4 * num_parts
+        parts = np.frombuffer(self._mm, dtype="<i4", count=num_parts, offset=parts_offset)
+        points = np.frombuffer(
+            self._mm, dtype="<f8", count=2 * num_points, offset=points_offset
+        ).reshape(num_points, 2)
+        return ShapeRecord(index, shape_type, (xmin, ymin, xmax, ymax), parts, points, raw)
+
+    def close(self):
+        self._buf.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            # Record views are still alive; the mapping is released with them
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
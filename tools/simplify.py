@@ -0,0 +1,76 @@
+"""
+Douglas-Peucker polyline simplification for fjord outlines.
+
+Works on (n, 2) NumPy arrays; the distance computations for each split are
+vectorized, so the Python-level loop runs once per retained vertex rather than
+once per input vertex. Closed rings stay closed: the first and last vertices
+are always kept.
+"""
+
+import numpy as np
+
+DEFAULT_MIN_VERTICES = 8
+
+
+def _segment_distances(points, a, b):
+    """Distance from each point to the segment a-b"""
+    ab = b - a
+    denom = ab @ ab
+    rel = points - a
+    if denom == 0:
+        return np.hypot(rel[:, 0], rel[:, 1])
+    t = np.clip((rel @ ab) / denom, 0.0, 1.0)
+    diff = rel - t[:, None] * ab
+    return np.hypot(diff[:, 0], diff[:, 1])
+
+
+def _douglas_peucker_mask(points, tolerance):
+    """Boolean keep-mask for an open polyline"""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        dists = _segment_distances(points[start + 1 : end], points[start], points[end])
+        i = int(np.argmax(dists))
+        if dists[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def _simplify_once(points, tolerance):
+    closed = len(points) > 3 and np.array_equal(points[0], points[-1])
+    if not closed:
+        return points[_douglas_peucker_mask(points, tolerance)]
+
+    # Anchor the ring at its first vertex and the vertex farthest from it, so
+    # neither half degenerates into a zero-length base segment
+    rel = points - points[0]
+    far = int(np.argmax(rel[:, 0] ** 2 + rel[:, 1] ** 2))
+    keep = np.zeros(len(points), dtype=bool)
+    keep[: far + 1] |= _douglas_peucker_mask(points[: far + 1], tolerance)
+    keep[far:] |= _douglas_peucker_mask(points[far:], tolerance)
+    return points[keep]
+
+
+def simplify_ring(points, tolerance, min_vertices=DEFAULT_MIN_VERTICES):
+    """Simplify a ring or polyline to within `tolerance` (same units as the points).
+
+    If the result would drop below `min_vertices`, the tolerance is halved
+    until it doesn't; rings that are already that small are returned as-is.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if tolerance <= 0 or len(points) <= min_vertices:
+        return points
+    while tolerance > 1e-9:
+        simplified = _simplify_once(points, tolerance)
+        if len(simplified) >= min_vertices:
+            return simplified
+        tolerance /= 2
+    return points
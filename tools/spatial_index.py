@@ -0,0 +1,205 @@
+"""
+Spatial index over fjord centre coordinates.
+
+Points are stored as 3-D unit vectors in a k-d tree, so great-circle
+distance is a monotonic function of straight-line (chord) distance and there
+is no special-casing at the poles or the antimeridian. Leaves are scanned with
+NumPy, which keeps queries over the ~1,500 catalogue fjords well under a
+millisecond.
+
+    index = FjordIndex.from_rows(supabase_rows)          # id, center_lat, center_lng
+    index = FjordIndex.from_csv("fjord_data.csv")        # keyed by svg_filename
+    index.within(61.1, 6.5, radius_km=20)  -> [(id, km), ...] nearest first
+    index.nearest(61.1, 6.5, k=3)          -> [(id, km), ...]
+
+Usage from the command line:
+    python3 tools/spatial_index.py fjord_data.csv LAT LNG [--radius KM | --k N]
+"""
+
+import argparse
+import csv
+import heapq
+import math
+
+import numpy as np
+
+from geodesy import EARTH_RADIUS_KM
+
+
+def latlon_to_unit(lat, lon):
+    """(n, 3) unit vectors for arrays of latitude/longitude in degrees"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)), axis=-1)
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+class FjordIndex:
+    def __init__(self, ids, lats, lons, leaf_size=16):
+        ids = list(ids)
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if not len(ids) == len(lats) == len(lons):
+            raise ValueError("ids, lats and lons must have the same length")
+
+        self.leaf_size = leaf_size
+        self._order = np.arange(len(ids))
+        self._points = latlon_to_unit(lats, lons).reshape(-1, 3)
+        # Node arrays: vertex range into the permuted points, children, bbox
+        self._start, self._end = [], []
+        self._left, self._right = [], []
+        self._box_min, self._box_max = [], []
+        if len(ids):
+            self._build(0, len(ids))
+        self._points = self._points[self._order]
+        self._ids = [ids[i] for i in self._order.tolist()]
+        self._box_min = np.asarray(self._box_min)
+        self._box_max = np.asarray(self._box_max)
+
+    @classmethod
+    def from_rows(cls, rows, id_key="id", lat_key="center_lat", lng_key="center_lng", **kwargs):
+        """Build from dict rows (e.g. fjordle_fjords query results), skipping rows without coordinates"""
+        ids, lats, lons = [], [], []
+        for row in rows:
+            if row.get(lat_key) in (None, "") or row.get(lng_key) in (None, ""):
+                continue
+            ids.append(row[id_key])
+            lats.append(float(row[lat_key]))
+            lons.append(float(row[lng_key]))
+        return cls(ids, lats, lons, **kwargs)
+
+    @classmethod
+    def from_csv(cls, filename, id_column="svg_filename", **kwargs):
+        """Build from fjord_data.csv as written by generate_fjord_svgs.py"""
+        with open(filename, "r", encoding="utf-8") as f:
+            return cls.from_rows(csv.DictReader(f), id_key=id_column, **kwargs)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _build(self, start, end):
+        node = len(self._start)
+        self._start.append(start)
+        self._end.append(end)
+        self._left.append(-1)
+        self._right.append(-1)
+        pts = self._points[self._order[start:end]]
+        self._box_min.append(pts.min(axis=0))
+        self._box_max.append(pts.max(axis=0))
+        if end - start > self.leaf_size:
+            axis = int(np.argmax(self._box_max[node] - self._box_min[node]))
+            mid = (end - start) // 2
+            part = np.argpartition(pts[:, axis], mid)
+            self._order[start:end] = self._order[start:end][part]
+            self._left[node] = self._build(start, start + mid)
+            self._right[node] = self._build(start + mid, end)
+        return node
+
+    def _box_chord(self, node, q):
+        """Lower bound on chord distance from q to anything in the node"""
+        d = np.maximum(self._box_min[node] - q, 0) + np.maximum(q - self._box_max[node], 0)
+        return math.sqrt(float(d @ d))
+
+    def _leaf_chords(self, node, q):
+        diff = self._points[self._start[node] : self._end[node]] - q
+        return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+
+    def _within_unit(self, q, max_chord):
+        hits_idx, hits_chord = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_chord(node, q) > max_chord:
+                continue
+            if self._left[node] < 0:
+                chords = self._leaf_chords(node, q)
+                mask = chords <= max_chord
+                if mask.any():
+                    hits_idx.append(np.nonzero(mask)[0] + self._start[node])
+                    hits_chord.append(chords[mask])
+            else:
+                stack.append(self._left[node])
+                stack.append(self._right[node])
+        if not hits_idx:
+            return []
+        idx = np.concatenate(hits_idx)
+        km = chord_to_km(np.concatenate(hits_chord))
+        order = np.argsort(km, kind="stable")
+        return [(self._ids[i], float(d)) for i, d in zip(idx[order].tolist(), km[order].tolist())]
+
+    def _nearest_unit(self, q, k):
+        best = []  # max-heap of (-chord, idx)
+        heap = [(0.0, 0)]
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if self._left[node] < 0:
+                chords = self._leaf_chords(node, q)
+                for i, c in zip(range(self._start[node], self._end[node]), chords.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-c, i))
+                    elif c < -best[0][0]:
+                        heapq.heapreplace(best, (-c, i))
+            else:
+                for child in (self._left[node], self._right[node]):
+                    heapq.heappush(heap, (self._box_chord(child, q), child))
+        best.sort(key=lambda item: -item[0])
+        return [(self._ids[i], float(chord_to_km(-c))) for c, i in best]
+
+    def within(self, lat, lon, radius_km):
+        """Fjords within `radius_km` of a point as [(id, km)], nearest first"""
+        if not len(self):
+            return []
+        return self._within_unit(latlon_to_unit(lat, lon), km_to_chord(radius_km))
+
+    def nearest(self, lat, lon, k=1):
+        """The `k` nearest fjords to a point as [(id, km)], nearest first"""
+        if not len(self) or k < 1:
+            return []
+        return self._nearest_unit(latlon_to_unit(lat, lon), min(k, len(self)))
+
+    def within_batch(self, lats, lons, radius_km):
+        """within() for arrays of query points; returns one result list per point"""
+        chord = km_to_chord(radius_km)
+        queries = latlon_to_unit(lats, lons).reshape(-1, 3)
+        if not len(self):
+            return [[] for _ in queries]
+        return [self._within_unit(q, chord) for q in queries]
+
+    def nearest_batch(self, lats, lons, k=1):
+        """nearest() for arrays of query points; returns one result list per point"""
+        queries = latlon_to_unit(lats, lons).reshape(-1, 3)
+        if not len(self) or k < 1:
+            return [[] for _ in queries]
+        return [self._nearest_unit(q, min(k, len(self))) for q in queries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query fjords near a coordinate")
+    parser.add_argument("csv_file", help="fjord_data.csv from generate_fjord_svgs.py")
+    parser.add_argument("lat", type=float)
+    parser.add_argument("lng", type=float)
+    parser.add_argument("--radius", type=float, help="list fjords within this many km")
+    parser.add_argument("--k", type=int, default=5, help="number of nearest fjords (default: 5)")
+    args = parser.parse_args()
+
+    index = FjordIndex.from_csv(args.csv_file)
+    if args.radius is not None:
+        results = index.within(args.lat, args.lng, args.radius)
+    else:
+        results = index.nearest(args.lat, args.lng, args.k)
+    for fjord, km in results:
+        print(f"{km:8.2f} km  {fjord}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Bulk reads and writes against Supabase through its PostgREST API.
+
+Reads page through a table by keyset on `id` with only the requested
+columns, so memory stays flat and nothing is lost to the server's row cap.
+Writes are sent as chunked upserts (POST with on_conflict and
+Prefer: resolution=merge-duplicates), so a thousand updates take a handful of
+requests. A chunk whose data the server rejects (400/409/422) is split in
+half and retried until the offending rows are isolated; every row gets an
+outcome in the report. Auth and not-found errors fail the whole upsert at once.
+
+An upsert is an INSERT ... ON CONFLICT DO UPDATE, so each row must carry the
+table's NOT NULL columns even when only one column is changing. Pass them as
+`required_columns` (e.g. FJORD_REQUIRED_COLUMNS): they are read from the table
+right before each chunk is sent, so a long run never writes back values that
+were edited after it started.
+
+    rest = SupabaseRest.from_env()
+    for row in rest.iter_rows("fjordle_fjords", "id,name", {"quarantined": "is.false"}):
+        ...
+    report = rest.upsert("fjordle_fjords", rows, batch_size=500, required_columns=FJORD_REQUIRED_COLUMNS)
+    print(report.summary())
+    for outcome in report.failed:
+        print(outcome.key, outcome.error)
+
+The base URL can point at any PostgREST-compatible server, e.g. a local stub.
+"""
+
+import json
+import os
+import time
+from collections import namedtuple
+
+import requests
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAGE_SIZE = 1000
+TRANSIENT_RETRIES = 2
+
+# Statuses that mean some row in the chunk was rejected, not the request itself
+ROW_ERROR_STATUSES = (400, 409, 422)
+
+# NOT NULL columns of fjordle_fjords without defaults (svg_filename became
+# nullable in 20260315000000_add_famous_fjords)
+FJORD_REQUIRED_COLUMNS = ("name", "slug", "center_lat", "center_lng")
+
+RowOutcome = namedtuple("RowOutcome", ["key", "ok", "error"])
+
+
+class UpsertReport:
+    def __init__(self):
+        self.outcomes = []
+        self.requests = 0
+
+    @property
+    def succeeded(self):
+        return [o for o in self.outcomes if o.ok]
+
+    @property
+    def failed(self):
+        return [o for o in self.outcomes if not o.ok]
+
+    def summary(self):
+        return (
+            f"{len(self.succeeded)} rows written, {len(self.failed)} failed, "
+            f"{self.requests} requests"
+        )
+
+
+def _error_message(response):
+    try:
+        body = response.json()
+        return body.get("message") or json.dumps(body)
+    except ValueError:
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+
+
+def fill_required_columns(rows, current_rows, columns=FJORD_REQUIRED_COLUMNS, key="id"):
+    """Copy required columns from the current table rows into update rows that lack them"""
+    filled = []
+    for row in rows:
+        current = current_rows.get(row[key], {})
+        filled.append({**{c: current.get(c) for c in columns if c in current}, **row})
+    return filled
+
+
+class SupabaseRest:
+    def __init__(self, url, key, session=None, timeout=30):
+        self.base_url = url.rstrip("/") + "/rest/v1"
+        self.session = session or requests.Session()
+        self.session.headers.update(
+            {
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json",
+            }
+        )
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+        key = os.getenv("SUPABASE_SECRET_KEY")
+        if not url or not key:
+            raise ValueError("Missing Supabase credentials in .env.local")
+        return cls(url, key, **kwargs)
+
+    def iter_rows(self, table, columns="*", filters=None, page_size=DEFAULT_PAGE_SIZE, key="id", not_referenced_by=None):
+        """Yield rows of `table` page by page, ordered by `key`.
+
+        `filters` are PostgREST query parameters, e.g. {"quarantined": "is.false"}.
+        Paging stops only on an empty page: the server may cap a page below
+        `page_size` (db-max-rows), so a short page doesn't mean the end.
+
+        `not_referenced_by` maps child tables to their foreign-key column and
+        keeps only rows no child row points at, as one server-side anti-join.
+        """
+        select = columns
+        params = dict(filters or {})
+        for child, fk_column in (not_referenced_by or {}).items():
+            select += f",{child}({fk_column})"
+            params[child] = "is.null"
+        params.update({"select": select, "order": f"{key}.asc", "limit": page_size})
+
+        last = None
+        while True:
+            if last is not None:
+                params[key] = f"gt.{last}"
+            response = self.session.get(f"{self.base_url}/{table}", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            page = response.json()
+            if not page:
+                return
+            for row in page:
+                for child in not_referenced_by or ():
+                    row.pop(child, None)
+                yield row
+            last = page[-1][key]
+
+    def select_in(self, table, column, values, columns="*", chunk_size=200):
+        """Rows whose `column` is in `values`, fetched in chunks of `in.(...)` filters"""
+        values = list(values)
+        rows = []
+        for start in range(0, len(values), chunk_size):
+            chunk = ",".join(str(v) for v in values[start : start + chunk_size])
+            response = self.session.get(
+                f"{self.base_url}/{table}",
+                params={"select": columns, column: f"in.({chunk})"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            rows.extend(response.json())
+        return rows
+
+    def upsert(self, table, rows, on_conflict="id", batch_size=DEFAULT_BATCH_SIZE, required_columns=()):
+        """Upsert rows in chunks; returns an UpsertReport with one outcome per row.
+
+        PostgREST needs every object in a bulk request to have the same keys,
+        so rows are grouped by their column set before chunking.
+
+        `required_columns` missing from the rows are read from the table just
+        before each chunk is sent. Rows whose key isn't in the table then fail
+        without being sent, since the upsert would insert them.
+        """
+        report = UpsertReport()
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        for columns, group in groups.items():
+            for start in range(0, len(group), batch_size):
+                chunk = group[start : start + batch_size]
+                if required_columns:
+                    chunk = self._fill_from_table(table, chunk, on_conflict, required_columns, report)
+                    if not chunk:
+                        continue
+                self._upsert_chunk(table, tuple(sorted(chunk[0])), chunk, on_conflict, report)
+        return report
+
+    def _fill_from_table(self, table, chunk, key, columns, report):
+        """The chunk's rows with `columns` filled from their current table rows"""
+        current = {
+            row[key]: row
+            for row in self.select_in(table, key, [row[key] for row in chunk], columns=",".join((key,) + tuple(columns)))
+        }
+        for row in chunk:
+            if row[key] not in current:
+                report.outcomes.append(RowOutcome(row[key], False, f"not found in {table}"))
+        return fill_required_columns([row for row in chunk if row[key] in current], current, columns, key)
+
+    def _post(self, table, columns, chunk, on_conflict, report):
+        """POST one chunk, retrying transient failures; returns (ok, error, bisectable).
+
+        Raises requests.HTTPError for errors no single row causes (401, 403, 404, ...).
+        """
+        for attempt in range(TRANSIENT_RETRIES + 1):
+            report.requests += 1
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/{table}",
+                    params={"on_conflict": on_conflict, "columns": ",".join(columns)},
+                    headers={"Prefer": "resolution=merge-duplicates,return=minimal"},
+                    data=json.dumps(chunk),
+                    timeout=self.timeout,
+                )
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code < 300:
+                    return True, None, False
+                error = _error_message(response)
+                if response.status_code in ROW_ERROR_STATUSES:
+                    # The data was rejected; bisect rather than retry
+                    return False, error, True
+                if response.status_code < 500 and response.status_code != 429:
+                    raise requests.exceptions.HTTPError(
+                        f"HTTP {response.status_code} from {table}: {error}", response=response
+                    )
+            time.sleep(2**attempt)
+        return False, error, False
+
+    def _upsert_chunk(self, table, columns, chunk, on_conflict, report):
+        ok, error, bisectable = self._post(table, columns, chunk, on_conflict, report)
+        if ok or not bisectable or len(chunk) == 1:
+            report.outcomes.extend(RowOutcome(row.get(on_conflict), ok, error) for row in chunk)
+            return
+        mid = len(chunk) // 2
+        self._upsert_chunk(table, columns, chunk[:mid], on_conflict, report)
+        self._upsert_chunk(table, columns, chunk[mid:], on_conflict, report)
@@ -0,0 +1,88 @@
+"""
+SVG path `d` attribute encoders for fjord outlines.
+
+Modes:
+    absolute  "M x,y L x,y L x,y ..." - the original format, byte-identical to
+              the old create_svg_path for the same precision
+    implicit  "M x,y L x,y x,y ..." - absolute, with the repeated L implied
+    relative  "M x,y l dx,dy dx,dy ..." - relative offsets on integer-quantized
+              coordinates, so rounding never accumulates along the ring, with
+              trailing zeros and redundant separators dropped
+
+`precision` is the number of decimal places; 0 gives integer coordinates.
+Every mode builds its output with a single join. encode_rings emits one
+subpath per ring for multi-part polygons.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+PATH_MODES = ("absolute", "implicit", "relative")
+
+
+# Deltas along a coastline are small and repeat constantly, so caching the
+# formatted tokens removes most of the per-vertex string work
+@lru_cache(maxsize=65536)
+def _fixed(value, precision):
+    """Format an integer count of 10**-precision units as a compact decimal"""
+    if precision == 0:
+        return str(value)
+    sign = "-" if value < 0 else ""
+    whole, frac = divmod(abs(value), 10**precision)
+    frac_str = f"{frac:0{precision}d}".rstrip("0")
+    if not frac_str:
+        return f"{sign}{whole}"
+    return f"{sign}{whole if whole else ''}.{frac_str}"
+
+
+def _join_compact(tokens):
+    """Join numbers with the minimum separators an SVG parser needs"""
+    out = []
+    prev = ""
+    for token in tokens:
+        if prev and not (token[0] == "-" or (token[0] == "." and "." in prev)):
+            out.append(" ")
+        out.append(token)
+        prev = token
+    return "".join(out)
+
+
+def _encode_absolute(coords, precision, implicit):
+    fmt = f"{{:.{precision}f}},{{:.{precision}f}}"
+    pairs = [fmt.format(x, y) for x, y in np.asarray(coords).tolist()]
+    if not implicit:
+        return "M " + " L ".join(pairs)
+    if len(pairs) == 1:
+        return "M " + pairs[0]
+    return "M " + pairs[0] + " L " + " ".join(pairs[1:])
+
+
+def _encode_relative(coords, precision):
+    quantized = np.rint(np.asarray(coords, dtype=np.float64) * 10**precision).astype(np.int64)
+    deltas = np.diff(quantized, axis=0)
+    x0, y0 = quantized[0].tolist()
+    start = f"M{_fixed(x0, precision)},{_fixed(y0, precision)}"
+    if not len(deltas):
+        return start
+    tokens = [_fixed(v, precision) for v in deltas.ravel().tolist()]
+    return start + "l" + _join_compact(tokens)
+
+
+def encode_path(coords, mode="absolute", precision=1):
+    """Encode an (n, 2) sequence of points as an SVG path `d` string"""
+    if len(coords) == 0:
+        return ""
+    if mode == "absolute":
+        return _encode_absolute(coords, precision, implicit=False)
+    if mode == "implicit":
+        return _encode_absolute(coords, precision, implicit=True)
+    if mode == "relative":
+        return _encode_relative(coords, precision)
+    raise ValueError(f"unknown path mode: {mode}")
+
+
+def encode_rings(rings, mode="absolute", precision=1):
+    """Encode several rings (e.g. a polygon's outer boundary, islands and holes)
+    as one `d` string with a subpath per ring"""
+    return " ".join(p for p in (encode_path(r, mode, precision) for r in rings) if p)
@@ -0,0 +1,75 @@
+"""
+Shared fixtures for the tools/ tests.
+
+The tools import their siblings by module name (they run as
+`python3 tools/x.py`), so tools/ goes on sys.path here. `stub` is a local
+HTTP server whose responses come from a handler function set by the test:
+
+    stub.handler = lambda request: (200, {"query": {...}})
+    stub.handler = lambda request: (200, {...}, {"Retry-After": "0"})  # extra headers
+    stub.handler = lambda request: (200, "<html>...</html>")  # str is served as HTML
+    stub.url, stub.requests
+"""
+
+import json
+import os
+import sys
+import threading
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+StubRequest = namedtuple("StubRequest", ["method", "path", "params", "body"])
+
+
+class StubServer:
+    def __init__(self):
+        self.handler = lambda request: (404, {"message": "no handler"})
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _serve(self):
+                parts = urlsplit(self.path)
+                params = {k: v[-1] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                request = StubRequest(self.command, parts.path, params, body)
+                stub.requests.append(request)
+                status, payload, *headers = stub.handler(request)
+                if isinstance(payload, str):
+                    data, content_type = payload.encode(), "text/html; charset=UTF-8"
+                else:
+                    data, content_type = json.dumps(payload).encode(), "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for name, value in (headers[0] if headers else {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _serve
+            do_POST = _serve
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+
+from generate_fjord_svgs import project_centers
+from geodesy import utm_to_latlon_batch
+
+
+def utm_to_latlon(easting, northing):
+    """The scalar zone 33 converter generate_fjord_svgs.py used before the batch one"""
+    if not easting or not northing:
+        return None, None
+    a = 6378137.0
+    f = 1/298.257223563
+    e2 = 2*f - f*f
+    e1 = (1 - math.sqrt(1 - e2)) / (1 + math.sqrt(1 - e2))
+    k0 = 0.9996
+    lon0 = math.radians(15.0)
+    false_easting = 500000.0
+    false_northing = 0.0
+    x = easting - false_easting
+    y = northing - false_northing
+    M = y / k0
+    mu = M / (a * (1 - e2/4 - 3*e2*e2/64 - 5*e2*e2*e2/256))
+    phi1 = mu + (3*e1/2 - 27*e1*e1*e1/32) * math.sin(2*mu) + \
+        (21*e1*e1/16 - 55*e1*e1*e1*e1/32) * math.sin(4*mu) + \
+        (151*e1*e1*e1/96) * math.sin(6*mu)
+    N1 = a / math.sqrt(1 - e2 * math.sin(phi1)**2)
+    T1 = math.tan(phi1)**2
+    C1 = e2 * math.cos(phi1)**2 / (1 - e2)
+    R1 = a * (1 - e2) / (1 - e2 * math.sin(phi1)**2)**(3/2)
+    D = x / (N1 * k0)
+    lat = phi1 - (N1 * math.tan(phi1) / R1) * (
+        D*D/2 - (5 + 3*T1 + 10*C1 - 4*C1*C1 - 9*e2) * D**4 / 24 +
+        (61 + 90*T1 + 298*C1 + 45*T1*T1 - 252*e2 - 3*C1*C1) * D**6 / 720)
+    lon = lon0 + (D - (1 + 2*T1 + C1) * D**3 / 6 +
+        (5 - 2*C1 + 28*T1 - 3*C1*C1 + 8*e2 + 24*T1*T1) * D**5 / 120) / math.cos(phi1)
+    return math.degrees(lat), math.degrees(lon)
+
+
+def test_batch_matches_the_scalar_converter():
+    rng = np.random.default_rng(2)
+    # Zone 33 extents of the fjord catalogue, from Lindesnes to Finnmark
+    eastings = rng.uniform(-80_000, 1_120_000, 2_000)
+    northings = rng.uniform(6_440_000, 7_950_000, 2_000)
+
+    lats, lons = utm_to_latlon_batch(eastings, northings)
+
+    expected = np.array([utm_to_latlon(e, n) for e, n in zip(eastings, northings)])
+    assert np.abs(lats - expected[:, 0]).max() < 1e-12
+    assert np.abs(lons - expected[:, 1]).max() < 1e-12
+
+
+def test_missing_centers_project_to_none_like_the_scalar_converter():
+    eastings = [None, 0.0, 7415.0, 7415.0]
+    northings = [6880000.0, 6880000.0, None, 6880000.0]
+
+    centers = project_centers(eastings, northings)
+
+    assert centers[:3] == [(None, None)] * 3 == [utm_to_latlon(e, n) for e, n in zip(eastings[:3], northings[:3])]
+    assert np.allclose(centers[3], utm_to_latlon(eastings[3], northings[3]), rtol=0, atol=1e-12)
@@ -0,0 +1,101 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from http_cache import HttpCache
+from rate_limit import HostRateLimiter, ThrottledError
+
+MAXLAG_ERROR = {"error": {"code": "maxlag", "info": "Waiting for a database server: 7 seconds lagged"}}
+
+
+def cache_for(tmp_path, max_retries=1):
+    limiter = HostRateLimiter(rate=100, burst=10, max_retries=max_retries)
+    return HttpCache(path=str(tmp_path / "cache.sqlite"), limiter=limiter)
+
+
+def test_persistent_maxlag_raises_and_is_not_cached(stub, tmp_path):
+    stub.handler = lambda request: (200, MAXLAG_ERROR, {"MediaWiki-API-Error": "maxlag", "Retry-After": "0"})
+    cache = cache_for(tmp_path)
+    url = f"{stub.url}/w/api.php"
+
+    with pytest.raises(ThrottledError):
+        cache.get(url, params={"titles": "Sognefjorden"})
+    assert len(stub.requests) == 2  # The first attempt and one retry
+
+    stub.handler = lambda request: (200, {"query": {"pages": {}}})
+    assert cache.get(url, params={"titles": "Sognefjorden"}).json() == {"query": {"pages": {}}}
+    assert cache.get(url, params={"titles": "Sognefjorden"}).from_cache
+
+
+def test_maxlag_recovered_by_a_retry_caches_the_good_response(stub, tmp_path):
+    answers = [
+        (200, MAXLAG_ERROR, {"MediaWiki-API-Error": "maxlag", "Retry-After": "0"}),
+        (200, {"query": {"pages": {}}}),
+    ]
+    stub.handler = lambda request: answers.pop(0)
+    cache = cache_for(tmp_path)
+    url = f"{stub.url}/w/api.php"
+
+    assert cache.get(url).json() == {"query": {"pages": {}}}
+    assert cache.get(url).from_cache
+    assert len(stub.requests) == 2
+
+
+def test_api_error_body_is_returned_but_not_cached(stub, tmp_path):
+    stub.handler = lambda request: (200, {"error": {"code": "badtitle"}})
+    cache = cache_for(tmp_path)
+    url = f"{stub.url}/w/api.php"
+
+    assert cache.get(url).json() == {"error": {"code": "badtitle"}}
+    assert not cache.get(url).from_cache
+    assert len(stub.requests) == 2
+
+
+def accessed_at(cache, url):
+    with sqlite3.connect(cache.path) as db:
+        return db.execute("SELECT accessed_at FROM responses WHERE url = ?", (url,)).fetchone()[0]
+
+
+def test_hits_write_their_access_time_only_when_flushed(stub, tmp_path):
+    stub.handler = lambda request: (200, {"query": {"pages": {}}})
+    cache = cache_for(tmp_path)
+    url = f"{stub.url}/w/api.php"
+    cache.get(url)
+    stored = accessed_at(cache, url)
+
+    time.sleep(0.01)
+    assert cache.get(url).from_cache
+    assert accessed_at(cache, url) == stored  # No write on the hit itself
+
+    cache.flush()
+    assert accessed_at(cache, url) > stored
+
+
+def test_async_get_keeps_sqlite_off_the_event_loop(stub, tmp_path):
+    httpx = pytest.importorskip("httpx")
+    stub.handler = lambda request: (200, {"query": {"pages": {}}})
+    cache = cache_for(tmp_path)
+    url = f"{stub.url}/w/api.php"
+    db_threads = set()
+    lookup = cache._lookup
+
+    def tracked_lookup(key):
+        db_threads.add(threading.get_ident())
+        return lookup(key)
+
+    cache._lookup = tracked_lookup
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            first = await cache.aget(client.get, url)
+            second = await cache.aget(client.get, url)
+        return threading.get_ident(), first, second
+
+    loop_thread, first, second = asyncio.run(run())
+
+    assert not first.from_cache and second.from_cache
+    assert second.json() == {"query": {"pages": {}}}
+    assert db_threads and loop_thread not in db_threads
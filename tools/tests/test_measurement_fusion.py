@@ -0,0 +1,107 @@
+import pytest
+
+from measurement_fusion import Candidate, covered, fuse, fuse_field, values_agree
+
+PRIORITY = ["no", "nn", "en", "da", "ceb"]
+
+
+def url(lang):
+    return f"https://{lang}.wikipedia.org/wiki/Sognefjorden"
+
+
+def candidate(field, value, lang="no", method="infobox"):
+    return Candidate(field, value, f"{value:g}", lang, url(lang), method)
+
+
+@pytest.mark.parametrize("field, a, b, agree", [
+    ("length_km", 12.5, 12.9, True),  # Within the absolute tolerance
+    ("length_km", 100.0, 109.0, True),  # Within the relative one
+    ("length_km", 100.0, 112.0, False),
+    ("length_km", 2.0, 2.6, False),
+    ("depth_m", 5.0, 14.0, True),
+    ("depth_m", 1308.0, 1200.0, True),
+    ("depth_m", 1308.0, 1100.0, False),
+    ("width_km", 1.0, 1.2, True),
+    ("width_km", 4.5, 3.8, False),
+])
+def test_values_agree(field, a, b, agree):
+    assert values_agree(field, a, b) is agree
+    assert values_agree(field, b, a) is agree
+
+
+def test_highest_priority_infobox_is_chosen():
+    candidates = [
+        candidate("length_km", 204.0, "en"),
+        candidate("length_km", 205.0, "no", "text"),
+        candidate("length_km", 205.0, "no"),
+    ]
+
+    fused = fuse_field(candidates, PRIORITY)
+
+    assert fused.source == candidates[2]
+    assert fused.value == 205.0
+
+
+def test_confidence_counts_other_pages_only():
+    source = candidate("length_km", 205.0, "no")
+    same_page = candidate("length_km", 205.0, "no", "text")
+    other_page = candidate("length_km", 204.0, "en")
+
+    assert fuse_field([source], PRIORITY).confidence == 0.8
+    assert fuse_field([source, same_page], PRIORITY).confidence == 0.8
+    assert fuse_field([source, same_page, other_page], PRIORITY).confidence == 0.9
+    assert fuse_field([candidate("length_km", 205.0, "no", "text")], PRIORITY).confidence == 0.6
+
+
+def test_confidence_is_clamped():
+    agreeing = [candidate("depth_m", 1308.0, lang) for lang in PRIORITY]
+    conflicting = [candidate("depth_m", 100.0 * i, lang) for i, lang in enumerate(PRIORITY[1:], 1)]
+
+    assert fuse_field(agreeing, PRIORITY).confidence == 1.0
+    assert fuse_field([candidate("depth_m", 1308.0, "no", "text")] + conflicting, PRIORITY).confidence == 0.05
+
+
+def test_conflicts_lower_confidence_and_are_reported():
+    candidates = [
+        candidate("depth_m", 1308.0, "no"),
+        candidate("depth_m", 1300.0, "nn"),
+        candidate("depth_m", 1308.0, "no", "text"),
+        candidate("depth_m", 400.0, "en", "text"),
+        candidate("length_km", 205.0, "no"),
+    ]
+
+    fields, conflicts = fuse(7, candidates, PRIORITY)
+
+    assert set(fields) == {"length_km", "depth_m"}
+    assert fields["depth_m"].value == 1308.0
+    assert fields["depth_m"].conflicting == [candidates[3]]
+    assert fields["depth_m"].confidence == 0.7  # 0.8 + one other page - one conflict
+    assert conflicts == [{
+        "fjord_id": 7,
+        "field": "depth_m",
+        "chosen": {"value": 1308.0, "raw": "1308", "language": "no", "method": "infobox", "url": url("no")},
+        "confidence": 0.7,
+        "agreeing": [
+            {"value": 1308.0, "raw": "1308", "language": "no", "method": "text", "url": url("no")},
+            {"value": 1300.0, "raw": "1300", "language": "nn", "method": "infobox", "url": url("nn")},
+        ],
+        "conflicting": [
+            {"value": 400.0, "raw": "400", "language": "en", "method": "text", "url": url("en")},
+        ],
+    }]
+
+
+def test_stop_rule_does_not_wait_for_width():
+    # Article text never gives a width, so most fjords never get one
+    found = [candidate("length_km", 205.0, "no", "text")]
+    assert not covered(found)
+
+    found.append(candidate("depth_m", 1308.0, "no", "text"))
+    assert covered(found)
+
+
+def test_stop_rule_with_explicit_fields():
+    found = [candidate("length_km", 205.0), candidate("depth_m", 1308.0)]
+
+    assert not covered(found, ("length_km", "depth_m", "width_km"))
+    assert covered(found + [candidate("width_km", 4.5, "en")], ("length_km", "depth_m", "width_km"))
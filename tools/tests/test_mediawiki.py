@@ -0,0 +1,104 @@
+from mediawiki import MAX_TITLES, MediaWikiBatch
+
+
+def wiki(pages, normalized=(), per_response=None):
+    """Handler serving `pages` ({title: {prop: [...]}}) as the query API would.
+
+    With `per_response`, each page's list props are split into slices of that
+    size and handed out through `continue`, one slice per response.
+    """
+
+    def handler(request):
+        titles = request.params["titles"].split("|")
+        aliases = dict(normalized)
+        offset = int(request.params.get("clcontinue", 0))
+        result = {}
+        more = False
+        for i, title in enumerate(titles):
+            name = aliases.get(title, title)
+            if any(page["title"] == name for page in result.values()):
+                continue  # The API lists a page once however many titles map to it
+            if name not in pages:
+                result[str(-1 - i)] = {"title": name, "missing": ""}
+                continue
+            page = {"pageid": i + 1, "title": name}
+            for prop, values in pages[name].items():
+                if per_response is None:
+                    page[prop] = values
+                else:
+                    page[prop] = values[offset : offset + per_response]
+                    more = more or offset + per_response < len(values)
+            result[str(i + 1)] = page
+        data = {
+            "query": {
+                "normalized": [{"from": f, "to": t} for f, t in normalized if f in titles],
+                "pages": result,
+            }
+        }
+        if more:
+            data["continue"] = {"clcontinue": str(offset + per_response), "continue": "||"}
+        return 200, data
+
+    return handler
+
+
+def categories(*names):
+    return [{"ns": 14, "title": f"Kategori:{name}"} for name in names]
+
+
+def test_continuation_is_merged_across_responses(stub):
+    pages = {"Sognefjorden": {"categories": categories("A", "B", "C", "D", "E")}}
+    stub.handler = wiki(pages, per_response=2)
+
+    batch = MediaWikiBatch(f"{stub.url}/w/api.php")
+
+    assert [c["title"] for c in batch.categories("Sognefjorden")] == [
+        "Kategori:A", "Kategori:B", "Kategori:C", "Kategori:D", "Kategori:E"
+    ]
+    assert len(stub.requests) == 3
+    assert batch.requests_sent == 3
+
+
+def test_titles_are_sent_in_chunks_of_fifty(stub):
+    titles = [f"Fjord {i}" for i in range(MAX_TITLES * 2 + 5)]
+    stub.handler = wiki({title: {"categories": categories(title)} for title in titles})
+
+    batch = MediaWikiBatch(f"{stub.url}/w/api.php")
+    pages = batch.fetch(titles + titles[:3])
+
+    assert [len(r.params["titles"].split("|")) for r in stub.requests] == [50, 50, 5]
+    assert all(pages[title]["categories"] == categories(title) for title in titles)
+
+
+def test_normalized_titles_resolve_to_their_page(stub):
+    pages = {"Sognefjorden": {"langlinks": [{"lang": "en", "*": "Sognefjord"}]}}
+    stub.handler = wiki(pages, normalized=[("sognefjorden", "Sognefjorden")])
+
+    batch = MediaWikiBatch(f"{stub.url}/w/api.php")
+    batch.add_titles(["sognefjorden", "Sognefjorden", "Nofjord"])
+    batch.flush()
+
+    assert batch.langlinks("sognefjorden") == [{"lang": "en", "*": "Sognefjord"}]
+    assert batch.langlinks("Sognefjorden") == [{"lang": "en", "*": "Sognefjord"}]
+    assert batch.page("Nofjord") is None
+    assert len(stub.requests) == 1
+
+
+def test_refetched_page_keeps_one_copy_of_each_entry(stub):
+    pages = {
+        "Sognefjorden": {
+            "categories": categories("A", "B"),
+            "langlinks": [{"lang": "en", "*": "Sognefjord"}],
+            "coordinates": [{"lat": 61.1, "lon": 6.5, "primary": ""}],
+        }
+    }
+    stub.handler = wiki(pages, normalized=[("sognefjorden", "Sognefjorden")])
+
+    batch = MediaWikiBatch(f"{stub.url}/w/api.php")
+    batch.page("Sognefjorden")
+    batch.page("sognefjorden")  # A second request returning the same page
+
+    assert len(stub.requests) == 2
+    assert batch.categories("Sognefjorden") == categories("A", "B")
+    assert batch.langlinks("Sognefjorden") == [{"lang": "en", "*": "Sognefjord"}]
+    assert batch.coordinates("Sognefjorden") == [{"lat": 61.1, "lon": 6.5, "primary": ""}]
@@ -0,0 +1,78 @@
+import pytest
+import requests
+
+from supabase_rest import SupabaseRest
+
+
+def rest_for(stub):
+    return SupabaseRest(stub.url, "service-key")
+
+
+def test_conflicting_row_is_isolated_by_bisection(stub):
+    def handler(request):
+        if any(row["id"] == 7 for row in request.body):
+            return 409, {"message": "duplicate key value violates unique constraint"}
+        return 201, {}
+
+    stub.handler = handler
+    rows = [{"id": i, "notes": f"row {i}"} for i in range(16)]
+
+    report = rest_for(stub).upsert("fjordle_fjords", rows, batch_size=16)
+
+    assert [o.key for o in report.failed] == [7]
+    assert "duplicate key" in report.failed[0].error
+    assert sorted(o.key for o in report.succeeded) == [i for i in range(16) if i != 7]
+    # 16 -> 8 -> 4 -> 2 -> 1: one request per level on each side of the split
+    assert report.requests == 9
+
+
+def test_auth_error_fails_without_bisecting(stub):
+    stub.handler = lambda request: (401, {"message": "Invalid API key"})
+    rows = [{"id": i, "notes": "x"} for i in range(1000)]
+
+    with pytest.raises(requests.exceptions.HTTPError, match="Invalid API key"):
+        rest_for(stub).upsert("fjordle_fjords", rows, batch_size=500)
+    assert len(stub.requests) == 1
+
+
+def test_paging_continues_past_short_pages_until_an_empty_one(stub):
+    table = [{"id": i, "name": f"Fjord {i}"} for i in range(1, 8)]
+    server_cap = 3  # db-max-rows below the requested page size
+
+    def handler(request):
+        after = int(request.params["id"][3:]) if "id" in request.params else 0
+        limit = min(int(request.params["limit"]), server_cap)
+        return 200, [row for row in table if row["id"] > after][:limit]
+
+    stub.handler = handler
+
+    rows = list(rest_for(stub).iter_rows("fjordle_fjords", "id,name", page_size=5))
+
+    assert rows == table
+    assert [r.params.get("id") for r in stub.requests] == [None, "gt.3", "gt.6", "gt.7"]
+    assert all(r.params["select"] == "id,name" and r.params["order"] == "id.asc" for r in stub.requests)
+
+
+def test_required_columns_are_read_right_before_each_chunk(stub):
+    table = {i: {"id": i, "name": f"Fjord {i}", "slug": f"fjord-{i}"} for i in range(1, 5)}
+    posted = []
+
+    def handler(request):
+        if request.method == "GET":
+            ids = [int(i) for i in request.params["id"][len("in.(") : -1].split(",")]
+            assert request.params["select"] == "id,name,slug"
+            return 200, [table[i] for i in ids if i in table]
+        posted.append(request.body)
+        # Someone renames fjord 3 while the first chunk is being written
+        table[3] = {**table[3], "name": "Renamed"}
+        return 201, {}
+
+    stub.handler = handler
+    rows = [{"id": i, "wikipedia_url_no": f"https://no.wikipedia.org/wiki/{i}"} for i in (1, 2, 3, 9)]
+
+    report = rest_for(stub).upsert("fjordle_fjords", rows, batch_size=2, required_columns=("name", "slug"))
+
+    assert [row["name"] for chunk in posted for row in chunk] == ["Fjord 1", "Fjord 2", "Renamed"]
+    assert all(set(row) == {"id", "name", "slug", "wikipedia_url_no"} for chunk in posted for row in chunk)
+    assert [(o.key, o.error) for o in report.failed] == [(9, "not found in fjordle_fjords")]
+    assert sorted(o.key for o in report.succeeded) == [1, 2, 3]
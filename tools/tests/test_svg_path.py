@@ -0,0 +1,27 @@
+import numpy as np
+
+from bench_svg_paths import legacy_create_svg_path
+from generate_fjord_svgs import create_svg_path, normalize_to_square
+from svg_path import encode_path
+
+
+def rings(count=3000, seed=6):
+    """Random outlines in the generator's 400x400 box, plus the edge cases"""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        n = int(rng.integers(1, 60))
+        raw = rng.normal(size=(n, 2)).cumsum(axis=0) * rng.uniform(1, 5000)
+        ring = normalize_to_square(raw) if n > 2 else rng.uniform(0, 400, (n, 2))
+        if len(ring) and rng.random() < 0.5:
+            ring = np.vstack([ring, ring[:1]])  # Closed, last point kept
+        yield ring
+    yield np.array([[0.05, 0.15], [0.25, 399.95], [-0.05, 1e-9]])  # Halfway cases
+    yield np.empty((0, 2))
+
+
+def test_absolute_mode_is_byte_identical_to_the_legacy_encoder():
+    for ring in rings():
+        expected = legacy_create_svg_path(ring)
+        assert encode_path(ring, mode="absolute", precision=1) == expected
+        assert create_svg_path(ring) == expected
+
@@ -0,0 +1,210 @@
+import threading
+import time
+from urllib.parse import unquote
+
+import pytest
+
+pytest.importorskip("dotenv")  # fjord_wikipedia_matcher loads .env.local with it
+pytest.importorskip("httpx")
+
+import fjord_wikipedia_matcher as matcher
+from http_cache import HttpCache
+from rate_limit import HostRateLimiter
+from wiki_async import search_fjords
+from wiki_coordinates import CoordinateStats
+
+CATEGORIES = {
+    "nb": "Kategori:Fjorder i Vestland",
+    "nn": "Kategori:Fjorder i Vestland",
+    "en": "Category:Fjords of Vestland",
+    "da": "Kategori:Fjorde i Norge",
+    "ceb": "Kategoriya:Mga fjord sa Noruwega",
+}
+
+SOGNEFJORDEN = {"id": 1, "name": "Sognefjorden", "center_lat": "61.1", "center_lng": "6.5"}
+
+
+class FakeWikipedia:
+    """Stub handler for opensearch, prop queries and article HTML, one wiki per path prefix"""
+
+    def __init__(self, base_url, delay=0.0):
+        self.base_url = base_url
+        self.delay = delay
+        self.delays = {}
+        self.articles = {}
+        self.searches = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def api_urls(self):
+        return {lang: f"{self.base_url}/{lang}/w/api.php" for lang in matcher.SEARCH_LANGUAGES}
+
+    def url(self, lang, title):
+        return f"{self.base_url}/{lang}/wiki/{title.replace(' ', '_')}"
+
+    def article(self, lang, title, coords=None, html=None, langlinks=(), found_by=()):
+        """Add an article in a fjord category, found by searching any of `found_by`"""
+        self.articles[(lang, title)] = {"coords": coords, "html": html, "langlinks": dict(langlinks)}
+        for term in found_by:
+            self.searches.setdefault((lang, term), []).append(title)
+
+    def __call__(self, request):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            lang = request.path.split("/")[1]
+            time.sleep(self.delays.get(lang, self.delay))
+            if "/wiki/" in request.path:
+                title = unquote(request.path.split("/wiki/", 1)[1]).replace("_", " ")
+                article = self.articles.get((lang, title))
+                if article is None:
+                    return 404, {"error": "no such page"}
+                return 200, article["html"] or "<html><body>No coordinates</body></html>"
+            if request.params["action"] == "opensearch":
+                term = request.params["search"]
+                titles = self.searches.get((lang, term), [])
+                return 200, [term, titles, [""] * len(titles), [self.url(lang, t) for t in titles]]
+            return 200, {"batchcomplete": "", "query": {"pages": self._pages(lang, request)}}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _pages(self, lang, request):
+        pages = {}
+        for i, title in enumerate(request.params["titles"].split("|")):
+            article = self.articles.get((lang, title))
+            if article is None:
+                pages[str(-1 - i)] = {"title": title, "missing": ""}
+                continue
+            page = {
+                "pageid": i + 1,
+                "title": title,
+                "categories": [{"ns": 14, "title": CATEGORIES[lang]}],
+                "langlinks": [{"lang": l, "*": t} for l, t in article["langlinks"].items()],
+            }
+            if article["coords"]:
+                lat, lon = article["coords"]
+                page["coordinates"] = [{"lat": lat, "lon": lon, "primary": "", "globe": "earth"}]
+            pages[str(i + 1)] = page
+        return pages
+
+
+@pytest.fixture
+def wiki(stub):
+    stub.handler = FakeWikipedia(stub.url)
+    return stub.handler
+
+
+def fast_limiter():
+    return HostRateLimiter(rate=1000, burst=1000)
+
+
+def search_all(wiki, fjords, concurrency=4, max_per_host=4, on_result=None):
+    results = {}
+
+    def record(fjord, result):
+        results[fjord["id"]] = result
+        if on_result:
+            on_result(fjord, result)
+
+    stats = search_fjords(
+        fjords,
+        record,
+        concurrency=concurrency,
+        api_urls=wiki.api_urls(),
+        max_per_host=max_per_host,
+        limiter=fast_limiter(),
+    )
+    return results, stats
+
+
+def test_bokmaal_match_wins_over_a_faster_english_one(wiki):
+    wiki.delays["nb"] = 0.2
+    wiki.article("nb", "Sognefjorden", coords=(61.12, 6.55), langlinks={"en": "Sognefjord"},
+                 found_by=["Sognefjorden"])
+    wiki.article("en", "Sogn", coords=(61.1, 6.5), found_by=["Sognefjorden", "Sognefjord"])
+
+    results, _ = search_all(wiki, [SOGNEFJORDEN])
+
+    result = results[1]
+    assert result["match"] and result["match_source"] == "nb"
+    assert result["wiki_url_nb"] == wiki.url("nb", "Sognefjorden")
+    # The English URL comes from the Bokmål page's langlinks, not the English search
+    assert result["wiki_url_en"] == "https://en.wikipedia.org/wiki/Sognefjord"
+    assert (result["wiki_lat"], result["wiki_lng"]) == (61.12, 6.55)
+
+
+def test_match_beyond_ten_km_falls_back_to_the_next_language(wiki):
+    wiki.article("nb", "Sognefjorden", coords=(61.55, 6.5), found_by=["Sognefjorden"])  # ~50 km
+    wiki.article("en", "Sognefjord", coords=(61.11, 6.52), found_by=["Sognefjord"])
+
+    results, _ = search_all(wiki, [SOGNEFJORDEN])
+
+    result = results[1]
+    assert result["match_source"] == "en"
+    assert result["wiki_url_nb"] is None
+    assert result["wiki_url_en"] == wiki.url("en", "Sognefjord")
+    assert result["distance_km"] < matcher.MAX_MATCH_DISTANCE_KM
+
+
+def test_requests_per_host_never_exceed_the_cap(stub):
+    wiki = stub.handler = FakeWikipedia(stub.url, delay=0.02)
+    fjords = [{"id": i, "name": f"Fjord {i}", "center_lat": "61", "center_lng": "6"} for i in range(12)]
+
+    results, _ = search_all(wiki, fjords, concurrency=12, max_per_host=3)
+
+    assert len(results) == 12
+    assert wiki.max_in_flight == 3
+
+
+def test_results_match_the_synchronous_search(wiki, monkeypatch, tmp_path):
+    wiki.article("nb", "Sognefjorden", coords=(61.12, 6.55), langlinks={"en": "Sognefjord", "nn": "Sognefjorden"},
+                 found_by=["Sognefjorden"])
+    # No GeoData: coordinates come from the article HTML
+    wiki.article("nb", "Lysefjorden", html='<span class="geo-dec">59,0°N 6,2°Ø</span>', found_by=["Lysefjord"])
+    wiki.article("nb", "Nærøyfjorden", coords=(61.5, 6.5), found_by=["Nærøyfjorden"])  # Too far
+    wiki.article("nn", "Nærøyfjorden", coords=(60.88, 6.86), langlinks={"da": "Nærøyfjord"},
+                 found_by=["Nærøyfjorden"])
+    fjords = [
+        SOGNEFJORDEN,
+        {"id": 2, "name": "Lysefjord", "center_lat": "59.01", "center_lng": "6.21"},
+        {"id": 3, "name": "Nærøyfjorden", "center_lat": "60.87", "center_lng": "6.85"},
+        {"id": 4, "name": "Ukjentfjorden", "center_lat": "70.0", "center_lng": "25.0"},
+    ]
+
+    results, stats = search_all(wiki, fjords)
+
+    monkeypatch.setattr(matcher, "WIKIPEDIA_API_URLS", {**matcher.WIKIPEDIA_API_URLS, **wiki.api_urls()})
+    monkeypatch.setattr(matcher, "_wiki_batches", {})
+    monkeypatch.setattr(matcher, "coordinate_stats", CoordinateStats())
+    cache = HttpCache(path=str(tmp_path / "cache.sqlite"), limiter=fast_limiter())
+    monkeypatch.setattr(matcher, "get_default_cache", lambda: cache)
+    expected = {
+        f["id"]: matcher.search_wikipedia_with_fallback(f["name"], float(f["center_lat"]), float(f["center_lng"]))
+        for f in fjords
+    }
+
+    assert results == expected
+    assert [results[i]["match_source"] for i in (1, 2, 3, 4)] == ["nb", "nb", "nn", None]
+    assert stats.counts == matcher.coordinate_stats.counts
+
+
+def test_one_failing_fjord_does_not_stop_the_others(wiki):
+    wiki.article("nb", "Sognefjorden", coords=(61.12, 6.55), found_by=["Sognefjorden"])
+    fjords = [
+        {"id": 1, "name": "Ukjentfjorden", "center_lat": None, "center_lng": "6.5"},
+        {"id": 2, "name": "Boom", "center_lat": "61", "center_lng": "6"},
+        *({**SOGNEFJORDEN, "id": i} for i in range(3, 9)),
+    ]
+
+    def on_result(fjord, result):
+        if fjord["name"] == "Boom":
+            raise RuntimeError("journal is full")
+
+    results, _ = search_all(wiki, fjords, concurrency=2, on_result=on_result)
+
+    assert 1 not in results
+    assert sorted(results) == [2, 3, 4, 5, 6, 7, 8]
+    assert all(results[i]["match"] for i in range(3, 9))
@@ -0,0 +1,25 @@
+from wiki_coordinates import geodata_coordinates
+
+
+def test_primary_coordinate_is_used_wherever_it_is_listed():
+    page = {
+        "coordinates": [
+            {"lat": 61.2, "lon": 7.1, "globe": "earth"},
+            {"lat": 61.1, "lon": 6.5, "primary": "", "globe": "earth"},
+        ]
+    }
+
+    assert geodata_coordinates(page) == (61.1, 6.5)
+
+
+def test_secondary_coordinates_alone_are_not_the_page_position():
+    page = {"coordinates": [{"lat": 61.2, "lon": 7.1, "globe": "earth"}]}
+
+    assert geodata_coordinates(page) == (None, None)
+
+
+def test_primary_coordinate_on_another_globe_is_ignored():
+    page = {"coordinates": [{"lat": 10.0, "lon": 20.0, "primary": "", "globe": "moon"}]}
+
+    assert geodata_coordinates(page) == (None, None)
+    assert geodata_coordinates(None) == (None, None)
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from wiki_page import PREFIX_CHARS, Bs4Document, LxmlDocument, WikipediaPage, lxml
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "wiki")
+ARTICLES = sorted(name for name in os.listdir(FIXTURES) if name.endswith(".html"))
+
+needs_lxml = pytest.mark.skipif(lxml is None, reason="the lxml backend needs the lxml package")
+
+
+def read(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+@needs_lxml
+@pytest.mark.parametrize("name", ARTICLES)
+def test_lxml_backend_matches_the_bs4_reference(name):
+    content = read(name)
+    reference, document = Bs4Document(content), LxmlDocument(content)
+
+    assert document.text_prefix(PREFIX_CHARS) == reference.text_prefix(PREFIX_CHARS)
+    assert document.infobox_rows() == reference.infobox_rows()
+    assert document.content_text() == reference.content_text()
+
+
+@pytest.mark.parametrize("parser", ["bs4", pytest.param("lxml", marks=needs_lxml)])
+def test_page_checks_on_the_fixtures(parser):
+    pages = {name: WikipediaPage(name, read(name), parser=parser) for name in ARTICLES}
+
+    assert [n for n, p in pages.items() if p.is_disambiguation] == ["en__Lysefjord_disambiguation.html"]
+    assert [n for n, p in pages.items() if p.is_missing] == ["no__Ukjentfjorden.html"]
+    assert ("største dybde", "1\xa0308\xa0m") in pages["no__Sognefjorden.html"].infobox_rows
+    assert ("max. depth", "891\xa0m (2,923\xa0ft)") in pages["en__Hardangerfjord.html"].infobox_rows
+    # The id'd content div wins over an earlier class-only one
+    assert pages["no__Vefsnfjorden.html"].content_text == "Innhold: hovedtekst"
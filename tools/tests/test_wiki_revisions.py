@@ -0,0 +1,106 @@
+import json
+import os
+
+from wiki_revisions import RevisionState, current_revisions
+
+# Bokmål titles as the API would resolve them: lower-case first letters are
+# normalized, and Sognefjord / Hardangerfjorden are redirects
+NORMALIZED = {"hardangerfjorden": "Hardangerfjorden"}
+REDIRECTS = {"Sognefjord": "Sognefjorden", "Hardangerfjorden": "Hardangerfjord"}
+PAGES = {
+    "Sognefjorden": {"lastrevid": 2001, "touched": "2026-09-01T10:00:00Z"},
+    "Hardangerfjord": {"lastrevid": 3001, "touched": "2026-08-15T08:30:00Z"},
+    "Sognefjord": {"lastrevid": 11, "touched": "2019-01-01T00:00:00Z"},
+    "Hardangerfjorden": {"lastrevid": 12, "touched": "2019-01-01T00:00:00Z"},
+}
+
+
+def info_handler(request):
+    """prop=info as the API answers it, resolving redirects only when asked to"""
+    titles = request.params["titles"].split("|")
+    query = {"normalized": [], "redirects": [], "pages": {}}
+    for i, title in enumerate(titles):
+        if title in NORMALIZED:
+            query["normalized"].append({"from": title, "to": NORMALIZED[title]})
+            title = NORMALIZED[title]
+        if request.params.get("redirects") and title in REDIRECTS:
+            query["redirects"].append({"from": title, "to": REDIRECTS[title]})
+            title = REDIRECTS[title]
+        if title in PAGES:
+            query["pages"][str(i + 1)] = {"pageid": i + 1, "title": title, **PAGES[title]}
+        else:
+            query["pages"][str(-1 - i)] = {"title": title, "missing": ""}
+    return 200, {"batchcomplete": "", "query": query}
+
+
+def test_current_revisions_follow_redirects(stub):
+    stub.handler = info_handler
+    urls = [
+        f"{stub.url}/wiki/Sognefjorden",
+        f"{stub.url}/wiki/Sognefjord",
+        f"{stub.url}/wiki/hardangerfjorden",
+        f"{stub.url}/wiki/Ukjentfjorden",
+    ]
+
+    revisions = current_revisions(urls)
+
+    assert revisions == {
+        urls[0]: {"revid": 2001, "touched": "2026-09-01T10:00:00Z"},
+        urls[1]: {"revid": 2001, "touched": "2026-09-01T10:00:00Z"},
+        # Normalized, then redirected
+        urls[2]: {"revid": 3001, "touched": "2026-08-15T08:30:00Z"},
+        urls[3]: {"revid": None, "touched": None},
+    }
+    assert len(stub.requests) == 1
+    assert stub.requests[0].params["prop"] == "info"
+    assert stub.requests[0].params["redirects"] == "1"
+
+
+def test_current_revisions_batch_titles(stub):
+    stub.handler = info_handler
+    urls = [f"{stub.url}/wiki/Fjord_{i}" for i in range(5)]
+
+    revisions = current_revisions(urls + urls[:2], batch_size=2)
+
+    assert list(revisions) == urls
+    assert [len(r.params["titles"].split("|")) for r in stub.requests] == [2, 2, 1]
+
+
+def test_revision_state_detects_changes(tmp_path):
+    state = RevisionState(str(tmp_path / "revisions.json"))
+    url = "https://no.wikipedia.org/wiki/Sognefjorden"
+    revision = {"revid": 2001, "touched": "2026-09-01T10:00:00Z"}
+
+    assert state.changed(url, revision)  # Never recorded
+    state.record(url, revision)
+    assert not state.changed(url, revision)
+    assert not state.changed(url, {"revid": 2001, "touched": "2026-10-01T00:00:00Z"})  # Purged, not edited
+    assert state.changed(url, {"revid": 2002, "touched": "2026-10-01T00:00:00Z"})
+    assert state.changed(url, None)  # The revision lookup failed
+
+
+def test_record_ignores_failed_lookups(tmp_path):
+    state = RevisionState(str(tmp_path / "revisions.json"))
+    url = "https://no.wikipedia.org/wiki/Sognefjorden"
+    state.record(url, {"revid": 2001, "touched": None})
+
+    state.record(url, None)
+
+    assert state.pages[url] == {"revid": 2001, "touched": None}
+
+
+def test_revision_state_round_trips_through_save(tmp_path):
+    path = str(tmp_path / "revisions.json")
+    state = RevisionState(path)
+    state.record("https://nn.wikipedia.org/wiki/Nærøyfjorden", {"revid": 7, "touched": "2026-01-01T00:00:00Z"})
+    state.record("https://en.wikipedia.org/wiki/Hardangerfjord", {"revid": 3001, "touched": None})
+
+    state.save()
+
+    assert os.listdir(tmp_path) == ["revisions.json"]  # The temporary file was moved into place
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert list(saved) == sorted(saved)
+    reloaded = RevisionState(path)
+    assert reloaded.pages == state.pages
+    assert not reloaded.changed("https://en.wikipedia.org/wiki/Hardangerfjord", {"revid": 3001, "touched": None})
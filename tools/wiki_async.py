@@ -0,0 +1,274 @@
+"""
+Asyncio Wikipedia search engine for fjord_wikipedia_matcher.py.
+
+Runs the same search as search_wikipedia_with_fallback - opensearch, category
+check, coordinate check, interlanguage links, languages tried in
+SEARCH_LANGUAGES order with the first in-range match winning - but for many
+fjords at once. Every request to a host is capped by a per-host semaphore
+and takes a token from the shared rate_limit buckets (backing off on
+Retry-After/maxlag), so the whole run stays polite no matter how many fjords
+are in flight. Category and langlink checks for all
+of a search's candidate titles go out as one batched query (see mediawiki.py).
+
+Each fjord's log lines are buffered and printed together when it finishes,
+so concurrent searches don't interleave their output.
+
+The API endpoints can be overridden, which lets the engine run against a
+local stub server:
+
+    searcher = AsyncWikipediaSearcher(client, api_urls={"nb": "http://127.0.0.1:8000/api"})
+"""
+
+import asyncio
+from urllib.parse import urlsplit
+
+import httpx
+
+from fjord_wikipedia_matcher import (
+    LANGUAGE_NAMES,
+    MAX_MATCH_DISTANCE_KM,
+    SEARCH_LANGUAGES,
+    WIKIPEDIA_API_URLS,
+    apply_match,
+    distance_km,
+    empty_search_result,
+    extract_wikipedia_coordinates,
+    has_fjord_category,
+    parse_langlinks,
+    search_terms_for,
+)
+from mediawiki import MAXLAG, chunked_titles, continue_params, merge_response, query_params, resolve_page
+from rate_limit import get_default_limiter
+from wiki_coordinates import CoordinateStats, geodata_coordinates
+
+USER_AGENT = "FjordleWikipediaMatcher/1.0 (https://fjordle.lol)"
+
+
+class AsyncWikipediaSearcher:
+    def __init__(
+        self,
+        client,
+        api_urls=None,
+        max_per_host=4,
+        requests_per_second=None,
+        cache=None,
+        limiter=None,
+    ):
+        self.client = client
+        self.cache = cache
+        self.api_urls = {**WIKIPEDIA_API_URLS, **(api_urls or {})}
+        self.max_per_host = max_per_host
+        self.limiter = limiter or get_default_limiter()
+        if requests_per_second:
+            self.limiter.configure(rate=requests_per_second)
+        self._in_flight = {}
+        # Per-language page cache filled by batched prop queries
+        self._pages = {}
+        self._aliases = {}
+        self._resolved = {}
+        self.coordinate_stats = CoordinateStats()
+
+    def _host_slots(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._in_flight:
+            self._in_flight[host] = asyncio.Semaphore(self.max_per_host)
+        return self._in_flight[host]
+
+    def _api_url(self, language):
+        return self.api_urls.get(language, self.api_urls["nb"])
+
+    async def _fetch(self, url, params=None, headers=None):
+        async with self._host_slots(url):
+            return await self.limiter.get_async(self.client, url, params=params, headers=headers)
+
+    async def _get(self, url, params=None):
+        """GET through the HTTP cache when there is one; only network requests are rate limited"""
+        if self.cache is None:
+            return await self._fetch(url, params)
+        return await self.cache.aget(self._fetch, url, params)
+
+    async def prefetch_pages(self, language, titles):
+        """Resolve categories/langlinks/coordinates for many titles in 50-title batches"""
+        pages = self._pages.setdefault(language, {})
+        aliases = self._aliases.setdefault(language, {})
+        resolved = self._resolved.setdefault(language, set())
+        pending = [title for title in titles if title not in resolved]
+        for batch in chunked_titles(pending):
+            params = query_params(batch)
+            while True:
+                response = await self._get(self._api_url(language), params)
+                response.raise_for_status()
+                data = response.json()
+                merge_response(pages, aliases, data)
+                cont = continue_params(data)
+                if not cont:
+                    break
+                params = {**query_params(batch), **cont}
+            resolved.update(batch)
+
+    async def _page(self, language, title):
+        await self.prefetch_pages(language, [title])
+        return resolve_page(self._pages[language], self._aliases[language], title)
+
+    async def check_fjord_categories(self, title, language, log):
+        try:
+            page = await self._page(language, title)
+            return bool(page) and has_fjord_category(page.get("categories", []), language)
+        except Exception as e:
+            log.append(f"    Error checking categories: {e}")
+            return False
+
+    async def get_interlanguage_links(self, title, language, log):
+        try:
+            page = await self._page(language, title)
+            return parse_langlinks(page.get("langlinks", [])) if page else {}
+        except Exception as e:
+            log.append(f"    Error getting interlanguage links: {e}")
+            return {}
+
+    async def check_coordinates_in_page(self, url, language, fjord_lat, fjord_lng, log, title=None):
+        if title:
+            try:
+                lat, lon = geodata_coordinates(await self._page(language, title))
+            except Exception as e:
+                log.append(f"    Error getting GeoData for {title}: {e}")
+                lat, lon = None, None
+            if lat is not None:
+                self.coordinate_stats.record("geodata")
+                dist = distance_km(fjord_lat, fjord_lng, lat, lon)
+                log.append(f"    GeoData: {lat}, {lon} (distance: {dist:.2f}km)")
+                return lat, lon, dist
+
+        try:
+            response = await self._get(url)
+            if response.status_code == 200:
+                log.append(f"    Checking coordinates in: {url}")
+                lat, lon = extract_wikipedia_coordinates(response.text, language)
+                if lat and lon:
+                    self.coordinate_stats.record("html")
+                    dist = distance_km(fjord_lat, fjord_lng, lat, lon)
+                    log.append(f"    Extracted: {lat}, {lon} (distance: {dist:.2f}km)")
+                    return lat, lon, dist
+                log.append("    No coordinates extracted from page")
+        except Exception as e:
+            log.append(f"    Error checking coordinates in {url}: {e}")
+        self.coordinate_stats.record("none")
+        return None, None, None
+
+    async def search_language(self, fjord_name, language, fjord_lat, fjord_lng, log):
+        for search_term in search_terms_for(fjord_name):
+            try:
+                response = await self._get(
+                    self._api_url(language),
+                    {
+                        "action": "opensearch",
+                        "search": search_term,
+                        "limit": 5,
+                        "namespace": 0,
+                        "format": "json",
+                        "maxlag": MAXLAG,
+                    },
+                )
+                if response.status_code != 200:
+                    continue
+                data = response.json()
+                if len(data) < 4 or not data[1]:
+                    continue
+
+                await self.prefetch_pages(language, data[1])
+                for title, url in zip(data[1], data[3]):
+                    if not await self.check_fjord_categories(title, language, log):
+                        continue
+                    log.append(f"    Found relevant page: {title}")
+                    lat, lon, dist = await self.check_coordinates_in_page(
+                        url, language, fjord_lat, fjord_lng, log, title
+                    )
+                    if lat and lon:
+                        log.append(
+                            f"    Found coordinates: {lat}, {lon} (distance: {dist:.2f}km)"
+                        )
+                        if dist <= MAX_MATCH_DISTANCE_KM:
+                            return url, title, lat, lon, dist
+            except Exception as e:
+                log.append(f"    Error searching {language} for {search_term}: {e}")
+                continue
+
+        return None, None, None, None, None
+
+    async def search_with_fallback(self, fjord_name, fjord_lat, fjord_lng, log):
+        """Same result as search_wikipedia_with_fallback for one fjord"""
+        result = empty_search_result()
+
+        for lang in SEARCH_LANGUAGES:
+            lang_name = LANGUAGE_NAMES[lang]
+            log.append(f"  Searching {lang_name} Wikipedia...")
+
+            url, title, lat, lon, dist = await self.search_language(
+                fjord_name, lang, fjord_lat, fjord_lng, log
+            )
+            if url and lat and lon and dist <= MAX_MATCH_DISTANCE_KM:
+                log.append(f"  ✓ COORDINATE MATCH in {lang_name}! Distance: {dist:.2f}km")
+                interlang_links = await self.get_interlanguage_links(title, lang, log)
+                log.append(f"    Found interlanguage links: {list(interlang_links.keys())}")
+                for link_lang, link_url in interlang_links.items():
+                    log.append(f"    {link_lang.upper()}: {link_url}")
+                return apply_match(result, lang, url, lat, lon, dist, interlang_links)
+
+        return result
+
+
+async def search_fjords_async(fjords, on_result, concurrency=16, client=None, **engine_kwargs):
+    """Search many fjords concurrently, calling on_result(fjord, result) as each finishes.
+
+    `fjords` are rows with name, center_lat and center_lng. `concurrency` is
+    the number of fjords in flight; per-host limits are set via engine_kwargs.
+    A fjord whose search raises is reported and gets no on_result call (so
+    --resume retries it); an exception from on_result is reported too. Either
+    way the other fjords carry on. Returns the searcher's CoordinateStats.
+    """
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=10,
+            follow_redirects=True,
+        )
+    searcher = AsyncWikipediaSearcher(client, **engine_kwargs)
+    queue = asyncio.Queue()
+    for fjord in fjords:
+        queue.put_nowait(fjord)
+
+    async def worker():
+        while True:
+            try:
+                fjord = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            log = []
+            result = None
+            try:
+                result = await searcher.search_with_fallback(
+                    fjord["name"], float(fjord["center_lat"]), float(fjord["center_lng"]), log
+                )
+            except Exception as e:
+                log.append(f"  Error searching {fjord.get('name')}: {e}")
+            if log:
+                print("\n".join(log))
+            if result is None:
+                continue
+            try:
+                on_result(fjord, result)
+            except Exception as e:
+                print(f"  Error recording result for {fjord.get('name')}: {e}")
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        if own_client:
+            await client.aclose()
+    return searcher.coordinate_stats
+
+
+def search_fjords(fjords, on_result, concurrency=16, **engine_kwargs):
+    """Blocking wrapper around search_fjords_async"""
+    return asyncio.run(search_fjords_async(fjords, on_result, concurrency, **engine_kwargs))
@@ -0,0 +1,135 @@
+"""
+Coordinate lookup for Wikipedia articles.
+
+GeoData coordinates come from the API (prop=coordinates, fetched alongside
+categories and langlinks by mediawiki.MediaWikiBatch), so most articles never
+need their HTML downloaded. Pages without a primary GeoData coordinate fall
+back to scanning the rendered article with the patterns below.
+
+The patterns are compiled once per language. Each has a literal marker that
+must occur in the page; the search starts at the marker's first occurrence,
+and every gap between markup pieces is bounded, so a miss can't backtrack
+across the whole page.
+"""
+
+import re
+from collections import Counter
+
+_FLAGS = re.DOTALL | re.IGNORECASE
+
+# Longest stretch allowed between the geo-dms wrapper and its latitude span
+_GAP = r".{0,200}?"
+
+_NB_NN = [
+    ('<span class="latitude">', r'<span class="latitude">(\d+)°(\d+)′([\d,]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,]+)″Ø</span>'),
+    ('class="geo-dms"', r'<span class="geo-dms"[^>]*>' + _GAP + r'<span class="latitude">(\d+)°(\d+)′([\d,]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,]+)″Ø</span>'),
+    ('class="geo-dms"', r'<span class="geo-dms"[^>]*>' + _GAP + r'<span class="latitude">(\d+)°(\d+)′(\d+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′(\d+)″(?:Ø|E)</span>'),
+    ('class="geo-dec"', r'<span class="geo-dec"[^>]*>([\d,]+)°N\s*([\d,]+)°Ø'),
+]
+
+_LANGUAGE_PATTERNS = {
+    "nb": _NB_NN,
+    "nn": _NB_NN,
+    "da": [
+        ('class="geo-dms"', r'<span class="geo-dms"[^>]*>' + _GAP + r'<span class="latitude">(\d+)°(\d+)′([\d,\.]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d,\.]+)″(?:Ø|E)</span>'),
+        ('class="geo-dec"', r'<span class="geo-dec"[^>]*>([\d,\.]+)°N\s*([\d,\.]+)°[ØE]'),
+    ],
+    "ceb": [
+        ('class="geo-dms"', r'<span class="geo-dms"[^>]*>' + _GAP + r'<span class="latitude">(\d+)°(\d+)′([\d\.]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d\.]+)″E</span>'),
+        ('class="geo-dec"', r'<span class="geo-dec"[^>]*>([\d\.]+)°N\s*([\d\.]+)°E'),
+    ],
+    "en": [
+        ('class="geo-dms"', r'<span class="geo-dms"[^>]*>' + _GAP + r'<span class="latitude">(\d+)°(\d+)′([\d\.]+)″N</span>\s*<span class="longitude">(\d+)°(\d+)′([\d\.]+)″E</span>'),
+        ('class="geo-dec"', r'<span class="geo-dec"[^>]*>([\d\.]+)°N\s*([\d\.]+)°E'),
+    ],
+}
+
+_GENERIC_PATTERNS = [
+    ('class="geo-dms"', r'<span class="geo-dms"[^>]*>' + _GAP + r'(\d+)°(\d+)′([\d\.,]+)″N\s*(\d+)°(\d+)′([\d\.,]+)″[EØ]'),
+    ("°", r"([\d,\.]+)\s*°\s*N[^0-9]{0,40}([\d,\.]+)\s*°\s*[EØ]"),
+]
+
+
+def _compile(patterns):
+    return [(marker, re.compile(pattern, _FLAGS)) for marker, pattern in patterns]
+
+
+COORDINATE_PATTERNS = {
+    language: _compile(patterns + _GENERIC_PATTERNS)
+    for language, patterns in _LANGUAGE_PATTERNS.items()
+}
+DEFAULT_PATTERNS = _compile(_GENERIC_PATTERNS)
+
+GEO_SPAN_PATTERN = re.compile(r'<span class="geo[^>]*>.{0,400}?</span>', _FLAGS)
+
+
+def dms_to_decimal(degrees, minutes, seconds):
+    """Convert DMS to decimal degrees"""
+    return degrees + minutes / 60 + seconds / 3600
+
+
+def parse_coordinate_groups(groups):
+    """(lat, lon) from a six-group DMS match or a two-group decimal match"""
+    if len(groups) == 6:
+        lat_deg, lat_min, lat_sec_str, lon_deg, lon_min, lon_sec_str = groups
+        lat_sec = float(lat_sec_str.replace(",", "."))
+        lon_sec = float(lon_sec_str.replace(",", "."))
+        return (
+            dms_to_decimal(int(lat_deg), int(lat_min), lat_sec),
+            dms_to_decimal(int(lon_deg), int(lon_min), lon_sec),
+        )
+    if len(groups) == 2:
+        lat_str, lon_str = groups
+        return float(lat_str.replace(",", ".")), float(lon_str.replace(",", "."))
+    return None, None
+
+
+def extract_html_coordinates(page_content, language="nb"):
+    """Scan rendered article HTML for coordinates; returns (lat, lon) or (None, None)"""
+    for marker, pattern in COORDINATE_PATTERNS.get(language, DEFAULT_PATTERNS):
+        start = page_content.find(marker)
+        if start < 0:
+            continue
+        match = pattern.search(page_content, max(0, start - 64))
+        if match:
+            try:
+                lat, lon = parse_coordinate_groups(match.groups())
+            except (ValueError, TypeError):
+                continue
+            if lat is not None:
+                return lat, lon
+    return None, None
+
+
+def geodata_coordinates(page):
+    """(lat, lon) of a page's primary GeoData coordinate, or (None, None).
+
+    Queries ask for coprimary=all, so the list can also hold secondary
+    coordinates (a neighbouring place, a river mouth). Those never stand in
+    for the article's own position; without a primary the HTML decides.
+    """
+    for c in (page or {}).get("coordinates", []):
+        if "primary" in c and c.get("globe", "earth") == "earth":
+            return float(c["lat"]), float(c["lon"])
+    return None, None
+
+
+class CoordinateStats:
+    """Counts which path each coordinate lookup took"""
+
+    PATHS = ("geodata", "html", "none")
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def record(self, path):
+        self.counts[path] += 1
+
+    def summary(self):
+        total = sum(self.counts.values())
+        if not total:
+            return "Coordinate lookups: none"
+        parts = [
+            f"{path} {self.counts[path]} ({self.counts[path] / total:.0%})" for path in self.PATHS
+        ]
+        return f"Coordinate lookups: {total} - " + ", ".join(parts)
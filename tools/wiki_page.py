@@ -0,0 +1,236 @@
+"""
+A fetched Wikipedia article, parsed once and shared by every extraction phase.
+
+Each derived view (infobox rows, article text, the lowercased page prefix
+used by the disambiguation/missing checks) is built on first use and memoized,
+so trying the infobox and then the article text costs one download and one
+parse.
+
+    page = WikipediaPage.fetch(url, cache, session)
+    page.is_disambiguation, page.is_missing
+    for header, value in page.infobox_rows: ...
+    page.content_text
+
+Parsing is pluggable (PARSER_BACKENDS). 'bs4' is BeautifulSoup with
+html.parser, the reference implementation. 'lxml' parses in C and reads only
+the infobox table, the #mw-content-text div and the start of the document,
+reproducing what get_text() returns for them: script/style/template text is
+skipped, and a whitespace-only string outside pre/textarea becomes a single
+newline or space. The page prefix has whitespace runs collapsed in both
+backends, since the two parsers keep different blank text around <html> and
+<head>. lxml is used by default when it is installed; tests/test_wiki_page.py
+checks the backends agree on the saved articles in tests/fixtures/wiki, and
+tools/bench_html_parsers.py times them.
+"""
+
+import re
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+# The page checks only look at the start of the document text
+PREFIX_CHARS = 1000
+
+DISAMBIGUATION_INDICATORS = (
+    'disambiguation',
+    'may refer to',
+    'flertydighet',  # Norwegian
+    'flertydig',     # Norwegian
+)
+
+MISSING_INDICATORS = (
+    'page does not exist',
+    'no page with this title',
+    'siden finnes ikke',  # Norwegian
+    'artikkelen finnes ikke',  # Norwegian
+)
+
+# What BeautifulSoup treats as whitespace, and where it leaves it alone
+ASCII_SPACES = ' \n\t\f\r'
+WHITESPACE_RUN = re.compile(r'[ \n\t\f\r]+')
+PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+
+
+def _prefix(strings, chars: int) -> str:
+    """The first `chars` characters of the joined strings, whitespace runs collapsed."""
+    parts = []
+    length = 0
+    previous_space = True  # Drops leading whitespace
+    for string in strings:
+        string = WHITESPACE_RUN.sub(' ', string)
+        if previous_space and string.startswith(' '):
+            string = string[1:]
+        if not string:
+            continue
+        parts.append(string)
+        length += len(string)
+        previous_space = string.endswith(' ')
+        if length >= chars:
+            break
+    return ''.join(parts)[:chars].rstrip(' ')
+
+
+class Bs4Document:
+    """BeautifulSoup over the whole page (html.parser)."""
+
+    def __init__(self, content: bytes):
+        self.soup = BeautifulSoup(content, 'html.parser')
+
+    def text_prefix(self, chars: int) -> str:
+        return _prefix(self.soup.strings, chars)
+
+    def infobox_rows(self) -> List[Tuple[str, str]]:
+        infobox = self.soup.find('table', class_='infobox')
+        if infobox is None:
+            return []
+        rows = []
+        for row in infobox.find_all('tr'):
+            th = row.find('th')
+            td = row.find('td')
+            if th and td:
+                rows.append((th.get_text(), td.get_text()))
+        return rows
+
+    def content_text(self) -> Optional[str]:
+        content_div = self.soup.find('div', {'id': 'mw-content-text'}) or self.soup.find('div', {'class': 'mw-parser-output'})
+        if not content_div:
+            return None
+        return content_div.get_text()
+
+
+if lxml is not None:
+    _INFOBOX = etree.XPath('(//table[contains(concat(" ", normalize-space(@class), " "), " infobox ")])[1]')
+    _CONTENT = etree.XPath(
+        '(//div[@id="mw-content-text"])[1] | (//div[contains(concat(" ", normalize-space(@class), " "), " mw-parser-output ")])[1]'
+    )
+    _ROWS = etree.XPath('.//tr')
+    _FIRST_TH = etree.XPath('(.//th)[1]')
+    _FIRST_TD = etree.XPath('(.//td)[1]')
+    _SKIPPED_TAGS = ('script', 'style', 'template')
+
+
+class LxmlDocument:
+    """libxml2 parse; only the subtrees the extractor reads are turned into Python strings."""
+
+    def __init__(self, content: bytes):
+        if lxml is None:
+            raise ImportError('the lxml parser backend needs the lxml package')
+        self.root = lxml.html.document_fromstring(content, parser=lxml.html.HTMLParser(encoding='utf-8'))
+
+    @staticmethod
+    def _strings(element):
+        """The strings of a subtree in document order, as BeautifulSoup's .strings yields them."""
+        preserve = 0
+        walker = etree.iterwalk(element, events=('start', 'end', 'comment', 'pi'))
+        for event, node in walker:
+            text = None
+            if event == 'start':
+                if node.tag in _SKIPPED_TAGS:
+                    # get_text() leaves script/style/template text out, but not what follows them
+                    walker.skip_subtree()
+                    continue
+                if node.tag in PRESERVE_WHITESPACE_TAGS:
+                    preserve += 1
+                text = node.text
+            elif node is not element:
+                # Comments and processing instructions only contribute their tail
+                if event == 'end' and node.tag in PRESERVE_WHITESPACE_TAGS:
+                    preserve -= 1
+                text = node.tail
+            if not text:
+                continue
+            if not preserve and not text.strip(ASCII_SPACES):
+                text = '\n' if '\n' in text else ' '
+            yield text
+
+    def _text(self, element) -> str:
+        return ''.join(self._strings(element))
+
+    def text_prefix(self, chars: int) -> str:
+        return _prefix(self._strings(self.root), chars)
+
+    def infobox_rows(self) -> List[Tuple[str, str]]:
+        found = _INFOBOX(self.root)
+        if not found:
+            return []
+        rows = []
+        for row in _ROWS(found[0]):
+            th = _FIRST_TH(row)
+            td = _FIRST_TD(row)
+            if th and td:
+                rows.append((self._text(th[0]), self._text(td[0])))
+        return rows
+
+    def content_text(self) -> Optional[str]:
+        found = _CONTENT(self.root)
+        if not found:
+            return None
+        # The id match wins over the class fallback, as in the bs4 backend
+        by_id = [div for div in found if div.get('id') == 'mw-content-text']
+        return self._text((by_id or found)[0])
+
+
+PARSER_BACKENDS = {
+    'bs4': Bs4Document,
+    'lxml': LxmlDocument,
+}
+
+DEFAULT_PARSER = 'lxml' if lxml is not None else 'bs4'
+
+
+class WikipediaPage:
+    def __init__(self, url: str, content: bytes, final_url: Optional[str] = None, parser: str = DEFAULT_PARSER):
+        if parser not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {parser}")
+        self.url = url
+        self.final_url = final_url or url
+        self.content = content
+        self.parser = parser
+
+    @classmethod
+    def fetch(cls, url: str, cache, session=None, timeout: int = 10, parser: str = DEFAULT_PARSER, ttl: Optional[float] = None) -> 'WikipediaPage':
+        """Download (or load from the HTTP cache) a page; raises on HTTP errors.
+        
+        `ttl=0` revalidates a cached copy, for pages known to have changed.
+        """
+        response = cache.get(url, session=session, timeout=timeout, ttl=ttl)
+        response.raise_for_status()
+        return cls(url, response.content, str(response.url), parser)
+
+    @property
+    def redirected(self) -> bool:
+        return self.final_url != self.url
+
+    @cached_property
+    def document(self):
+        return PARSER_BACKENDS[self.parser](self.content)
+
+    @cached_property
+    def text_prefix(self) -> str:
+        """Lowercased start of the document text (whitespace collapsed), without flattening the whole page."""
+        return self.document.text_prefix(PREFIX_CHARS).lower()
+
+    @cached_property
+    def is_disambiguation(self) -> bool:
+        return any(indicator in self.text_prefix for indicator in DISAMBIGUATION_INDICATORS)
+
+    @cached_property
+    def is_missing(self) -> bool:
+        return any(indicator in self.text_prefix for indicator in MISSING_INDICATORS)
+
+    @cached_property
+    def infobox_rows(self) -> List[Tuple[str, str]]:
+        """(lowercased header, value text) for every infobox row with both cells."""
+        return [(header.strip().lower(), value.strip()) for header, value in self.document.infobox_rows()]
+
+    @cached_property
+    def content_text(self) -> Optional[str]:
+        """Text of the article body, or None if the page has no content div."""
+        return self.document.content_text()